@@ -0,0 +1,214 @@
+"""
+Agenda semanal de turnos para recepción.
+
+`week_grid()` arma la semana de todos los veterinarios con una consulta de turnos y
+una única pasada sobre sus filas. Cada día de cada veterinario es una lista con una
+celda por franja de `APPOINTMENT_SLOT_MINUTES`:
+    None   franja libre.
+    False  franja ocupada por un bloque que empezó en una franja anterior.
+    (span, turnos)  inicio de un bloque de `span` franjas; `turnos` son tuplas
+        (id, mascota, "HH:MM"). Los turnos que comparten franjas por el redondeo
+        quedan en el mismo bloque.
+
+`render_week()` guarda el HTML de cada semana en la caché con una clave que incluye
+un token de la semana y uno general. Los receptores de `connect()` reemplazan el token
+de la semana cuando cambia uno de sus turnos, y el general cuando cambian mascotas o
+veterinarios; el HTML anterior deja de leerse y vence solo.
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import (
+    Appointment,
+    Pet,
+    Veterinary,
+    appointment_moved,
+    parse_moment,
+    records_changed,
+)
+
+DAYS = 7
+GENERATION_KEY = "agenda:generation"
+
+
+def week_start(day):
+    """
+    Devuelve el lunes de la semana de `day`.
+    """
+    return day - timedelta(days=day.weekday())
+
+
+def slot_labels():
+    """
+    Devuelve el horario de inicio ("HH:MM") de cada franja del horario de atención.
+    """
+    step = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    moment = datetime.combine(datetime.min, settings.CLINIC_OPENING)
+    closing = datetime.combine(datetime.min, settings.CLINIC_CLOSING)
+    labels = []
+    while moment + step <= closing:
+        labels.append(moment.strftime("%H:%M"))
+        moment += step
+    return labels
+
+
+def week_grid(monday):
+    """
+    Arma la agenda de la semana que empieza el lunes `monday`.
+
+    Los turnos de todos los veterinarios se leen con una sola consulta por rango sobre
+    el índice (veterinary, start), ordenados por veterinario e inicio, y se ubican en
+    su día y franja en una pasada. Los turnos fuera del horario de atención no se muestran.
+
+    Returns:
+        tuple: (franjas, veterinarios), donde veterinarios es una lista de tuplas
+            (id, nombre, días) y días tiene una lista de celdas por día.
+    """
+    labels = slot_labels()
+    slots = len(labels)
+    step = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    first_day = timezone.make_aware(datetime.combine(monday, datetime.min.time()))
+    last_day = first_day + timedelta(days=DAYS)
+
+    veterinarians = list(Veterinary.objects.order_by("name").values_list("id", "name"))
+    grid = {vet_id: [[None] * slots for _ in range(DAYS)] for vet_id, _ in veterinarians}
+    rows = Appointment.objects.filter(
+        veterinary_id__in=grid, start__gte=first_day, start__lt=last_day,
+    ).order_by("veterinary_id", "start").values_list("id", "veterinary_id", "start", "end", "pet__name")
+
+    block = None
+    for appointment_id, vet_id, start, end, pet_name in rows:
+        start, end = timezone.localtime(start), timezone.localtime(end)
+        day = (start.date() - monday).days
+        opening = datetime.combine(start.date(), settings.CLINIC_OPENING, start.tzinfo)
+        first = max((start - opening) // step, 0)
+        last = min(-(-(end - opening) // step), slots)
+        if first >= last:
+            continue
+
+        entry = (appointment_id, pet_name, start.strftime("%H:%M"))
+        if block and block[0] == (vet_id, day) and first < block[2]:
+            block[3].append(entry)
+            block[2] = max(block[2], last)
+            continue
+        if block:
+            place(grid, block)
+        block = [(vet_id, day), first, last, [entry]]
+    if block:
+        place(grid, block)
+
+    return labels, [(vet_id, name, grid[vet_id]) for vet_id, name in veterinarians]
+
+
+def place(grid, block):
+    """
+    Escribe un bloque de turnos en las celdas de su día.
+    """
+    (vet_id, day), first, last, entries = block
+    cells = grid[vet_id][day]
+    cells[first] = (last - first, tuple(entries))
+    cells[first + 1:last] = [False] * (last - first - 1)
+
+
+def week_context(monday):
+    """
+    Devuelve el contexto de la plantilla de la semana: una tabla por veterinario con
+    una fila por franja y una celda por día.
+    """
+    labels, veterinarians = week_grid(monday)
+    return {
+        "days": [monday + timedelta(days=offset) for offset in range(DAYS)],
+        "veterinarians": [
+            {"id": vet_id, "name": name, "rows": list(zip(labels, zip(*days)))}
+            for vet_id, name, days in veterinarians
+        ],
+    }
+
+
+def week_key(monday):
+    """
+    Devuelve la clave de caché del token de la semana que empieza el lunes `monday`.
+    """
+    return f"agenda:week:{monday.isoformat()}"
+
+
+def new_token():
+    """
+    Genera un token de caché; al ser aleatorio, un token desalojado no vuelve a
+    coincidir con el HTML que se guardó con él.
+    """
+    return uuid4().hex
+
+
+def render_week(monday):
+    """
+    Devuelve el HTML de la agenda de la semana, desde la caché si está vigente.
+
+    Los tokens se leen antes de consultar los turnos: si un cambio se confirma mientras
+    se arma la agenda, el HTML queda guardado con un token que ya fue reemplazado.
+    """
+    generation = cache.get_or_set(GENERATION_KEY, new_token, None)
+    token = cache.get_or_set(week_key(monday), new_token, None)
+    key = f"agenda:html:{monday.isoformat()}:{generation}:{token}"
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string("appointments/week.html", week_context(monday))
+        cache.set(key, html, settings.CALENDAR_CACHE_SECONDS)
+    return html
+
+
+def invalidate_weeks(moments):
+    """
+    Descarta, al confirmarse la transacción, las semanas que contienen `moments`.
+    """
+    keys = {week_key(week_start(timezone.localtime(parse_moment(moment)).date())) for moment in moments}
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_all(**kwargs):
+    """
+    Descarta todas las semanas al confirmarse la transacción; receptor de los cambios de
+    mascotas y veterinarios, cuyos nombres aparecen en la agenda.
+    """
+    transaction.on_commit(lambda: cache.delete(GENERATION_KEY))
+
+
+def appointment_saved(sender, instance, **kwargs):
+    """
+    Receptor de `post_save` para turnos.
+    """
+    invalidate_weeks([instance.start, instance.end])
+
+
+def appointments_changed(sender, ids, **kwargs):
+    """
+    Receptor de `records_changed` para turnos; incluye los borrados lógicos.
+    """
+    rows = Appointment.all_objects.filter(pk__in=ids).values_list("start", "end")
+    invalidate_weeks([moment for row in rows for moment in row])
+
+
+def appointment_rescheduled(sender, instance, previous_start, **kwargs):
+    """
+    Receptor de `appointment_moved`: descarta también la semana del horario anterior.
+    """
+    invalidate_weeks([previous_start])
+
+
+def connect():
+    """
+    Conecta los receptores que invalidan la agenda en caché.
+    """
+    post_save.connect(appointment_saved, sender=Appointment, dispatch_uid="agenda.appointment.save")
+    records_changed.connect(appointments_changed, sender=Appointment, dispatch_uid="agenda.appointment.bulk")
+    appointment_moved.connect(appointment_rescheduled, sender=Appointment, dispatch_uid="agenda.appointment.moved")
+    for model in (Pet, Veterinary):
+        post_save.connect(invalidate_all, sender=model, dispatch_uid=f"agenda.save.{model.__name__}")
+        records_changed.connect(invalidate_all, sender=model, dispatch_uid=f"agenda.bulk.{model.__name__}")
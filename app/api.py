@@ -0,0 +1,269 @@
+"""
+API JSON de lectura y escritura para los modelos de la aplicación.
+
+Las escrituras reutilizan `save_*` y `update_*`, por lo que aplican las mismas
+validaciones y el mismo control de concurrencia que los formularios. Las lecturas
+usan `.values()` con los campos pedidos en `?fields=` y nunca construyen instancias.
+
+Rutas por recurso:
+    GET    /api/<recurso>/        Listado con filtros y paginación por cursor.
+    POST   /api/<recurso>/        Alta.
+    GET    /api/<recurso>/<id>/   Detalle.
+    PATCH  /api/<recurso>/<id>/   Edición parcial; acepta "version" para detectar conflictos.
+    DELETE /api/<recurso>/<id>/   Borrado lógico.
+
+Los cuerpos de POST y PATCH deben ser JSON (`application/json`); con otro tipo de
+contenido la solicitud responde 415.
+"""
+import base64
+import binascii
+import functools
+import json
+
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .models import (
+    Client,
+    Med,
+    Pet,
+    Product,
+    Provider,
+    Veterinary,
+    validate_med,
+    validate_pet,
+)
+from .validation import (
+    client_validator,
+    med_validator,
+    pet_validator,
+    product_validator,
+    provider_validator,
+    veterinary_validator,
+)
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+RESERVED_PARAMS = ("fields", "cursor", "limit")
+LOOKUPS = ("", "__icontains", "__gte", "__lte")
+
+
+class ApiError(Exception):
+    """
+    Error de la solicitud que se responde como JSON con el código `status`.
+    """
+
+    def __init__(self, errors, status=400):
+        super().__init__(errors)
+        self.errors = errors
+        self.status = status
+
+
+class Resource:
+    """
+    Describe cómo se expone un modelo en la API.
+
+    Atributos:
+        model (Model): El modelo expuesto.
+        save (str): Nombre del método de clase `save_*` que crea registros.
+        update (str): Nombre del método `update_*` que edita registros.
+        validator (Validator): El validador que usan `save_*` y `update_*`.
+        validate (function): Valida los datos de un alta; por defecto, `validator`.
+            Se reemplaza cuando el modelo también necesita consultar la base de datos.
+        fields (tuple): Campos que se pueden leer, proyectar y filtrar: los del
+            validador más `id` y `version`.
+    """
+
+    def __init__(self, model, save, update, validator, validate=None):
+        self.model = model
+        self.save = save
+        self.update = update
+        self.validator = validator
+        self.validate = validate or validator
+        self.fields = ("id", *validator.names, "version")
+
+    def projection(self, params):
+        """
+        Devuelve los campos pedidos en `?fields=`, siempre con `id`, o todos si no se pidió ninguno.
+        """
+        requested = params.get("fields")
+        if not requested:
+            return self.fields
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError({"fields": f"Campos desconocidos: {', '.join(unknown)}"})
+        return ("id", *(name for name in names if name != "id"))
+
+    def filters(self, params):
+        """
+        Traduce los parámetros de la URL en filtros de QuerySet.
+
+        Se admite cada campo de `fields` solo o con los sufijos `__icontains`,
+        `__gte` y `__lte`.
+        """
+        allowed = {f"{name}{lookup}" for name in self.fields for lookup in LOOKUPS}
+        filters = {}
+        for key, value in params.items():
+            if key in RESERVED_PARAMS:
+                continue
+            if key not in allowed:
+                raise ApiError({key: "Filtro desconocido"})
+            filters[key] = value
+        return filters
+
+
+RESOURCES = {
+    "clients": Resource(Client, "save_client", "update_client", client_validator),
+    "providers": Resource(Provider, "save_provider", "update_provider", provider_validator),
+    "products": Resource(Product, "save_product", "update_product", product_validator),
+    "veterinarians": Resource(Veterinary, "save_veterinary", "update_veterinary", veterinary_validator),
+    "pets": Resource(Pet, "save_pet", "update_pet", pet_validator, validate_pet),
+    "meds": Resource(Med, "save_med", "update_med", med_validator, validate_med),
+}
+
+
+def encode_cursor(last_id):
+    """
+    Codifica el ID del último registro de una página como un cursor opaco.
+    """
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Devuelve el ID codificado en `cursor`.
+    """
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ApiError({"cursor": "Cursor inválido"}) from error
+
+
+def page_limit(params):
+    """
+    Devuelve el tamaño de página pedido en `?limit=`, acotado a `MAX_LIMIT`.
+    """
+    limit = params.get("limit", DEFAULT_LIMIT)
+    try:
+        limit = int(limit)
+    except ValueError as error:
+        raise ApiError({"limit": "El límite debe ser un número entero"}) from error
+    if limit < 1:
+        raise ApiError({"limit": "El límite debe ser mayor que cero"})
+    return min(limit, MAX_LIMIT)
+
+
+def request_data(request):
+    """
+    Devuelve el cuerpo JSON de la solicitud.
+
+    Las vistas de la API están exentas de CSRF, así que no se aceptan datos de
+    formulario: cualquier sitio podría enviarlos desde un `<form>` con la sesión del
+    usuario. Un cuerpo JSON no se puede enviar entre sitios sin una consulta CORS previa.
+    """
+    if request.content_type != "application/json":
+        raise ApiError({"body": "El cuerpo debe ser JSON (application/json)"}, status=415)
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError as error:
+        raise ApiError({"body": "JSON inválido"}) from error
+    if not isinstance(data, dict):
+        raise ApiError({"body": "Se esperaba un objeto JSON"})
+    return data
+
+
+def list_rows(resource, params):
+    """
+    Devuelve una página del listado y el cursor de la siguiente.
+
+    La página se lee ordenada por `id` a partir del cursor, con un registro de más
+    para saber si existe una página siguiente sin contar el total.
+    """
+    fields = resource.projection(params)
+    limit = page_limit(params)
+    queryset = resource.model.objects.order_by("id")
+    if params.get("cursor"):
+        queryset = queryset.filter(id__gt=decode_cursor(params["cursor"]))
+    try:
+        rows = list(queryset.filter(**resource.filters(params)).values(*fields)[:limit + 1])
+    except (ValueError, ValidationError) as error:
+        raise ApiError({"filters": "Valor de filtro inválido"}) from error
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["id"])
+    return {"results": rows, "next": next_cursor}
+
+
+def write_status(errors):
+    """
+    Devuelve el código HTTP de un error de escritura: 409 si fue un conflicto de versión.
+    """
+    return 409 if "version" in errors else 400
+
+
+def resource_view(view):
+    """
+    Decorador que resuelve el recurso de la URL y convierte `ApiError` en respuestas JSON.
+    """
+    @csrf_exempt
+    @functools.wraps(view)
+    def wrapper(request, resource, **kwargs):
+        try:
+            if resource not in RESOURCES:
+                raise ApiError({"resource": "Recurso desconocido"}, status=404)
+            return view(request, RESOURCES[resource], **kwargs)
+        except ApiError as error:
+            return JsonResponse({"errors": error.errors}, status=error.status)
+
+    return wrapper
+
+
+@resource_view
+def collection(request, resource):
+    """
+    Lista los registros de un recurso (GET) o crea uno nuevo (POST).
+    """
+    if request.method == "GET":
+        return JsonResponse(list_rows(resource, request.GET))
+
+    if request.method == "POST":
+        instance, errors = getattr(resource.model, resource.save)(request_data(request))
+        if errors:
+            raise ApiError(errors)
+        row = resource.model.objects.filter(pk=instance.pk).values(*resource.projection(request.GET)).get()
+        return JsonResponse(row, status=201)
+
+    return HttpResponseNotAllowed(["GET", "POST"])
+
+
+@resource_view
+def detail(request, resource, id):
+    """
+    Devuelve (GET), edita (PATCH) o borra (DELETE) un registro de un recurso.
+    """
+    if request.method not in ("GET", "PATCH", "DELETE"):
+        return HttpResponseNotAllowed(["GET", "PATCH", "DELETE"])
+
+    fields = resource.projection(request.GET)
+    if request.method == "GET":
+        row = resource.model.objects.filter(pk=id).values(*fields).first()
+        if row is None:
+            raise ApiError({"id": "No encontrado"}, status=404)
+        return JsonResponse(row)
+
+    instance = resource.model.objects.filter(pk=id).first()
+    if instance is None:
+        raise ApiError({"id": "No encontrado"}, status=404)
+
+    if request.method == "DELETE":
+        instance.delete()
+        return HttpResponse(status=204)
+
+    saved, errors = getattr(instance, resource.update)(request_data(request))
+    if not saved:
+        raise ApiError(errors, status=write_status(errors))
+    return JsonResponse({name: getattr(instance, name) for name in fields})
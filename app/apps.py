@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AppConfig(AppConfig):
@@ -10,3 +11,18 @@ class AppConfig(AppConfig):
     """
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        """
+        Conecta los receptores del registro de consultas lentas, del registro de cambios,
+        de los eventos de stock, de la agenda, de los reportes en caché y el que repone
+        los triggers de los resúmenes del tablero después de migrar.
+        """
+        from . import agenda, changes, db_logging, events, reports, summaries
+
+        db_logging.connect()
+        changes.connect()
+        events.connect()
+        agenda.connect()
+        reports.connect()
+        post_migrate.connect(summaries.ensure_triggers, sender=self, dispatch_uid="summaries.triggers")
@@ -0,0 +1,135 @@
+"""
+Variantes asíncronas de las vistas de solo lectura.
+
+Los listados y los formularios de edición se leen con el ORM asíncrono (`aiterator()`
+y `aget()`), de modo que bajo un servidor ASGI una solicitud no ocupa un hilo del
+servidor mientras espera a la base de datos o a un cliente lento. Los envíos de
+formularios (POST) se delegan en las vistas síncronas de `views.py`, que siguen
+siendo las únicas que escriben.
+
+Estas vistas se enrutan desde `app/urls_async.py`, que se usa cuando `ASYNC_VIEWS`
+está activo (ver `vetsoft/asgi.py`).
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.db.models import QuerySet
+from django.http import Http404
+from django.shortcuts import render
+
+from . import events, views
+from .models import Client, Med, Pet, Product, Provider, Veterinary
+
+
+async def listing(queryset):
+    """
+    Lee todas las filas de `queryset` con `aiterator()`.
+
+    Las filas se materializan antes de renderizar porque las plantillas no pueden
+    consultar la base de datos desde el event loop.
+    """
+    return [row async for row in queryset.aiterator()]
+
+
+def form_view(sync_view, model, template, name, context=None):
+    """
+    Construye la variante asíncrona de una vista de formulario.
+
+    El GET lee el registro con `aget()`; cualquier otro método se ejecuta con la vista
+    síncrona `sync_view`. Los valores de `context` que son QuerySets se leen con
+    `aiterator()` en cada solicitud.
+
+    Args:
+        sync_view (function): La vista síncrona que procesa los envíos.
+        model (Model): El modelo del registro a editar.
+        template (str): La plantilla del formulario.
+        name (str): El nombre del registro en el contexto de la plantilla.
+        context (dict, opcional): Datos adicionales para la plantilla.
+
+    Returns:
+        function: La vista asíncrona.
+    """
+    async def view(request, id=None):
+        if request.method != "GET":
+            return await sync_to_async(sync_view)(request, id=id)
+
+        instance = None
+        if id is not None:
+            try:
+                instance = await model.objects.aget(pk=id)
+            except model.DoesNotExist as error:
+                raise Http404(f"No {model._meta.object_name} matches the given query.") from error
+        extra = {}
+        for key, value in (context or {}).items():
+            extra[key] = await listing(value.all()) if isinstance(value, QuerySet) else value
+        return render(request, template, {name: instance, **extra})
+
+    view.__name__ = sync_view.__name__
+    view.__doc__ = f"Variante asíncrona de `views.{sync_view.__name__}`."
+    return view
+
+
+async def clients_repository(request):
+    """
+    Variante asíncrona de `views.clients_repository`.
+    """
+    clients = await listing(views.clients_with_pets())
+    return render(request, "clients/repository.html", {"clients": clients, "cities": Client.City.values})
+
+
+async def pets_repository(request):
+    """
+    Variante asíncrona de `views.pets_repository`.
+    """
+    pets = await listing(views.pets_with_owner())
+    return render(request, "pets/repository.html", {"pets": pets, "breeds": Pet.Breed.values})
+
+
+async def products_repository(request):
+    """
+    Variante asíncrona de `views.products_repository`.
+    """
+    products = await listing(Product.with_available())
+    for product in products:
+        if product.stock == 0:
+            messages.warning(request, f'El stock del producto "{product.name}" es 0.')
+    return render(
+        request,
+        "products/repository.html",
+        {"products": products, "live_stock": events.streams_supported(request)},
+    )
+
+
+async def providers_repository(request):
+    """
+    Variante asíncrona de `views.providers_repository`.
+    """
+    providers = await listing(Provider.objects.all())
+    return render(request, "providers/repository.html", {"providers": providers})
+
+
+async def veterinary_repository(request):
+    """
+    Variante asíncrona de `views.veterinary_repository`.
+    """
+    veterinarians = await listing(Veterinary.objects.all())
+    return render(request, "veterinary/repository.html", {"veterinarians": veterinarians})
+
+
+async def meds_repository(request):
+    """
+    Variante asíncrona de `views.meds_repository`.
+    """
+    meds = await listing(Med.objects.all())
+    return render(request, "meds/repository.html", {"meds": meds})
+
+
+clients_form = form_view(
+    views.clients_form, Client, "clients/form.html", "client", {"cities": dict(Client.City.choices)},
+)
+pets_form = form_view(
+    views.pets_form, Pet, "pets/form.html", "pet", {"breeds": dict(Pet.Breed.choices), "clients": views.owner_choices()},
+)
+products_form = form_view(views.products_form, Product, "products/form.html", "product")
+providers_form = form_view(views.providers_form, Provider, "providers/form.html", "provider")
+veterinary_form = form_view(views.veterinary_form, Veterinary, "veterinary/form.html", "veterinary")
+meds_form = form_view(views.meds_form, Med, "meds/form.html", "med", {"products": views.product_choices()})
@@ -0,0 +1,236 @@
+"""
+Endpoint `/api/batch/`: ejecuta una lista ordenada de operaciones en una sola transacción.
+
+Cuerpo de la solicitud:
+    {"operations": [
+        {"op": "create", "resource": "clients", "data": {...}},
+        {"op": "update", "resource": "pets", "id": 3, "data": {...}},
+        {"op": "delete", "resource": "meds", "id": 5},
+        {"op": "stock", "id": 7, "delta": -2}
+    ]}
+
+Las operaciones consecutivas con la misma acción y el mismo recurso forman una
+racha que se ejecuta con sentencias en lote: un `bulk_create` para las altas, una
+lectura con `in_bulk` para las ediciones, un `UPDATE` para los borrados y un `UPDATE`
+con `CASE` para los movimientos de stock. Si una operación falla se revierte el lote
+completo y la respuesta indica cuál falló.
+"""
+import functools
+import itertools
+import operator
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    Func,
+    IntegerField,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .api import RESOURCES, ApiError, request_data, write_status
+
+MAX_OPERATIONS = 1000
+OPERATIONS = ("create", "update", "delete", "stock")
+
+
+class BatchError(Exception):
+    """
+    Falla de la operación `index`; al propagarse revierte la transacción del lote.
+    """
+
+    def __init__(self, index, status, errors):
+        super().__init__(errors)
+        self.index = index
+        self.status = status
+        self.errors = errors
+
+
+def is_integer(value):
+    """
+    Indica si `value` es un entero de JSON; `true` y `false` llegan como bool, que en
+    Python es subclase de int, y no cuentan.
+    """
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_operation(index, operation):
+    """
+    Valida la forma de una operación y devuelve (acción, recurso, operación).
+    """
+    if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+        raise BatchError(index, 400, {"op": f"La acción debe ser una de: {', '.join(OPERATIONS)}"})
+
+    action = operation["op"]
+    resource = "products" if action == "stock" else operation.get("resource")
+    if resource not in RESOURCES:
+        raise BatchError(index, 400, {"resource": "Recurso desconocido"})
+    if action != "create" and not is_integer(operation.get("id")):
+        raise BatchError(index, 400, {"id": "Se esperaba un ID entero"})
+    if action in ("create", "update") and not isinstance(operation.get("data"), dict):
+        raise BatchError(index, 400, {"data": "Se esperaba un objeto con los datos"})
+    if action == "stock" and not is_integer(operation.get("delta")):
+        raise BatchError(index, 400, {"delta": "Se esperaba un número entero"})
+    return action, RESOURCES[resource], operation
+
+
+def create_run(resource, run):
+    """
+    Valida las altas de la racha y las guarda con un único `bulk_create`.
+    """
+    instances = []
+    for index, operation in run:
+        errors = resource.validate(operation["data"])
+        if errors:
+            raise BatchError(index, 400, errors)
+        instances.append(resource.model(**resource.validator.values(operation["data"])))
+
+    created = resource.model.objects.bulk_create(instances)
+    return [{"status": 201, "id": instance.pk} for instance in created]
+
+
+def update_run(resource, run):
+    """
+    Lee los registros de la racha con una consulta y los edita con `update_*`.
+    """
+    instances = resource.model.objects.in_bulk([operation["id"] for _, operation in run])
+    results = []
+    for index, operation in run:
+        instance = instances.get(operation["id"])
+        if instance is None:
+            raise BatchError(index, 404, {"id": "No encontrado"})
+        saved, errors = getattr(instance, resource.update)(operation["data"])
+        if not saved:
+            raise BatchError(index, write_status(errors), errors)
+        results.append({"status": 200, "id": instance.pk, "version": instance.version})
+    return results
+
+
+def delete_run(resource, run):
+    """
+    Comprueba que existan los registros de la racha y los borra con un único `UPDATE`.
+    """
+    ids = [operation["id"] for _, operation in run]
+    existing = set(resource.model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+    seen = set()
+    for index, operation in run:
+        if operation["id"] not in existing or operation["id"] in seen:
+            raise BatchError(index, 404, {"id": "No encontrado"})
+        seen.add(operation["id"])
+
+    resource.model.objects.for_ids(ids).delete()
+    return [{"status": 204, "id": pk} for pk in ids]
+
+
+def stock_run(resource, run):
+    """
+    Aplica los movimientos de stock de la racha con un único `UPDATE` condicionado.
+
+    Por cada producto se suman sus movimientos y se calcula el mínimo parcial, de modo
+    que la condición `stock >= -mínimo` equivale a aplicarlos en orden sin que el stock
+    quede negativo en ningún paso.
+
+    El `UPDATE` es todo o nada: solo modifica filas si existen todos los productos y
+    ninguno queda negativo. Si no, los movimientos se recorren en orden sobre el stock
+    sin modificar para informar cuál falló; si ninguno falla con ese stock, otro proceso
+    lo cambió entretanto y la racha responde 409.
+    """
+    totals = {}
+    lowest = {}
+    for _, operation in run:
+        pk = operation["id"]
+        totals[pk] = totals.get(pk, 0) + operation["delta"]
+        lowest[pk] = min(lowest.get(pk, 0), totals[pk])
+
+    allowed = functools.reduce(
+        operator.or_, (Q(pk=pk, stock__gte=-minimum) for pk, minimum in lowest.items()),
+    )
+    products = resource.model.objects.filter(pk__in=list(totals)).order_by()
+    found = products.values(found=Func(F("pk"), function="COUNT"))
+    updated = resource.model.objects.for_ids(list(totals)).filter(
+        allowed, ~Exists(products.exclude(allowed)),
+    ).alias(found=Subquery(found)).filter(found=len(totals)).update(
+        stock=F("stock") + Case(
+            *(When(pk=pk, then=Value(total)) for pk, total in totals.items()),
+            output_field=IntegerField(),
+        ),
+        version=F("version") + 1,
+    )
+    if updated != len(totals):
+        stocks = dict(resource.model.objects.filter(pk__in=totals).values_list("pk", "stock"))
+        running = {}
+        for index, operation in run:
+            pk = operation["id"]
+            if pk not in stocks:
+                raise BatchError(index, 404, {"id": "No encontrado"})
+            running[pk] = running.get(pk, stocks[pk]) + operation["delta"]
+            if running[pk] < 0:
+                raise BatchError(index, 400, {"stock": "El stock no puede ser negativo."})
+        raise BatchError(run[0][0], 409, {"stock": "El stock cambió durante el lote; volvé a intentarlo."})
+
+    return [{"status": 200, "id": operation["id"]} for _, operation in run]
+
+
+HANDLERS = {
+    "create": create_run,
+    "update": update_run,
+    "delete": delete_run,
+    "stock": stock_run,
+}
+
+
+def run_operations(operations):
+    """
+    Ejecuta las operaciones en una transacción, agrupadas en rachas homogéneas.
+
+    Returns:
+        list: Un resultado por operación, en el mismo orden.
+
+    Raises:
+        BatchError: Si alguna operación falla; la transacción ya fue revertida.
+    """
+    parsed = [(index, *parse_operation(index, operation)) for index, operation in enumerate(operations)]
+    results = []
+    with transaction.atomic():
+        for (action, resource), run in itertools.groupby(parsed, key=operator.itemgetter(1, 2)):
+            run = [(index, operation) for index, _, _, operation in run]
+            results.extend(HANDLERS[action](resource, run))
+    return results
+
+
+@csrf_exempt
+def batch(request):
+    """
+    Ejecuta un lote de operaciones enviado como JSON y devuelve un resultado por operación.
+
+    Si todas las operaciones tienen éxito responde 200 con `results`. Si alguna falla
+    no se aplica ninguna y la respuesta, con el código de la operación fallida, indica
+    su posición en `failed` y sus errores en `errors`.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    try:
+        operations = request_data(request).get("operations")
+    except ApiError as error:
+        return JsonResponse({"errors": error.errors}, status=error.status)
+    if not isinstance(operations, list) or not 0 < len(operations) <= MAX_OPERATIONS:
+        return JsonResponse(
+            {"errors": {"operations": f"Se esperaba una lista de 1 a {MAX_OPERATIONS} operaciones"}},
+            status=400,
+        )
+
+    try:
+        results = run_operations(operations)
+    except BatchError as error:
+        return JsonResponse(
+            {"committed": False, "failed": error.index, "errors": error.errors},
+            status=error.status,
+        )
+    return JsonResponse({"committed": True, "results": results})
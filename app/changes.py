@@ -0,0 +1,152 @@
+"""
+Registro de cambios para la sincronización incremental de clientes desconectados.
+
+Cada alta, edición o borrado de los seis modelos agrega una fila a `Change`, ya sea
+por `post_save` o por `records_changed` (las escrituras en lote y los borrados
+lógicos no pasan por `Model.save()`). `/api/changes/?since=<seq>` devuelve los cambios
+posteriores a `seq` y `compact()` acota el tamaño del registro.
+"""
+import json
+
+from django.db.models import Exists, Max, OuterRef
+from django.db.models.signals import post_save
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+
+from .api import RESOURCES
+from .models import DELETE, UPSERT, Change, ChangeLogState, records_changed
+
+CHUNK_SIZE = 500
+
+RESOURCE_NAMES = {resource.model: name for name, resource in RESOURCES.items()}
+
+
+def record_changes(sender, ids, action, **kwargs):
+    """
+    Agrega al registro un cambio por cada ID con un único INSERT.
+    """
+    resource = RESOURCE_NAMES[sender]
+    Change.objects.bulk_create(
+        [Change(resource=resource, object_id=object_id, action=action) for object_id in ids],
+    )
+
+
+def record_save(sender, instance, **kwargs):
+    """
+    Agrega al registro el alta o la edición de una instancia guardada con `save()`.
+    """
+    record_changes(sender, [instance.pk], UPSERT)
+
+
+def connect():
+    """
+    Conecta los receptores a las señales de los modelos expuestos en la API.
+    """
+    for model in RESOURCE_NAMES:
+        post_save.connect(record_save, sender=model, dispatch_uid=f"changes.save.{model.__name__}")
+        records_changed.connect(record_changes, sender=model, dispatch_uid=f"changes.bulk.{model.__name__}")
+
+
+def deltas(since, chunk_size=CHUNK_SIZE):
+    """
+    Genera los cambios posteriores a `since` como diccionarios compactos.
+
+    El registro se lee por bloques de `chunk_size` filas ordenadas por `seq`. Dentro de
+    cada bloque solo se conserva el último cambio de cada registro, y los datos de los
+    registros vivos se leen con un `.values()` por recurso. Un registro que ya no está
+    vivo se informa como borrado aunque su último cambio haya sido una edición.
+    """
+    last = since
+    while True:
+        chunk = list(
+            Change.objects.filter(seq__gt=last).order_by("seq")
+            .values_list("seq", "resource", "object_id", "action")[:chunk_size],
+        )
+        if not chunk:
+            return
+        last = chunk[-1][0]
+
+        latest = {}
+        for seq, resource, object_id, action in chunk:
+            latest.pop((resource, object_id), None)
+            latest[(resource, object_id)] = (seq, action)
+
+        wanted = {}
+        for (resource, object_id), (_, action) in latest.items():
+            if action == UPSERT:
+                wanted.setdefault(resource, []).append(object_id)
+        rows = {}
+        for resource, ids in wanted.items():
+            fields = RESOURCES[resource].fields
+            for row in RESOURCES[resource].model.objects.filter(pk__in=ids).values(*fields):
+                rows[(resource, row["id"])] = row
+
+        for (resource, object_id), (seq, _) in latest.items():
+            row = rows.get((resource, object_id))
+            if row is None:
+                yield {"seq": seq, "resource": resource, "id": object_id, "op": DELETE}
+            else:
+                yield {"seq": seq, "resource": resource, "id": object_id, "op": UPSERT, "data": row}
+
+
+def feed(request):
+    """
+    Devuelve los cambios posteriores a `?since=` como JSON delimitado por líneas.
+
+    Cada línea es un cambio y la última es `{"next": <seq>}`, el valor que el cliente
+    debe enviar en su próxima consulta. Si `since` es anterior al horizonte de la
+    compactación responde 410 y el cliente debe descargar todos los datos de nuevo.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    try:
+        since = int(request.GET.get("since", 0))
+    except ValueError:
+        return JsonResponse({"errors": {"since": "Se esperaba un número entero"}}, status=400)
+
+    horizon = ChangeLogState.current().horizon
+    if 0 < since < horizon:
+        return JsonResponse({"errors": {"since": "Sincronización completa requerida"}, "horizon": horizon}, status=410)
+
+    def lines():
+        next_seq = since
+        for delta in deltas(since):
+            next_seq = delta["seq"]
+            yield json.dumps(delta, default=str) + "\n"
+        yield json.dumps({"next": next_seq}) + "\n"
+
+    return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+
+
+def compact(tombstones_before, batch_size=CHUNK_SIZE):
+    """
+    Acota el registro de cambios.
+
+    Primero borra, por rangos de `batch_size` números de secuencia, los cambios que
+    otro cambio posterior del mismo registro ya reemplaza; así queda a lo sumo una fila
+    por registro. Luego descarta los borrados anteriores a `tombstones_before` y avanza
+    el horizonte hasta el mayor `seq` descartado.
+
+    Returns:
+        tuple: (reemplazados, borrados descartados).
+    """
+    newer = Change.objects.filter(
+        resource=OuterRef("resource"), object_id=OuterRef("object_id"), seq__gt=OuterRef("seq"),
+    )
+    superseded = 0
+    last = Change.objects.aggregate(last=Max("seq"))["last"] or 0
+    for start in range(0, last + 1, batch_size):
+        superseded += Change.objects.filter(
+            seq__gte=start, seq__lt=start + batch_size,
+        ).filter(Exists(newer)).delete()[0]
+
+    tombstones = Change.objects.filter(action=DELETE, created_at__lt=tombstones_before)
+    dropped = 0
+    while True:
+        seqs = list(tombstones.order_by("seq").values_list("seq", flat=True)[:batch_size])
+        if not seqs:
+            break
+        dropped += Change.objects.filter(seq__in=seqs).delete()[0]
+        state = ChangeLogState.current()
+        state.horizon = max(state.horizon, seqs[-1])
+        state.save(update_fields=["horizon"])
+    return superseded, dropped
@@ -8,6 +8,9 @@ links = [
     {"label": "Veterinarios", "href": reverse("veterinary_repo"), "icon": "bi bi-heart-pulse"},
     {"label": "Mascotas", "href": reverse("pets_repo"), "icon": "bi bi-0-circle"},
     {"label": "Medicamentos", "href": reverse("meds_repo"), "icon": "bi bi-capsule"},
+    {"label": "Turnos", "href": reverse("appointments_repo"), "icon": "bi bi-calendar-event"},
+    {"label": "Ventas", "href": reverse("sales_repo"), "icon": "bi bi-cart"},
+    {"label": "Reportes", "href": reverse("reports"), "icon": "bi bi-bar-chart"},
 
 ]
 
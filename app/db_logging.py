@@ -0,0 +1,200 @@
+import contextvars
+import json
+import logging
+import random
+import time
+import traceback
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3.base import SQLiteCursorWrapper
+
+logger = logging.getLogger("app.slow_queries")
+
+APP_SOURCES = ("app/views.py", "app/models.py")
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formatea los registros de log como una línea JSON.
+
+    Los atributos extra pasados en `extra={"query": {...}}` se incluyen en la salida,
+    de modo que el archivo pueda procesarse línea a línea con herramientas externas.
+    """
+
+    def format(self, record):
+        """
+        Devuelve el registro serializado como JSON.
+        """
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "query", {}))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def find_app_frame(stack=None):
+    """
+    Busca el frame más interno de la pila que pertenece a `app/views.py` o `app/models.py`.
+
+    Returns:
+        str | None: Una cadena "archivo:línea en función" o None si la consulta no se
+        originó en el código de la aplicación.
+    """
+    stack = stack or traceback.extract_stack()
+    for frame in reversed(stack):
+        filename = frame.filename.replace("\\", "/")
+        for source in APP_SOURCES:
+            if filename.endswith(source):
+                return f"{source}:{frame.lineno} in {frame.name}"
+    return None
+
+
+def explain_query_plan(context, sql, params):
+    """
+    Obtiene el plan de ejecución de una consulta en SQLite.
+
+    Se usa un cursor de la conexión cruda para no volver a pasar por los execute
+    wrappers de Django; `SQLiteCursorWrapper` convierte los marcadores `%s` de Django
+    a los de sqlite3.
+
+    Returns:
+        list[str] | None: Las filas de `EXPLAIN QUERY PLAN` o None si no aplica.
+    """
+    db = context["connection"]
+    if db.vendor != "sqlite" or not sql.lstrip().upper().startswith("SELECT"):
+        return None
+    cursor = db.connection.cursor(factory=SQLiteCursorWrapper)
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+
+
+class SlowQueryLogger:
+    """
+    Execute wrapper que registra las consultas más lentas que `SLOW_QUERY_THRESHOLD_MS`.
+
+    Cada entrada incluye la vista que originó la consulta, el frame de `app/views.py`
+    o `app/models.py` que la ejecutó y, de forma muestreada, el `EXPLAIN QUERY PLAN`.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+
+    def view_name(self):
+        """
+        Devuelve el nombre de la vista resuelta para la solicitud actual.
+        """
+        match = getattr(self.request, "resolver_match", None)
+        if match is None:
+            return None
+        return match.view_name
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Ejecuta la consulta midiendo su duración y la registra si supera el umbral.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.log(sql, params, many, context, duration_ms)
+
+    def log(self, sql, params, many, context, duration_ms):
+        """
+        Escribe la entrada estructurada de una consulta lenta.
+        """
+        entry = {
+            "duration_ms": round(duration_ms, 3),
+            "sql": sql,
+            "params": None if many else params,
+            "many": many,
+            "view": self.view_name(),
+            "path": getattr(self.request, "path", None),
+            "frame": find_app_frame(),
+        }
+        if not many and random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+            entry["plan"] = explain_query_plan(context, sql, params)
+        logger.warning("slow query (%.1f ms)", duration_ms, extra={"query": entry})
+
+
+current_logger = contextvars.ContextVar("slow_query_logger", default=None)
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """
+    Execute wrapper fijo de cada conexión: delega en el `SlowQueryLogger` de la
+    solicitud en curso, si la hay.
+
+    La solicitud se toma de una variable de contexto, que Django copia a los hilos donde
+    el ORM asíncrono ejecuta las consultas; así no hace falta instalar el wrapper en la
+    conexión de cada hilo.
+    """
+    logger = current_logger.get()
+    if logger is None:
+        return execute(sql, params, many, context)
+    return logger(execute, sql, params, many, context)
+
+
+def install(sender, connection, **kwargs):
+    """
+    Receptor de `connection_created` que agrega `log_slow_queries` a la conexión.
+    """
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_queries)
+
+
+def connect():
+    """
+    Conecta el receptor que instala el registro de consultas lentas en cada conexión.
+    """
+    connection_created.connect(install, dispatch_uid="db_logging.install")
+
+
+class SlowQueryLogMiddleware:
+    """
+    Middleware que activa un `SlowQueryLogger` durante cada solicitud.
+
+    Admite los modos síncrono y asíncrono para que bajo ASGI no obligue a ejecutar la
+    cadena de middlewares en un hilo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Procesa la solicitud con el registro de consultas lentas activo.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = current_logger.set(SlowQueryLogger(request))
+        try:
+            return self.get_response(request)
+        finally:
+            current_logger.reset(token)
+
+    async def __acall__(self, request):
+        """
+        Variante asíncrona de `__call__`.
+        """
+        token = current_logger.set(SlowQueryLogger(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            current_logger.reset(token)
@@ -0,0 +1,280 @@
+"""
+Eventos en vivo de stock para la página de productos (server-sent events).
+
+`/productos/eventos/` es una vista asíncrona que mantiene la conexión abierta y envía
+el stock actual y el disponible de cada producto que cambia, incluidos los cambios de
+sus reservas. Debe servirse con un servidor ASGI
+(`vetsoft/asgi.py`): bajo WSGI Django consume la respuesta entera antes de enviarla y
+la conexión ocuparía un hilo para siempre, así que la vista responde 204 (que el
+navegador no reintenta) y la página de productos no incluye el script.
+
+Los mensajes pasan por un broker configurable con `EVENTS_BACKEND`:
+    InProcessBroker: colas en memoria; alcanza con un único proceso.
+    ChangeLogBroker: cada suscriptor lee el registro de cambios (`Change`), por lo que
+        funciona con varios procesos o servidores sin infraestructura adicional. Las
+        reservas no pasan por ese registro: su efecto en el disponible se ve con el
+        siguiente cambio del producto.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from typing import Protocol
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Change, Product, Reservation, records_changed, reservations_changed
+
+STOCK_CHANNEL = "stock"
+
+
+class Broker(Protocol):
+    """
+    Interfaz de los brokers de eventos.
+
+    `subscribe()` es un generador asíncrono que produce los mensajes del canal y None
+    cada `heartbeat` segundos sin mensajes, para que la vista mantenga viva la conexión.
+    """
+
+    def wants(self, channel):
+        """
+        Indica si vale la pena publicar en `channel`.
+        """
+        return True
+
+    def publish(self, channel, message):
+        """
+        Publica `message` en `channel`; puede llamarse desde cualquier hilo.
+        """
+        ...
+
+    def subscribe(self, channel, heartbeat):
+        """
+        Devuelve un generador asíncrono con los mensajes publicados en `channel`.
+        """
+        ...
+
+
+def offer(queue, message):
+    """
+    Encola `message` descartando el más antiguo si la cola de un cliente lento está llena.
+    """
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+class InProcessBroker(Broker):
+    """
+    Broker en memoria: una cola acotada por suscriptor.
+
+    Las vistas síncronas publican desde su hilo, así que cada mensaje se entrega con
+    `call_soon_threadsafe` en el event loop del suscriptor.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def wants(self, channel):
+        """
+        Indica si hay suscriptores en `channel`.
+        """
+        return bool(self.subscribers.get(channel))
+
+    def publish(self, channel, message):
+        """
+        Entrega `message` a cada suscriptor de `channel`.
+        """
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(offer, queue, message)
+            except RuntimeError:
+                # El event loop del suscriptor ya se cerró.
+                pass
+
+    async def subscribe(self, channel, heartbeat):
+        """
+        Registra una cola para `channel` y produce sus mensajes hasta que se cierre.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self.lock:
+            self.subscribers[channel].add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self.lock:
+                self.subscribers[channel].discard(subscriber)
+
+
+def stock_messages(ids):
+    """
+    Lee el stock actual y el disponible (sin las reservas vigentes) de los productos
+    `ids` y arma un mensaje por producto.
+    """
+    rows = Product.all_objects.filter(pk__in=ids).annotate(
+        available=F("stock") - Product.reserved_units(timezone.now()),
+    ).values("id", "stock", "available", "deleted_at")
+    return [
+        {"id": row["id"], "stock": row["stock"], "available": row["available"]}
+        if row["deleted_at"] is None else {"id": row["id"], "deleted": True}
+        for row in rows
+    ]
+
+
+class ChangeLogBroker(Broker):
+    """
+    Broker para varios procesos basado en el registro de cambios.
+
+    No necesita publicar: las escrituras ya quedan en `Change`. Cada suscriptor consulta
+    los cambios de productos cada `poll_interval` segundos a partir del último visto.
+    """
+
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or settings.EVENTS_POLL_INTERVAL
+
+    def wants(self, channel):
+        """
+        Nunca hace falta publicar: los suscriptores leen el registro de cambios.
+        """
+        return False
+
+    def publish(self, channel, message):
+        """
+        No hace nada; ver `wants()`.
+        """
+
+    async def subscribe(self, channel, heartbeat):
+        """
+        Produce los mensajes de stock de los cambios registrados desde la suscripción.
+        """
+        latest = await Change.objects.filter(resource="products").order_by("-seq").values_list("seq", flat=True).afirst()
+        last = latest or 0
+        idle = 0.0
+        while True:
+            ids = []
+            async for seq, object_id in Change.objects.filter(
+                resource="products", seq__gt=last,
+            ).order_by("seq").values_list("seq", "object_id"):
+                last = seq
+                ids.append(object_id)
+            if ids:
+                idle = 0.0
+                for message in await sync_to_async(stock_messages)(list(dict.fromkeys(ids))):
+                    yield message
+            else:
+                idle += self.poll_interval
+                if idle >= heartbeat:
+                    idle = 0.0
+                    yield None
+            await asyncio.sleep(self.poll_interval)
+
+
+_brokers = {}
+
+
+def get_broker():
+    """
+    Devuelve la instancia del broker configurado en `EVENTS_BACKEND`.
+    """
+    path = settings.EVENTS_BACKEND
+    if path not in _brokers:
+        _brokers[path] = import_string(path)()
+    return _brokers[path]
+
+
+def publish_stock(ids):
+    """
+    Publica el stock de los productos `ids` cuando se confirme la transacción actual.
+    """
+    broker = get_broker()
+    if not broker.wants(STOCK_CHANNEL):
+        return
+
+    def send():
+        for message in stock_messages(ids):
+            broker.publish(STOCK_CHANNEL, message)
+
+    transaction.on_commit(send)
+
+
+def stock_changed(sender, ids, **kwargs):
+    """
+    Receptor de `records_changed` para productos.
+    """
+    publish_stock(ids)
+
+
+def stock_saved(sender, instance, **kwargs):
+    """
+    Receptor de `post_save` para productos.
+    """
+    publish_stock([instance.pk])
+
+
+def stock_reserved(sender, product_ids, **kwargs):
+    """
+    Receptor de `reservations_changed`: las reservas cambian el stock disponible.
+    """
+    publish_stock(product_ids)
+
+
+def connect():
+    """
+    Conecta los receptores que publican los cambios de stock.
+    """
+    post_save.connect(stock_saved, sender=Product, dispatch_uid="events.stock.save")
+    records_changed.connect(stock_changed, sender=Product, dispatch_uid="events.stock.bulk")
+    reservations_changed.connect(stock_reserved, sender=Reservation, dispatch_uid="events.stock.reserved")
+
+
+def format_event(message):
+    """
+    Serializa un mensaje en el formato de server-sent events; None se envía como comentario.
+    """
+    if message is None:
+        return ": ping\n\n"
+    return f"event: stock\ndata: {json.dumps(message)}\n\n"
+
+
+def streams_supported(request):
+    """
+    Indica si la solicitud llegó por ASGI, el único modo en que se pueden transmitir eventos.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+async def stock_events(request):
+    """
+    Mantiene abierta una conexión de server-sent events con los cambios de stock.
+
+    Bajo WSGI responde 204 sin contenido, que cierra el EventSource sin reintentos.
+    """
+    if not streams_supported(request):
+        return HttpResponse(status=204)
+
+    async def stream():
+        yield "retry: 3000\n\n"
+        async for message in get_broker().subscribe(STOCK_CHANNEL, settings.EVENTS_HEARTBEAT_SECONDS):
+            yield format_event(message)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,201 @@
+import itertools
+import string
+from datetime import date, timedelta
+
+from .models import Client, Med, Pet, Product, Provider, Veterinary
+
+
+def letters(number):
+    """
+    Convierte un número en una secuencia de letras (1 -> "A", 27 -> "AA").
+
+    Sirve para generar nombres únicos que pasen las validaciones que prohíben dígitos.
+    """
+    result = ""
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        result = string.ascii_uppercase[remainder] + result
+    return result
+
+
+class Factory:
+    """
+    Base de las fábricas de datos de prueba.
+
+    Cada subclase define `model` y `attributes(n)`, que devuelve valores válidos según
+    la función `validate_*` del modelo para el n-ésimo objeto de la secuencia.
+
+    Métodos:
+        data: Diccionario de strings, como el que envía un formulario.
+        build / build_batch: Instancias sin guardar.
+        create / create_batch: Instancias guardadas; `create_batch` usa `bulk_create`.
+    """
+    model = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.sequence = itertools.count(1)
+
+    @classmethod
+    def attributes(cls, n):
+        """
+        Devuelve los valores de los campos del n-ésimo objeto.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def next_attributes(cls, **overrides):
+        """
+        Devuelve los valores del siguiente objeto de la secuencia, con `overrides` aplicados.
+        """
+        return {**cls.attributes(next(cls.sequence)), **overrides}
+
+    @classmethod
+    def data(cls, **overrides):
+        """
+        Devuelve los datos como strings, listos para `save_*`, `validate_*` o un POST.
+        """
+        return {key: str(value) for key, value in cls.next_attributes(**overrides).items()}
+
+    @classmethod
+    def build(cls, **overrides):
+        """
+        Construye una instancia sin guardarla en la base de datos.
+        """
+        return cls.model(**cls.next_attributes(**overrides))
+
+    @classmethod
+    def build_batch(cls, size, **overrides):
+        """
+        Construye `size` instancias sin guardarlas.
+        """
+        return [cls.build(**overrides) for _ in range(size)]
+
+    @classmethod
+    def create(cls, **overrides):
+        """
+        Crea y guarda una instancia.
+        """
+        instance = cls.build(**overrides)
+        instance.save()
+        return instance
+
+    @classmethod
+    def create_batch(cls, size, **overrides):
+        """
+        Crea `size` instancias con un único `bulk_create`.
+        """
+        return cls.model.objects.bulk_create(cls.build_batch(size, **overrides))
+
+
+class ClientFactory(Factory):
+    """
+    Fábrica de clientes válidos según `validate_client`.
+    """
+    model = Client
+    cities = [city for city, _ in Client.City.choices]
+
+    @classmethod
+    def attributes(cls, n):
+        """
+        Devuelve los valores de los campos del n-ésimo cliente.
+        """
+        return {
+            "name": f"Cliente {letters(n)}",
+            "phone": int(f"54221{n:06d}"),
+            "email": f"cliente{n}@vetsoft.com",
+            "city": cls.cities[n % len(cls.cities)],
+        }
+
+
+class ProviderFactory(Factory):
+    """
+    Fábrica de proveedores válidos según `validate_provider`.
+    """
+    model = Provider
+
+    @classmethod
+    def attributes(cls, n):
+        """
+        Devuelve los valores de los campos del n-ésimo proveedor.
+        """
+        return {
+            "name": f"Proveedor {letters(n)}",
+            "email": f"proveedor{n}@example.com",
+            "address": f"Calle {n}",
+        }
+
+
+class ProductFactory(Factory):
+    """
+    Fábrica de productos válidos según `validate_product`.
+    """
+    model = Product
+    types = ["Limpieza", "Alimento", "Accesorio"]
+
+    @classmethod
+    def attributes(cls, n):
+        """
+        Devuelve los valores de los campos del n-ésimo producto.
+        """
+        return {
+            "name": f"Producto {letters(n)}",
+            "type": cls.types[n % len(cls.types)],
+            "price": float(100 + n),
+            "stock": 10 + n % 50,
+        }
+
+
+class VeterinaryFactory(Factory):
+    """
+    Fábrica de veterinarios válidos según `validate_veterinary`.
+    """
+    model = Veterinary
+
+    @classmethod
+    def attributes(cls, n):
+        """
+        Devuelve los valores de los campos del n-ésimo veterinario.
+        """
+        return {
+            "name": f"Veterinario {letters(n)}",
+            "phone": f"54221{n:06d}",
+            "email": f"veterinario{n}@vetsoft.com",
+        }
+
+
+class PetFactory(Factory):
+    """
+    Fábrica de mascotas válidas según `validate_pet`.
+    """
+    model = Pet
+    breeds = [breed for breed, _ in Pet.Breed.choices]
+
+    @classmethod
+    def attributes(cls, n):
+        """
+        Devuelve los valores de los campos de la n-ésima mascota.
+        """
+        return {
+            "name": f"Mascota {letters(n)}",
+            "breed": cls.breeds[n % len(cls.breeds)],
+            "birthday": date.today() - timedelta(days=30 + n % 3650),
+        }
+
+
+class MedFactory(Factory):
+    """
+    Fábrica de medicamentos válidos según `validate_med`.
+    """
+    model = Med
+
+    @classmethod
+    def attributes(cls, n):
+        """
+        Devuelve los valores de los campos del n-ésimo medicamento.
+        """
+        return {
+            "name": f"Medicamento {letters(n)}",
+            "desc": f"Descripcion {letters(n)}",
+            "dose": float(1 + n % 10),
+        }
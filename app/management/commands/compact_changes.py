@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.changes import CHUNK_SIZE, compact
+
+
+class Command(BaseCommand):
+    """
+    Compacta el registro de cambios que consume `/api/changes/`.
+    """
+
+    help = (
+        "Deja a lo sumo un cambio por registro y descarta los borrados más antiguos que el "
+        "período de retención, avanzando el horizonte de sincronización."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument("--days", type=int, default=settings.SOFT_DELETE_RETENTION_DAYS)
+        parser.add_argument("--batch-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        """
+        Ejecuta la compactación e informa cuántas filas eliminó.
+        """
+        before = timezone.now() - timedelta(days=options["days"])
+        superseded, dropped = compact(before, options["batch_size"])
+        self.stdout.write(f"{superseded} cambios reemplazados y {dropped} borrados descartados.")
@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.reminders import generate_reminders
+
+
+class Command(BaseCommand):
+    """
+    Genera los recordatorios de vacunas y tratamientos vencidos.
+    """
+
+    help = (
+        "Genera en bloques un recordatorio por cada plan vencido. Puede ejecutarse varias "
+        "veces: retoma una ejecución interrumpida y no duplica recordatorios."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument("--date", type=date.fromisoformat, default=None, help="Día de referencia (AAAA-MM-DD).")
+        parser.add_argument("--chunk-size", type=int, default=settings.REMINDER_CHUNK_SIZE)
+        parser.add_argument("--restart", action="store_true", help="Vuelve a recorrer un día ya terminado.")
+
+    def handle(self, *args, **options):
+        """
+        Ejecuta la generación e informa cuántos planes vencidos procesó.
+        """
+        day = options["date"] or timezone.localdate()
+        run = generate_reminders(day, options["chunk_size"], options["restart"])
+        self.stdout.write(f"{day}: {run.processed} planes vencidos procesados.")
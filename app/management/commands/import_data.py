@@ -0,0 +1,91 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.models import Client, Med, Pet, Product, Provider, Veterinary
+from app.validation import (
+    client_validator,
+    med_validator,
+    pet_validator,
+    product_validator,
+    provider_validator,
+    veterinary_validator,
+)
+
+IMPORTERS = {
+    "clients": (Client, client_validator),
+    "providers": (Provider, provider_validator),
+    "products": (Product, product_validator),
+    "veterinarians": (Veterinary, veterinary_validator),
+    "pets": (Pet, pet_validator),
+    "meds": (Med, med_validator),
+}
+
+
+def missing_references(model, validator, rows):
+    """
+    Busca las filas cuyas claves foráneas apuntan a registros que no existen, con una
+    consulta por clave foránea.
+
+    Returns:
+        dict: índice de la fila -> errores.
+    """
+    errors = {}
+    for field in model._meta.concrete_fields:
+        if not field.is_relation or field.attname not in validator.names:
+            continue
+        sent = {index: row[field.attname] for index, row in rows.items() if row.get(field.attname) not in (None, "")}
+        existing = field.related_model.objects.filter(pk__in=set(sent.values())).values_list("pk", flat=True)
+        found = set(existing)
+        for index, value in sent.items():
+            if int(value) not in found:
+                errors.setdefault(index, {})[field.attname] = f"No existe el registro {value}"
+    return errors
+
+
+class Command(BaseCommand):
+    """
+    Importa registros desde un CSV validándolos con las mismas reglas que los formularios.
+    """
+
+    help = "Importa un CSV cuyas columnas son los campos del modelo. Las filas inválidas se informan y se omiten."
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument("entity", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """
+        Valida todas las filas y guarda las válidas con `bulk_create` en lotes.
+
+        Las filas que no cumplen las reglas o que apuntan a registros inexistentes se
+        informan y se omiten, así una fila mala no interrumpe la importación.
+        """
+        model, validator = IMPORTERS[options["entity"]]
+        try:
+            with open(options["path"], newline="", encoding="utf-8") as file:
+                rows = list(csv.DictReader(file))
+        except OSError as error:
+            raise CommandError(error) from error
+
+        _, invalid = validator.partition(rows)
+        errors = dict(invalid)
+        candidates = {index: row for index, row in enumerate(rows) if index not in errors}
+        errors.update(missing_references(model, validator, candidates))
+        valid = [row for index, row in candidates.items() if index not in errors]
+        for index in sorted(errors):
+            # +2: la fila 1 del archivo es el encabezado
+            self.stderr.write(f"Fila {index + 2}: {errors[index]}")
+
+        with transaction.atomic():
+            model.objects.bulk_create(
+                (model(**validator.values(row)) for row in valid),
+                batch_size=options["batch_size"],
+            )
+
+        self.stdout.write(f"Importados {len(valid)} registros, {len(errors)} con errores.")
@@ -0,0 +1,57 @@
+import pstats
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.profiling import make_profile_token
+
+
+class Command(BaseCommand):
+    """
+    Lista y resume los perfiles capturados por ProfilerMiddleware.
+    """
+
+    help = "Lista los perfiles guardados en PROFILE_DIR y muestra las funciones más costosas."
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument("--limit", type=int, default=10, help="Cantidad de perfiles a listar.")
+        parser.add_argument("--top", type=int, default=5, help="Funciones a mostrar por perfil.")
+        parser.add_argument(
+            "--token", action="store_true", help="Imprime un token firmado para X-Vetsoft-Profile.",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Imprime los perfiles más recientes con su tiempo total y sus funciones más costosas.
+        """
+        if options["token"]:
+            self.stdout.write(make_profile_token())
+            return
+
+        directory = Path(settings.PROFILE_DIR)
+        profiles = sorted(directory.glob("*.prof"), reverse=True)[: options["limit"]]
+        if not profiles:
+            self.stdout.write(f"No hay perfiles en {directory}")
+            return
+
+        for path in profiles:
+            stats = pstats.Stats(str(path))
+            collapsed = path.with_suffix(".collapsed")
+            samples = 0
+            if collapsed.exists():
+                with open(collapsed, encoding="utf-8") as file:
+                    samples = sum(int(line.rsplit(" ", 1)[1]) for line in file if line.strip())
+
+            self.stdout.write(
+                f"{path.stem}: {stats.total_tt * 1000:.1f} ms, "
+                f"{stats.total_calls} llamadas, {samples} muestras",
+            )
+            ranked = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+            for (filename, lineno, function), (_, _, _, cumtime, _) in ranked[: options["top"]]:
+                self.stdout.write(
+                    f"    {cumtime * 1000:8.1f} ms  {function} ({Path(filename).name}:{lineno})",
+                )
@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.models import (
+    Appointment,
+    Client,
+    Med,
+    Pet,
+    Prescription,
+    Product,
+    Provider,
+    Sale,
+    Schedule,
+    Veterinary,
+)
+
+# Las recetas y los turnos van antes que las mascotas, los medicamentos y los
+# veterinarios: las recetas vencidas dejan de proteger a sus registros en la misma
+# corrida, y los turnos vencidos se cuentan como propios en lugar de caer en cascada.
+MODELS = (Client, Provider, Product, Appointment, Prescription, Veterinary, Pet, Med, Schedule, Sale)
+
+
+class Command(BaseCommand):
+    """
+    Elimina físicamente los registros borrados lógicamente hace más del período de retención.
+    """
+
+    help = "Elimina en lotes los registros cuyo deleted_at es anterior al período de retención."
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument("--days", type=int, default=settings.SOFT_DELETE_RETENTION_DAYS)
+        parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        """
+        Purga cada modelo en lotes de a lo sumo `--batch-size` filas.
+        """
+        before = timezone.now() - timedelta(days=options["days"])
+        for model in MODELS:
+            count = model.purge(before, options["batch_size"])
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {count} eliminados.")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.summaries import rebuild, supported
+
+
+class Command(BaseCommand):
+    """
+    Recalcula las tablas resumen del tablero de inicio.
+    """
+
+    help = "Recalcula desde cero los contadores del tablero de inicio (clientes, mascotas, productos y turnos)."
+
+    def handle(self, *args, **options):
+        """
+        Reemplaza los contadores e informa cuántos guardó.
+        """
+        if not supported():
+            raise CommandError("Los resúmenes con triggers requieren SQLite; en esta base el tablero se calcula desde las tablas.")
+        count = rebuild()
+        self.stdout.write(f"{count} contadores recalculados.")
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.models import Reservation
+
+
+class Command(BaseCommand):
+    """
+    Borra las reservas de stock vencidas.
+    """
+
+    help = "Borra en lotes las reservas de stock cuyo expires_at ya pasó."
+
+    def add_arguments(self, parser):
+        """
+        Define los argumentos del comando.
+        """
+        parser.add_argument("--batch-size", type=int, default=settings.RESERVATION_SWEEP_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        """
+        Barre las reservas vencidas e informa cuántas borró.
+        """
+        count = Reservation.sweep(timezone.now(), options["batch_size"])
+        self.stdout.write(f"{count} reservas vencidas eliminadas.")
@@ -0,0 +1,72 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [('app', '0001_initial'), ('app', '0002_client_delete_cliente'), ('app', '0003_product'), ('app', '0004_provider'), ('app', '0005_veterinary'), ('app', '0003_pet'), ('app', '0006_merge_0003_pet_0005_veterinary'), ('app', '0004_med'), ('app', '0007_merge_0004_med_0006_merge_0003_pet_0005_veterinary'), ('app', '0008_product_stock'), ('app', '0008_alter_pet_breed'), ('app', '0009_merge_0008_alter_pet_breed_0008_product_stock'), ('app', '0010_alter_pet_breed'), ('app', '0008_provider_address'), ('app', '0011_merge_0008_provider_address_0010_alter_pet_breed'), ('app', '0012_remove_client_address_client_city'), ('app', '0012_alter_client_phone'), ('app', '0013_merge_20240605_2343')]
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Veterinary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('phone', models.CharField(max_length=15)),
+                ('email', models.EmailField(max_length=254)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Med',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('desc', models.CharField(max_length=50)),
+                ('dose', models.FloatField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('type', models.CharField(max_length=50)),
+                ('price', models.FloatField()),
+                ('stock', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Pet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('breed', models.CharField(choices=[('Perro', 'Perro'), ('Gato', 'Gato'), ('Conejo', 'Conejo'), ('Pájaro', 'Pájaro'), ('Pez', 'Pez'), ('Otro', 'Otro')], max_length=50)),
+                ('birthday', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Provider',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254)),
+                ('address', models.CharField(blank=True, max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Client',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('phone', models.IntegerField()),
+                ('email', models.EmailField(max_length=254)),
+                ('city', models.CharField(choices=[('La Plata', 'La Plata'), ('Berisso', 'Berisso'), ('Ensenada', 'Ensenada')], max_length=100)),
+            ],
+        ),
+    ]
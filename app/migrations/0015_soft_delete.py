@@ -0,0 +1,67 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_add_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='med',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='provider',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='veterinary',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_client_live'),
+        ),
+        migrations.AddIndex(
+            model_name='med',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_med_live'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_pet_live'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_product_live'),
+        ),
+        migrations.AddIndex(
+            model_name='provider',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_provider_live'),
+        ),
+        migrations.AddIndex(
+            model_name='veterinary',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_veterinary_live'),
+        ),
+    ]
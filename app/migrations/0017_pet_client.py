@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='client',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pets', to='app.client'),
+        ),
+    ]
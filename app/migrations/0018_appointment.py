@@ -0,0 +1,30 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_pet_client'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Appointment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='app.pet')),
+                ('veterinary', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='appointments', to='app.veterinary')),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_appointment_live'), models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['veterinary', 'start'], name='app_appointment_vet_start')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:07
+
+import app.models
+from django.db import migrations, models
+
+
+def fill_birthday_doy(apps, schema_editor):
+    """
+    Calcula el día del año de las mascotas existentes, en lotes.
+    """
+    Pet = apps.get_model("app", "Pet")
+    batch = []
+    for pet in Pet.objects.only("id", "birthday").iterator(chunk_size=1000):
+        pet.birthday_doy = app.models.day_of_year(pet.birthday)
+        batch.append(pet)
+        if len(batch) == 1000:
+            Pet.objects.bulk_update(batch, ["birthday_doy"])
+            batch = []
+    Pet.objects.bulk_update(batch, ["birthday_doy"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_schedule_reminder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='birthday_doy',
+            field=app.models.DayOfYearField(editable=False, null=True, source='birthday'),
+        ),
+        migrations.RunPython(fill_birthday_doy, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['birthday_doy'], name='app_pet_birthday_doy'),
+        ),
+    ]
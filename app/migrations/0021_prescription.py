@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_pet_birthday_doy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='med',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='meds', to='app.product'),
+        ),
+        migrations.CreateModel(
+            name='Prescription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('dose', models.FloatField()),
+                ('quantity', models.PositiveIntegerField()),
+                ('prescribed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('dispensed_at', models.DateTimeField(blank=True, null=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('med', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prescriptions', to='app.med')),
+                ('pet', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='prescriptions', to='app.pet')),
+                ('veterinary', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prescriptions', to='app.veterinary')),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_prescription_live'), models.Index(fields=['pet', 'prescribed_at'], name='app_prescription_pet_history')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_prescription'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sale',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('paid_at', models.DateTimeField(blank=True, null=True)),
+                ('total', models.FloatField(default=0)),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['id'], name='app_sale_live'), models.Index(condition=models.Q(('deleted_at__isnull', True), ('paid_at__isnull', False)), fields=['paid_at'], name='app_sale_paid')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SaleLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('price', models.FloatField()),
+                ('quantity', models.PositiveIntegerField()),
+                ('product', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sale_lines', to='app.product')),
+                ('sale', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='app.sale')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='saleline',
+            constraint=models.UniqueConstraint(fields=('sale', 'product'), name='app_saleline_once'),
+        ),
+    ]
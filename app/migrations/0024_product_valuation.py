@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0023_reservation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['type', 'price', 'stock', 'deleted_at'], name='app_product_valuation'),
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:39
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models.functions import TruncDate
+
+# Copia fija de los resúmenes de `app.summaries` al crear la tabla: (nombre, tabla,
+# columnas, clave, condición), con la clave y la condición en SQL sobre la fila `{row}`.
+SUMMARIES = (
+    ("clients_by_city", "app_client", "city", "{row}.city", "{row}.deleted_at IS NULL"),
+    ("pets_by_breed", "app_pet", "breed", "{row}.breed", "{row}.deleted_at IS NULL"),
+    ("products_out_of_stock", "app_product", "stock", "''", "{row}.deleted_at IS NULL AND {row}.stock = 0"),
+    ("appointments_by_day", "app_appointment", "start", "date({row}.start)", "{row}.deleted_at IS NULL"),
+)
+
+ADD = (
+    'INSERT INTO app_summarycount (summary, "key", "count") SELECT \'{name}\', {key}, {amount} '
+    'WHERE {condition} ON CONFLICT (summary, "key") DO UPDATE SET "count" = "count" + excluded."count";'
+)
+
+
+def add(name, key, condition, row, amount):
+    """
+    Devuelve la sentencia que suma `amount` al contador de la fila `row` si entra en el resumen.
+    """
+    return ADD.format(name=name, key=key.format(row=row), condition=condition.format(row=row), amount=amount)
+
+
+def create_triggers():
+    """
+    Devuelve las sentencias que crean los triggers de los resúmenes.
+    """
+    statements = []
+    for name, table, column, key, condition in SUMMARIES:
+        moved = (
+            f"({condition.format(row='OLD')}) IS NOT ({condition.format(row='NEW')}) "
+            f"OR {key.format(row='OLD')} IS NOT {key.format(row='NEW')}"
+        )
+        statements += [
+            f"CREATE TRIGGER app_summary_{name}_insert AFTER INSERT ON {table} "
+            f"BEGIN {add(name, key, condition, 'NEW', 1)} END",
+            f"CREATE TRIGGER app_summary_{name}_update AFTER UPDATE OF {column}, deleted_at ON {table} "
+            f"WHEN {moved} BEGIN {add(name, key, condition, 'OLD', -1)} {add(name, key, condition, 'NEW', 1)} END",
+            f"CREATE TRIGGER app_summary_{name}_delete AFTER DELETE ON {table} "
+            f"BEGIN {add(name, key, condition, 'OLD', -1)} END",
+        ]
+    return statements
+
+
+def drop_triggers():
+    """
+    Devuelve las sentencias que eliminan los triggers de los resúmenes.
+    """
+    return [
+        f"DROP TRIGGER IF EXISTS app_summary_{name}_{event}"
+        for name, *_ in SUMMARIES
+        for event in ("insert", "update", "delete")
+    ]
+
+
+def install_triggers(apps, schema_editor):
+    """
+    Crea los triggers; solo en SQLite, en otras bases el tablero se calcula desde las tablas.
+    """
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in create_triggers():
+            schema_editor.execute(statement)
+
+
+def remove_triggers(apps, schema_editor):
+    """
+    Elimina los triggers de SQLite al revertir la migración.
+    """
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in drop_triggers():
+            schema_editor.execute(statement)
+
+
+def fill_summaries(apps, schema_editor):
+    """
+    Calcula los contadores de los registros existentes con una consulta agrupada por resumen.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    SummaryCount = apps.get_model("app", "SummaryCount")
+    keys = {
+        "clients_by_city": ("Client", models.F("city"), models.Q()),
+        "pets_by_breed": ("Pet", models.F("breed"), models.Q()),
+        "products_out_of_stock": ("Product", models.Value(""), models.Q(stock=0)),
+        # `date()` de SQLite toma el día en UTC, como los triggers.
+        "appointments_by_day": ("Appointment", TruncDate("start", tzinfo=datetime.timezone.utc), models.Q()),
+    }
+    counters = []
+    for name, (model, key, condition) in keys.items():
+        rows = apps.get_model("app", model)._default_manager.filter(condition, deleted_at__isnull=True)
+        for row in rows.order_by().values(group=key).annotate(count=models.Count("pk")):
+            if row["count"]:
+                counters.append(SummaryCount(summary=name, key=str(row["group"]), count=row["count"]))
+    SummaryCount.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_product_valuation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SummaryCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary', models.CharField(max_length=30)),
+                ('key', models.CharField(blank=True, max_length=50)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='summarycount',
+            constraint=models.UniqueConstraint(fields=('summary', 'key'), name='app_summarycount_key'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+        migrations.RunPython(install_triggers, remove_triggers),
+    ]
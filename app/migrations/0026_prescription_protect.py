@@ -0,0 +1,29 @@
+# Generated by Django 5.0.4 on 2026-10-19 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_summary_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='prescription',
+            name='med',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='prescriptions', to='app.med'),
+        ),
+        migrations.AlterField(
+            model_name='prescription',
+            name='pet',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='prescriptions', to='app.pet'),
+        ),
+        migrations.AlterField(
+            model_name='prescription',
+            name='veterinary',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='prescriptions', to='app.veterinary'),
+        ),
+    ]
@@ -1,7 +1,36 @@
-import re
-from datetime import date, datetime
-
-from django.db import models
+import calendar
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import (
+    Case,
+    Exists,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .validation import (
+    appointment_validator,
+    client_validator,
+    med_validator,
+    pet_validator,
+    prescription_validator,
+    product_validator,
+    provider_validator,
+    sale_line_validator,
+    schedule_validator,
+    veterinary_validator,
+)
 
 
 def validate_client(data):
@@ -23,43 +52,7 @@ def validate_client(data):
             - 'phone': Si el teléfono está vacío.
             - 'email': Si el email está vacío o no es válido.
     """
-
-    errors = {}
-
-    name = data.get("name", "")
-    phone = data.get("phone", "")
-    city = data.get("city", "")
-    email = data.get("email", "")
-    pattern_email = r'^[a-zA-Z0-9._%+-]+@vetsoft\.com$'
-
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
-
-    if any(char.isdigit() for char in name):
-        errors["name"] = "El nombre no puede contener números."
-
-    if city == "":
-        errors["city"] = "Por favor seleccione una ciudad"
-
-    if phone == "":
-        errors["phone"] = "Por favor ingrese un teléfono"
-    else:
-        try:
-            int (phone)
-            if not phone.startswith("54"):
-                errors["phone"] = "El telefono debe comenzar con '54'"
-        except ValueError:
-            errors["phone"] = "Por favor ingrese un numero de telefono valido, solo digitos"
-
-    if email == "":
-        errors["email"] = "Por favor ingrese un email"
-    else:
-        try:
-            if not re.match(pattern_email, email):
-                 errors["email"] =("El email debe terminar con @vetsoft.com y contener algo antes")
-        except ValueError:
-            errors["email"] = "Formato de email inválido."
-    return errors
+    return client_validator(data)
 
 def validate_provider(data):
     """
@@ -73,24 +66,7 @@ def validate_provider(data):
         dict: Un diccionario que contiene los errores de validación.
               Las claves son los nombres de los campos y los valores son los mensajes de error.
     """
-    errors = {}
-
-    name = data.get("name", "")
-    email = data.get("email", "")
-    address = data.get("address","")
-
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
-
-    if address == "":
-        errors["address"] = "Por favor ingrese una direccion"
-
-    if email == "":
-        errors["email"] = "Por favor ingrese un email valido"
-    elif email.count("@") == 0:
-        errors["email"] = "Por favor ingrese un email valido"
-
-    return errors
+    return provider_validator(data)
 
 def validate_product(data):
     """
@@ -104,25 +80,7 @@ def validate_product(data):
         dict: Un diccionario que contiene los errores de validación.
               Las claves son los nombres de los campos y los valores son los mensajes de error.
     """
-    errors = {}
-
-    name = data.get("name", "")
-    type = data.get("type", "")
-    price = data.get("price", "")
-    stock = data.get("stock", "")
-
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
-
-    if type == "":
-        errors["type"] = "Por favor ingrese un tipo"
-
-    if price == "":
-        errors["price"] = "Por favor ingrese un precio"
-
-    if stock == "":
-        errors["stock"] = "Por favor ingrese un stock"
-    return errors
+    return product_validator(data)
 
 def validate_veterinary(data):
     """
@@ -136,24 +94,7 @@ def validate_veterinary(data):
         dict: Un diccionario que contiene los errores de validación.
               Las claves son los nombres de los campos y los valores son los mensajes de error.
     """
-    errors = {}
-
-    name = data.get("name", "")
-    phone = data.get("phone", "")
-    email = data.get("email", "")
-
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
-
-    if phone == "":
-        errors["phone"] = "Por favor ingrese un teléfono"
-
-    if email == "":
-        errors["email"] = "Por favor ingrese un email"
-    elif email.count("@") == 0:
-        errors["email"] = "Por favor ingrese un email valido"
-
-    return errors
+    return veterinary_validator(data)
 
 
 def validate_med(data):
@@ -168,32 +109,343 @@ def validate_med(data):
         dict: Un diccionario que contiene los errores de validación.
               Las claves son los nombres de los campos y los valores son los mensajes de error.
     """
-    errors = {}
+    errors = med_validator(data)
+    if not errors:
+        errors = validate_med_product(data)
+    return errors
 
-    name = data.get("name", "")
-    desc = data.get("desc", "")
-    dose = data.get("dose", "")
 
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
+def validate_med_product(data):
+    """
+    Verifica que el producto indicado en "product_id", si hay uno, sea un producto existente.
 
-    if desc == "":
-        errors["desc"] = "Por favor ingrese una descripcion"
+    Returns:
+        dict: El error de "product_id", o un diccionario vacío.
+    """
+    product_id = data.get("product_id")
+    if product_id in (None, "") or Product.objects.filter(pk=product_id).exists():
+        return {}
+    return {"product_id": "Por favor seleccione un producto válido"}
 
-    if dose == "":
-        errors["dose"] = "Por favor ingrese una dosis"
 
-    else:
-        try:
-            dose = float(dose)
-            if dose < 1.0 or dose > 10.0:
-                errors["dose"] = "La dosis debe estar entre 1 y 10"
-        except ValueError:
-            errors["dose"] = "La dosis debe ser un número decimal"
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Se envía con `sender=<modelo>`, `ids=[...]` y `action` (UPSERT o DELETE) cuando
+# registros cambian sin pasar por `Model.save()`, que ya emite `post_save`.
+records_changed = Signal()
+
+# Se envía con `sender=Appointment`, `instance` y `previous_start` cuando
+# `update_appointment` cambia el inicio de un turno: `records_changed` solo informa
+# el horario nuevo.
+appointment_moved = Signal()
+
+# Se envía con `sender=Reservation` y `product_ids` cuando se crean, modifican o borran
+# reservas, que cambian el stock disponible de esos productos sin escribir en ellos.
+reservations_changed = Signal()
+
+
+def day_of_year(day):
+    """
+    Devuelve el número de día de `day` contado como en un año bisiesto (1 a 366).
+
+    Así cada fecha del calendario tiene siempre el mismo número y el 29 de febrero
+    queda entre el 28 de febrero y el 1 de marzo.
+    """
+    return day.replace(year=2000).timetuple().tm_yday
+
+
+class DayOfYearField(models.PositiveSmallIntegerField):
+    """
+    Columna con el `day_of_year()` del campo de fecha `source` del mismo modelo.
+
+    Se calcula en `pre_save`, que Django invoca tanto en `save()` como en
+    `bulk_create()`; `update_instance` la recalcula cuando cambia `source`.
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        self.source = source
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault("null", True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        """
+        Incluye `source` en la definición que se guarda en las migraciones.
+        """
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["source"] = self.source
+        return name, path, args, kwargs
+
+    def derive(self, value):
+        """
+        Calcula el día del año de un valor de `source`, que puede llegar como texto.
+        """
+        value = self.model._meta.get_field(self.source).to_python(value)
+        return None if value is None else day_of_year(value)
+
+    def pre_save(self, model_instance, add):
+        """
+        Actualiza la columna a partir del valor actual de `source`.
+        """
+        value = self.derive(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
 
-    return errors
 
-class Client(models.Model):
+CONFLICT_MESSAGE = (
+    "Otro usuario modificó este registro mientras lo editabas. "
+    "Volvé a abrirlo para ver los datos actuales, o guardá de nuevo para reemplazarlos con los tuyos."
+)
+
+
+def update_instance(instance, data, validator, partial=True):
+    """
+    Valida `data` y guarda en `instance` solo los campos que cambiaron.
+
+    La validación ocurre antes de modificar el objeto, por lo que ante un error la
+    instancia queda intacta y no hace falta volver a leerla de la base de datos.
+    Si ningún valor cambia, no se ejecuta ninguna consulta.
+
+    La escritura usa control de concurrencia optimista: un único
+    `UPDATE ... WHERE id = ? AND version = ?` que además incrementa `version`. Si
+    `data` trae la versión que vio el usuario y no coincide, o si otra escritura
+    se adelantó, se devuelve un error en la clave "version" y la instancia queda
+    con la versión actual de la base de datos.
+
+    Args:
+        instance (Model): El objeto a actualizar.
+        data (dict): Los datos recibidos; los campos vacíos conservan su valor actual,
+            salvo las claves foráneas opcionales, donde "" quita la relación (por
+            ejemplo, la opción "Sin dueño" de una mascota).
+        validator (Validator): El validador del modelo.
+        partial (bool): Si es False, todos los campos del validador son obligatorios.
+
+    Returns:
+        tuple: (True, None) si se actualizó o no había cambios, (False, errores) si no.
+    """
+    errors = validator(data, partial=partial)
+    if errors:
+        return False, errors
+
+    changes = {}
+    for name in validator.names:
+        value = data.get(name)
+        field = instance._meta.get_field(name)
+        if value == "" and field.is_relation and field.null:
+            value = None
+        elif value is None or value == "":
+            continue
+        else:
+            value = field.to_python(value)
+        if getattr(instance, name) != value:
+            changes[name] = value
+
+    if not changes:
+        return True, None
+
+    for field in instance._meta.concrete_fields:
+        if isinstance(field, DayOfYearField) and field.source in changes:
+            changes[field.attname] = field.derive(changes[field.source])
+
+    version = data.get("version")
+    if version not in (None, "") and str(version) != str(instance.version):
+        return False, {"version": CONFLICT_MESSAGE}
+
+    updated = type(instance).objects.for_ids([instance.pk]).filter(version=instance.version).update(
+        version=instance.version + 1, **changes,
+    )
+    if not updated:
+        instance.refresh_from_db(fields=["version"])
+        return False, {"version": CONFLICT_MESSAGE}
+
+    for name, value in changes.items():
+        setattr(instance, name, value)
+    instance.version += 1
+    return True, None
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    QuerySet cuyo `delete()` marca los registros como borrados en lugar de eliminarlos.
+
+    El borrado lógico es un único `UPDATE` que completa `deleted_at` e incrementa
+    `version`, así los formularios abiertos detectan que el registro ya no existe.
+    `hard_delete()` elimina las filas de verdad y lo usa la purga periódica.
+
+    `update()`, `delete()` y `bulk_create()` no emiten `post_save`, así que envían
+    `records_changed` con los IDs afectados. Si el QuerySet se creó con `for_ids()`
+    los IDs ya se conocen; si no, se leen antes de escribir. Si la escritura afecta menos
+    filas que los IDs pedidos, porque alguno no existe o no cumple el filtro, se vuelven
+    a leer los que quedaron con los valores escritos, para no registrar cambios de
+    registros que no se tocaron.
+    """
+    _ids = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._ids = self._ids
+        return clone
+
+    def for_ids(self, ids):
+        """
+        Filtra por `ids` y los recuerda para avisar los cambios sin volver a leerlos.
+        """
+        clone = self.filter(pk__in=ids)
+        clone._ids = list(ids)
+        return clone
+
+    def _write(self, action, **values):
+        ids = self._ids if self._ids is not None else list(self.values_list("pk", flat=True))
+        if not ids:
+            return 0
+        with transaction.atomic(using=self.db):
+            count = super().update(**values)
+            if count and self._ids is not None and count != len(set(ids)):
+                written = {name: value for name, value in values.items() if not hasattr(value, "resolve_expression")}
+                ids = list(self.model._base_manager.filter(pk__in=ids, **written).values_list("pk", flat=True))
+            if count:
+                records_changed.send(sender=self.model, ids=ids, action=action)
+        return count
+
+    def update(self, **values):
+        """
+        Actualiza los registros y avisa el cambio con `records_changed`.
+        """
+        return self._write(UPSERT, **values)
+
+    def delete(self):
+        """
+        Marca como borrados los registros vivos del QuerySet.
+
+        Returns:
+            tuple: (cantidad, {modelo: cantidad}), como `QuerySet.delete()`.
+        """
+        count = self.alive()._write(DELETE, deleted_at=timezone.now(), version=F("version") + 1)
+        return count, {self.model._meta.label: count}
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Crea los registros con un único INSERT por lote y avisa sus IDs con `records_changed`.
+        """
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            ids = [obj.pk for obj in created if obj.pk is not None]
+            if ids:
+                records_changed.send(sender=self.model, ids=ids, action=UPSERT)
+        return created
+
+    def hard_delete(self):
+        """
+        Elimina físicamente los registros del QuerySet.
+        """
+        return super().delete()
+
+    def alive(self):
+        """
+        Filtra los registros que no fueron borrados.
+        """
+        return self.filter(deleted_at__isnull=True)
+
+    def dead(self):
+        """
+        Filtra los registros borrados lógicamente.
+        """
+        return self.filter(deleted_at__isnull=False)
+
+
+class LiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """
+    Manager por defecto: solo devuelve los registros que no fueron borrados.
+
+    El filtro `deleted_at IS NULL` coincide con la condición del índice parcial de cada
+    modelo, por lo que los listados recorren ese índice y no las filas borradas.
+    """
+
+    def get_queryset(self):
+        """
+        Devuelve el QuerySet de registros vivos.
+        """
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class SoftDeleteModel(models.Model):
+    """
+    Base abstracta de los modelos con borrado lógico.
+
+    Atributos:
+        deleted_at (datetime | None): Momento del borrado, o None si el registro está vivo.
+
+    Managers:
+        objects: Solo los registros vivos.
+        all_objects: Todos los registros, incluidos los borrados.
+    """
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=Q(deleted_at__isnull=True),
+                name="%(app_label)s_%(class)s_live",
+            ),
+        ]
+
+    def delete(self, using=None, keep_parents=False):
+        """
+        Marca el registro como borrado con un único `UPDATE`.
+
+        Returns:
+            tuple: (cantidad, {modelo: cantidad}), como `Model.delete()`.
+        """
+        deleted_at = timezone.now()
+        count = type(self).all_objects.for_ids([self.pk]).alive()._write(
+            DELETE, deleted_at=deleted_at, version=F("version") + 1,
+        )
+        if count:
+            self.deleted_at = deleted_at
+            self.version += 1
+        return count, {self._meta.label: count}
+
+    def hard_delete(self):
+        """
+        Elimina físicamente el registro.
+        """
+        return super().delete()
+
+    @classmethod
+    def purge(cls, before, batch_size):
+        """
+        Elimina físicamente los registros borrados antes de `before`, en lotes.
+
+        Cada lote busca hasta `batch_size` IDs y los elimina en su propia transacción,
+        de modo que ninguna escritura bloquee la base de datos por mucho tiempo. Los
+        registros que siguen referenciados por una relación `PROTECT`, como las recetas
+        de una mascota, se conservan.
+
+        Returns:
+            int: La cantidad de registros eliminados.
+        """
+        expired = cls.all_objects.filter(deleted_at__lt=before)
+        for relation in cls._meta.related_objects:
+            if relation.on_delete is models.PROTECT:
+                references = relation.related_model._base_manager.filter(**{relation.field.attname: OuterRef("pk")})
+                expired = expired.exclude(Exists(references))
+        expired = expired.order_by("pk").values_list("pk", flat=True)
+        total = 0
+        while True:
+            ids = list(expired[:batch_size])
+            if not ids:
+                return total
+            with transaction.atomic():
+                total += cls.all_objects.filter(pk__in=ids).hard_delete()[0]
+
+
+class Client(SoftDeleteModel):
     """
     Modelo que representa a un cliente.
 
@@ -221,6 +473,7 @@ class Client(models.Model):
     phone = models.IntegerField()
     email = models.EmailField()
     city = models.CharField(choices=City.choices,max_length=100)
+    version = models.PositiveIntegerField(default=0)
 
     def _str_(self):
         return self.name
@@ -242,60 +495,24 @@ class Client(models.Model):
         if len(errors.keys()) > 0:
             return False, errors
 
-        Client.objects.create(
+        instance = Client.objects.create(
             name=client_data.get("name"),
             phone=client_data.get("phone"),
             email=client_data.get("email"),
             city=client_data.get("city"),
         )
 
-        return True, None
+        return instance, None
 
     def update_client(self, client_data):
         """
-        Metodo para actualizar los clientes con nuevos datos
-        """
-        pattern_email = r'^[a-zA-Z0-9._%+-]+@vetsoft\.com$'
-        errors = {}
-        self.name = client_data.get("name", "") or self.name
-        self.city = client_data.get("city", "") or self.city
-
-        if (client_data.get("phone", "").isdigit()):
-            self.phone = client_data.get("phone", "") or self.phone
-        email = client_data.get("email", "") or self.email
-        if email:
-            try:
-                if not re.match(pattern_email, email):
-                    errors["email"] = "El email debe terminar con @vetsoft.com y contener algo antes"
-                    self.email = Client.objects.get(pk=self.pk).email
-                    return False, errors
-                self.email= email
-            except ValueError:
-                errors["email"] = "Formato de email inválido"
-                self.email = Client.objects.get(pk=self.pk).email
-                return False, errors
-        phone = client_data.get("phone", "")
-        if phone:
-            try:
-                int (phone)
-                if not phone.startswith("54"):
-                    errors["phone"] = "El telefono debe comenzar con '54'"
-                    self.phone = Client.objects.get(pk=self.pk).phone
-                    return False, errors
-                self.phone = phone
-            except ValueError:
-                errors["phone"] = "Formato de Telefono invalido"
-                self.phone = Client.objects.get(pk=self.pk).phone
-                return False, errors
-
-        if not (client_data.get("name") or client_data.get("email") or client_data.get("adress") or client_data.get("phone")):
-            return True, None
-
-        self.save()
-        return True, None
+        Metodo para actualizar los clientes con nuevos datos.
 
+        Solo se validan y aplican los campos enviados con algún valor.
+        """
+        return update_instance(self, client_data, client_validator)
 
-class Product(models.Model):
+class Product(SoftDeleteModel):
     """
     Modelo que representa un producto en el inventario.
 
@@ -317,6 +534,21 @@ class Product(models.Model):
     type = models.CharField(max_length=50)
     price = models.FloatField()
     stock = models.IntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta(SoftDeleteModel.Meta):
+        # Índice de cobertura del valor del inventario por tipo (`app.reports`): la
+        # consulta agrupada lo recorre ya ordenado por tipo, sin leer la tabla. Incluye
+        # `deleted_at` porque SQLite no considera cubiertas las columnas que solo
+        # aparecen en la condición del índice.
+        indexes = [
+            *SoftDeleteModel.Meta.indexes,
+            models.Index(
+                fields=["type", "price", "stock", "deleted_at"],
+                condition=Q(deleted_at__isnull=True),
+                name="app_product_valuation",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -334,35 +566,86 @@ class Product(models.Model):
         if len(errors.keys()) > 0:
             return False, errors
 
-        Product.objects.create(
+        instance = Product.objects.create(
             name=product_data.get("name"),
             type=product_data.get("type"),
             price=product_data.get("price"),
             stock=product_data.get("stock"),
         )
 
-        return True, None
+        return instance, None
 
     def update_product(self, product_data):
         """
             Actualiza los datos de un producto
         """
-        self.name = product_data.get("name", "") or self.name
-        self.type = product_data.get("type", "") or self.type
-        self.price = product_data.get("price", "") or self.price
-        self.stock = product_data.get("stock", "") or self.stock
+        return update_instance(self, product_data, product_validator)
 
-        try:
-            if (int(self.stock) < 0):
-                raise ValueError("El stock no puede ser negativo.")
-        except ValueError:
-            self.stock = Product.objects.get(pk=self.pk).stock
+    @classmethod
+    def reserved_units(cls, now, sale=None):
+        """
+        Expresión con las unidades retenidas por las reservas vigentes de cada producto.
+
+        Es una subconsulta correlacionada que suma sobre el índice
+        `app_reservation_product` sin leer la tabla de reservas.
+
+        Args:
+            now (datetime): Las reservas que vencen hasta este momento no cuentan.
+            sale (Sale, opcional): Venta cuyas reservas no se cuentan.
+        """
+        held = Reservation.objects.filter(product=OuterRef("pk"), expires_at__gt=now)
+        if sale is not None:
+            held = held.exclude(sale=sale)
+        return Coalesce(
+            Subquery(held.values("product").annotate(total=Sum("quantity")).values("total")),
+            0,
+            output_field=IntegerField(),
+        )
+
+    @classmethod
+    def with_available(cls):
+        """
+        Devuelve los productos con `available`: el stock menos las reservas vigentes,
+        calculado en la misma consulta.
+        """
+        return cls.objects.annotate(available=F("stock") - cls.reserved_units(timezone.now()))
+
+    @classmethod
+    def deduct_stock(cls, quantities, sale=None):
+        """
+        Descuenta varias cantidades de stock con un único `UPDATE` condicionado.
+
+        La condición exige que a cada producto le alcance el stock disponible, es decir,
+        el que no retienen las reservas vigentes de otras ventas; si a alguno no le
+        alcanza, el `UPDATE` se revierte y no se descuenta ninguno.
 
-        self.save()
+        Args:
+            quantities (dict): Cantidad a descontar por ID de producto.
+            sale (Sale, opcional): Venta que se cobra; sus propias reservas no retienen stock.
 
+        Returns:
+            list: Los IDs de los productos sin stock suficiente; vacía si se descontó todo.
+        """
+        reserved = cls.reserved_units(timezone.now(), sale)
+        needed = Case(
+            *(When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()),
+            output_field=IntegerField(),
+        )
+        with transaction.atomic():
+            updated = cls.objects.for_ids(list(quantities)).filter(stock__gte=reserved + needed).update(
+                stock=F("stock") - needed, version=F("version") + 1,
+            )
+            if updated != len(quantities):
+                transaction.set_rollback(True)
+        if updated == len(quantities):
+            return []
+        available = dict(
+            cls.objects.filter(pk__in=quantities).annotate(available=F("stock") - reserved).values_list("pk", "available"),
+        )
+        return [pk for pk, quantity in quantities.items() if available.get(pk, 0) < quantity]
 
 
-class Provider(models.Model):
+class Provider(SoftDeleteModel):
     """
     Modelo que representa un proveedor de productos.
 
@@ -382,6 +665,7 @@ class Provider(models.Model):
     name = models.CharField(max_length=100)
     email = models.EmailField()
     address = models.CharField(max_length=100, blank=True)
+    version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         """
@@ -399,13 +683,13 @@ class Provider(models.Model):
         if len(errors.keys()) > 0:
             return False, errors
 
-        Provider.objects.create(
+        instance = Provider.objects.create(
             name=provider_data.get("name"),
             email=provider_data.get("email"),
             address=provider_data.get("address"),
         )
 
-        return True, None
+        return instance, None
 
     def update_provider(self, provider_data):
         """
@@ -418,16 +702,11 @@ class Provider(models.Model):
         - "address" (str): La nueva dirección del proveedor.
 
     Retorna:
-    None
+    tuple: (True, None) si se actualizó, (False, errores) si los datos no son válidos.
     """
-        self.name = provider_data.get("name", "") or self.name
-        self.email = provider_data.get("email", "") or self.email
-        self.address = provider_data.get("address","") or self.address
+        return update_instance(self, provider_data, provider_validator)
 
-
-        self.save()
-
-class Veterinary(models.Model):
+class Veterinary(SoftDeleteModel):
     """
     Modelo que representa una veterinario.
 
@@ -447,6 +726,7 @@ class Veterinary(models.Model):
     name = models.CharField(max_length=100)
     phone = models.CharField(max_length=15)
     email = models.EmailField()
+    version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -461,23 +741,19 @@ class Veterinary(models.Model):
         if len(errors.keys()) > 0:
             return False, errors
 
-        Veterinary.objects.create(
+        instance = Veterinary.objects.create(
             name=veterinary_data.get("name"),
             phone=veterinary_data.get("phone"),
             email=veterinary_data.get("email"),
         )
 
-        return True, None
+        return instance, None
 
     def update_veterinary(self, veterinary_data):
         """
         Actualiza los datos del veterinario
         """
-        self.name = veterinary_data.get("name", "") or self.name
-        self.email = veterinary_data.get("email", "") or self.email
-        self.phone = veterinary_data.get("phone", "") or self.phone
-
-        self.save()
+        return update_instance(self, veterinary_data, veterinary_validator)
 
 def validate_pet(data):
     """
@@ -491,40 +767,39 @@ def validate_pet(data):
         dict: Un diccionario que contiene los errores de validación.
               Las claves son los nombres de los campos y los valores son los mensajes de error.
     """
-    errors = {}
-
-    name = data.get("name", "")
-    breed = data.get("breed", "")
-    birthday = data.get("birthday", "")
-
-    if name == "":
-        errors["name"] = "Por favor ingrese un nombre"
+    errors = pet_validator(data)
+    if not errors:
+        errors = validate_owner(data)
+    return errors
 
-    if breed == "":
-        errors["breed"] = "Por favor ingrese una raza"
 
-    if birthday == "":
-        errors["birthday"] = "Por favor ingrese una fecha de nacimiento"
-    else:
-        try:
-            birthday_date = datetime.strptime(birthday, "%Y-%m-%d").date()
-            if birthday_date > date.today():
-                errors["birthday"] = "La fecha de nacimiento no puede ser posterior al día actual."
-        except ValueError:
-            errors["birthday"] = "Formato de fecha invalido. Utilice el formato YYYY-MM-DD"
+def validate_owner(data):
+    """
+    Verifica que el dueño indicado en "client_id", si hay uno, sea un cliente existente.
 
-    return errors
+    Returns:
+        dict: El error de "client_id", o un diccionario vacío.
+    """
+    client_id = data.get("client_id")
+    if client_id in (None, "") or Client.objects.filter(pk=client_id).exists():
+        return {}
+    return {"client_id": "Por favor seleccione un dueño válido"}
 
-class Pet(models.Model):
+class Pet(SoftDeleteModel):
     """
     Modelo que representa una mascota.
 
-    Este modelo contiene la información de una mascota, incluyendo su nombre, raza y fecha de nacimiento.
+    Este modelo contiene la información de una mascota, incluyendo su nombre, raza, fecha de nacimiento
+    y dueño.
 
     Atributos:
         name (str): Nombre de la mascota.
         breed (str): Raza de la mascota.
         birthday (date): Fecha de nacimiento de la mascota.
+        client (Client | None): Dueño de la mascota. La clave foránea está indexada, así que
+            las mascotas de un cliente se leen y cuentan sin recorrer toda la tabla.
+        birthday_doy (int): Día del año del nacimiento (ver `day_of_year`), indexado para
+            buscar los próximos cumpleaños.
 
     Métodos:
         __str__: Método para representar el objeto mascota como una cadena.
@@ -542,6 +817,21 @@ class Pet(models.Model):
     name = models.CharField(max_length=100)
     breed = models.CharField(choices=Breed.choices, max_length=50)
     birthday = models.DateField()
+    client = models.ForeignKey(
+        Client, null=True, blank=True, on_delete=models.SET_NULL, related_name="pets", db_index=True,
+    )
+    birthday_doy = DayOfYearField(source="birthday")
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta(SoftDeleteModel.Meta):
+        indexes = [
+            *SoftDeleteModel.Meta.indexes,
+            models.Index(
+                fields=["birthday_doy"],
+                condition=Q(deleted_at__isnull=True),
+                name="app_pet_birthday_doy",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -549,6 +839,52 @@ class Pet(models.Model):
         """
         return self.name
 
+    @staticmethod
+    def birthday_windows(days, today):
+        """
+        Devuelve los rangos de `birthday_doy` de los próximos `days` días, en orden.
+
+        Si la ventana cruza el fin de año se parte en dos rangos. Los nacidos un 29 de
+        febrero cumplen el 28 en los años no bisiestos (ver `next_birthday`).
+        """
+        end = today + timedelta(days=days)
+        first = day_of_year(today)
+        last = day_of_year(end)
+        if (end.month, end.day) == (2, 28) and not calendar.isleap(end.year):
+            last = day_of_year(date(2000, 2, 29))
+
+        if days >= 365:
+            last = first - 1
+        if first <= last:
+            return [(first, last)]
+        return [(first, 366), (1, last)] if last >= 1 else [(first, 366)]
+
+    @classmethod
+    def upcoming_birthdays(cls, days, today):
+        """
+        Devuelve las mascotas que cumplen años entre `today` y `days` días después.
+
+        Hay un QuerySet por rango de `birthday_doy`, cada uno leído en orden del índice
+        parcial; recorrerlos en orden da los cumpleaños del más cercano al más lejano.
+        Una condición `OR` con los dos rangos obligaría a SQLite a recorrer la tabla.
+        """
+        return [
+            cls.objects.filter(birthday_doy__range=window).order_by("birthday_doy", "pk")
+            for window in cls.birthday_windows(days, today)
+        ]
+
+    def next_birthday(self, today):
+        """
+        Devuelve la fecha del próximo cumpleaños, hoy incluido.
+        """
+        for year in (today.year, today.year + 1):
+            if (self.birthday.month, self.birthday.day) == (2, 29) and not calendar.isleap(year):
+                candidate = date(year, 2, 28)
+            else:
+                candidate = self.birthday.replace(year=year)
+            if candidate >= today:
+                return candidate
+
     @classmethod
     def save_pet(cls, pet_data):
         """
@@ -559,45 +895,25 @@ class Pet(models.Model):
         if errors:
             return False, errors
 
-        Pet.objects.create(
+        instance = Pet.objects.create(
             name=pet_data.get("name"),
             breed=pet_data.get("breed"),
             birthday=pet_data.get("birthday"),
+            client_id=pet_data.get("client_id") or None,
         )
 
-        return True, None
+        return instance, None
 
     def update_pet(self, pet_data):
         """
         Actualiza los datos de la mascota
         """
-        errors = {}
-        self.name = pet_data.get("name", self.name)
-        self.breed = pet_data.get("breed", self.breed)
-
-        birthday_str = pet_data.get("birthday", None)
-
-        if birthday_str:
-            try:
-                birthday_date = datetime.strptime(birthday_str, "%Y-%m-%d").date()
-                if birthday_date > date.today():
-                    errors["birthday"] = "La fecha de nacimiento no puede ser posterior al día actual."
-                    self.birthday = Pet.objects.get(pk=self.pk).birthday
-                    return False, errors
-                self.birthday = birthday_date
-            except ValueError:
-                errors["birthday"] = "Formato de fecha inválido. Utilice AAAA-MM-DD."
-                self.birthday = Pet.objects.get(pk=self.pk).birthday
-                return False, errors
-
-        # No se realizan cambios en la mascota si no hay datos válidos proporcionados
-        if not (pet_data.get("name") or pet_data.get("breed") or pet_data.get("birthday")):
-            return True, None
-
-        self.save()
-        return True, None
+        errors = validate_owner(pet_data)
+        if errors:
+            return False, errors
+        return update_instance(self, pet_data, pet_validator)
 
-class Med(models.Model):
+class Med(SoftDeleteModel):
     """
      Modelo que representa un medicamento.
 
@@ -607,6 +923,8 @@ class Med(models.Model):
         name (str): Nombre del medicamento.
         desc (str): Descripción del medicamento.
         dose (float): Dosis del medicamento.
+        product (Product | None): Producto del inventario que se entrega al dispensar
+            una receta del medicamento.
 
     Métodos:
         __str__: Método para representar el objeto medicamento como una cadena.
@@ -616,6 +934,8 @@ class Med(models.Model):
     name = models.CharField(max_length=100)
     desc = models.CharField(max_length=50)
     dose = models.FloatField()
+    product = models.ForeignKey(Product, null=True, blank=True, on_delete=models.SET_NULL, related_name="meds")
+    version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
             return self.name
@@ -630,31 +950,771 @@ class Med(models.Model):
         if len(errors.keys()) > 0:
             return False, errors
 
-        Med.objects.create(
+        instance = Med.objects.create(
             name=med_data.get("name"),
             desc=med_data.get("desc"),
             dose=med_data.get("dose"),
+            product_id=med_data.get("product_id") or None,
         )
-        return True, None
+        return instance, None
 
     def update_med(self, med_data):
         """
-        Actualizar medicina
+        Actualizar medicina. A diferencia del resto, exige todos los campos.
         """
-        errors = validate_med(med_data)
+        errors = validate_med_product(med_data)
+        if errors:
+            return False, errors
+        return update_instance(self, med_data, med_validator, partial=False)
 
-        if len(errors.keys()) > 0:
+
+DISPENSED_MESSAGE = "La receta ya fue dispensada."
+NO_PRODUCT_MESSAGE = "El medicamento no tiene un producto del inventario asociado."
+STOCK_MESSAGE = "No hay stock suficiente para dispensar la receta."
+
+
+def validate_prescription(data):
+    """
+    Valida los datos de una receta y verifica que la mascota, el medicamento y el
+    veterinario existan.
+
+    Returns:
+        dict: Los errores de validación; vacío si los datos son válidos.
+    """
+    errors = prescription_validator(data)
+    if errors:
+        return errors
+
+    if not Pet.objects.filter(pk=data["pet_id"]).exists():
+        return {"pet_id": "Por favor seleccione una mascota válida"}
+    if not Med.objects.filter(pk=data["med_id"]).exists():
+        return {"med_id": "Por favor seleccione un medicamento válido"}
+    if not Veterinary.objects.filter(pk=data["veterinary_id"]).exists():
+        return {"veterinary_id": "Por favor seleccione un veterinario válido"}
+    return {}
+
+
+class Prescription(SoftDeleteModel):
+    """
+    Receta de un medicamento para una mascota.
+
+    Al dispensarla se descuentan `quantity` unidades del producto asociado al
+    medicamento. El índice (pet, prescribed_at) sirve el historial de recetas de cada
+    mascota, ya ordenado, sin recorrer la tabla; no es parcial porque también resuelve
+    si una mascota tiene recetas al purgarla. Las recetas dispensadas son el registro
+    de los movimientos de stock, así que la mascota, el medicamento y el veterinario
+    usan `PROTECT` y la purga los conserva mientras tengan recetas.
+
+    Atributos:
+        pet (Pet): La mascota.
+        med (Med): El medicamento recetado.
+        veterinary (Veterinary): El veterinario que receta.
+        dose (float): La dosis indicada; por defecto, la del medicamento.
+        quantity (int): Unidades del producto a entregar.
+        prescribed_at (datetime): Momento de la receta.
+        dispensed_at (datetime | None): Momento en que se dispensó, o None si está pendiente.
+    """
+    pet = models.ForeignKey(Pet, on_delete=models.PROTECT, related_name="prescriptions", db_index=False)
+    med = models.ForeignKey(Med, on_delete=models.PROTECT, related_name="prescriptions")
+    veterinary = models.ForeignKey(Veterinary, on_delete=models.PROTECT, related_name="prescriptions")
+    dose = models.FloatField()
+    quantity = models.PositiveIntegerField()
+    prescribed_at = models.DateTimeField(default=timezone.now)
+    dispensed_at = models.DateTimeField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta(SoftDeleteModel.Meta):
+        indexes = [
+            *SoftDeleteModel.Meta.indexes,
+            models.Index(fields=["pet", "prescribed_at"], name="app_prescription_pet_history"),
+        ]
+
+    def __str__(self):
+        return f"{self.med_id} para {self.pet_id} ({self.dose} x {self.quantity})"
+
+    @classmethod
+    def save_prescription(cls, prescription_data):
+        """
+        Guarda una receta pendiente; si no se indica la dosis se usa la del medicamento.
+        """
+        errors = validate_prescription(prescription_data)
+        if errors:
             return False, errors
 
-        errors = validate_med(med_data)
+        dose = prescription_data.get("dose") or Med.objects.values_list("dose", flat=True).get(
+            pk=prescription_data["med_id"],
+        )
+        instance = cls.objects.create(
+            pet_id=prescription_data["pet_id"],
+            med_id=prescription_data["med_id"],
+            veterinary_id=prescription_data["veterinary_id"],
+            dose=dose,
+            quantity=prescription_data["quantity"],
+        )
+        return instance, None
 
-        if len(errors.keys()) > 0:
+    @classmethod
+    def history(cls, pet_id):
+        """
+        Devuelve las recetas de la mascota, de la más reciente a la más antigua, con su
+        medicamento y veterinario leídos en la misma consulta.
+        """
+        return cls.objects.filter(pet_id=pet_id).select_related("med", "veterinary").order_by("-prescribed_at")
+
+    def dispense(self):
+        """
+        Dispensa la receta descontando el stock del producto del medicamento.
+
+        En una transacción se marca la receta como dispensada, con un `UPDATE`
+        condicionado a que siga pendiente, y se descuenta el stock con otro `UPDATE`
+        condicionado a que alcance el stock no reservado. Dos dispensas simultáneas no
+        pueden vender más unidades de las que hay ni dispensar dos veces la misma
+        receta: si alguna condición falla, la transacción se revierte.
+
+        Returns:
+            tuple: (True, None) si se dispensó, (False, errores) si no.
+        """
+        product_id = Med.all_objects.values_list("product_id", flat=True).get(pk=self.med_id)
+        if product_id is None:
+            return False, {"med_id": NO_PRODUCT_MESSAGE}
+
+        dispensed_at = timezone.now()
+        with transaction.atomic():
+            marked = Prescription.objects.for_ids([self.pk]).filter(dispensed_at__isnull=True).update(
+                dispensed_at=dispensed_at, version=F("version") + 1,
+            )
+            if not marked:
+                return False, {"dispensed_at": DISPENSED_MESSAGE}
+            if Product.deduct_stock({product_id: self.quantity}):
+                transaction.set_rollback(True)
+                return False, {"quantity": STOCK_MESSAGE}
+
+        self.dispensed_at = dispensed_at
+        self.version += 1
+        return True, None
+
+
+PAID_MESSAGE = "La venta ya fue cobrada."
+EMPTY_SALE_MESSAGE = "La venta no tiene productos."
+
+
+class Sale(SoftDeleteModel):
+    """
+    Venta de mostrador. Mientras `paid_at` es None funciona como carrito; al cobrarla
+    queda como factura.
+
+    El índice parcial sobre `paid_at` sirve el listado de facturas, de la más reciente
+    a la más antigua, sin recorrer los carritos abiertos.
+
+    Atributos:
+        created_at (datetime): Momento en que se abrió la venta.
+        paid_at (datetime | None): Momento del cobro, o None si sigue abierta.
+        total (float): Importe cobrado; se calcula al cobrar.
+    """
+    created_at = models.DateTimeField(default=timezone.now)
+    paid_at = models.DateTimeField(null=True, blank=True)
+    total = models.FloatField(default=0)
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta(SoftDeleteModel.Meta):
+        indexes = [
+            *SoftDeleteModel.Meta.indexes,
+            models.Index(
+                fields=["paid_at"],
+                condition=Q(deleted_at__isnull=True, paid_at__isnull=False),
+                name="app_sale_paid",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Venta {self.pk}"
+
+    def add_line(self, line_data):
+        """
+        Agrega un producto a la venta abierta; si ya estaba, suma la cantidad.
+
+        El precio se copia del producto, así la factura conserva el precio cobrado
+        aunque el producto cambie después. La cantidad total de la línea queda
+        reservada (`Reservation.hold`); si el stock disponible no alcanza no se agrega.
+
+        La transacción empieza con un `UPDATE` condicionado a que la venta siga abierta,
+        que toma el bloqueo de escritura antes de leer: un cobro simultáneo de la misma
+        venta no puede dejar una línea sin descontar.
+
+        Returns:
+            tuple: (SaleLine, None) si se agregó, (False, errores) si no.
+        """
+        errors = sale_line_validator(line_data)
+        if errors:
             return False, errors
-        else:
-            self.name = med_data.get("name", "") or self.name
-            self.desc = med_data.get("desc", "") or self.desc
-            self.dose = med_data.get("dose", "") or self.dose
+        product = Product.objects.filter(pk=line_data["product_id"]).only("name", "price").first()
+        if product is None:
+            return False, {"product_id": "Por favor seleccione un producto válido"}
+
+        quantity = int(line_data["quantity"])
+        with transaction.atomic():
+            if not Sale.objects.for_ids([self.pk]).filter(paid_at__isnull=True).update(version=F("version") + 1):
+                return False, {"paid_at": PAID_MESSAGE}
+            line, created = SaleLine.objects.get_or_create(
+                sale=self, product=product,
+                defaults={"name": product.name, "price": product.price, "quantity": quantity},
+            )
+            if not created:
+                SaleLine.objects.filter(pk=line.pk).update(quantity=F("quantity") + quantity)
+                line.quantity += quantity
+            if not Reservation.hold(self, product.pk, line.quantity):
+                transaction.set_rollback(True)
+                return False, {"quantity": f"No hay stock disponible suficiente de {product.name}."}
+        self.version += 1
+        return line, None
+
+    def remove_line(self, line_id):
+        """
+        Quita una línea de la venta abierta y libera su reserva.
 
-        self.save()
+        Returns:
+            bool: True si la línea se quitó.
+        """
+        if self.paid_at is not None:
+            return False
+        line = self.lines.filter(pk=line_id).first()
+        if line is None:
+            return False
+        with transaction.atomic():
+            line.delete()
+            if self.reservations.filter(product_id=line.product_id).delete()[0]:
+                reservations_changed.send(sender=Reservation, product_ids=[line.product_id])
+        return True
+
+    def discard(self):
+        """
+        Descarta la venta abierta y libera sus reservas.
+        """
+        with transaction.atomic():
+            product_ids = list(self.reservations.values_list("product_id", flat=True))
+            if product_ids:
+                self.reservations.all().delete()
+                reservations_changed.send(sender=Reservation, product_ids=product_ids)
+            self.delete()
+
+    def checkout(self):
+        """
+        Cobra la venta y descuenta el stock de todas sus líneas.
+
+        En una transacción se marca la venta como cobrada, con un `UPDATE` condicionado
+        a que siga abierta, se descuentan todas las líneas con un único `UPDATE`
+        condicionado (`Product.deduct_stock`) y se borran las reservas de la venta, que
+        pasan a ser el descuento. Si a alguna línea no le alcanza el stock que no
+        reservaron otras ventas, la transacción se revierte y la venta sigue abierta;
+        dos cobros simultáneos no pueden vender más unidades de las que hay ni cobrar
+        dos veces la misma venta.
+
+        Returns:
+            tuple: (True, None) si se cobró, (False, errores) si no.
+        """
+        lines = list(self.lines.values_list("product_id", "name", "price", "quantity"))
+        if not lines:
+            return False, {"lines": EMPTY_SALE_MESSAGE}
+
+        paid_at = timezone.now()
+        total = sum(price * quantity for _, _, price, quantity in lines)
+        with transaction.atomic():
+            marked = Sale.objects.for_ids([self.pk]).filter(paid_at__isnull=True).update(
+                paid_at=paid_at, total=total, version=F("version") + 1,
+            )
+            if not marked:
+                return False, {"paid_at": PAID_MESSAGE}
+            short = Product.deduct_stock({product_id: quantity for product_id, _, _, quantity in lines}, sale=self)
+            if short:
+                transaction.set_rollback(True)
+                names = ", ".join(name for product_id, name, _, _ in lines if product_id in short)
+                return False, {"stock": f"No hay stock suficiente de: {names}."}
+            self.reservations.all().delete()
+
+        self.paid_at, self.total = paid_at, total
+        self.version += 1
         return True, None
 
+
+class SaleLine(models.Model):
+    """
+    Línea de una venta: un producto, la cantidad y el precio unitario cobrado.
+
+    El nombre y el precio se copian del producto al agregarlo, de modo que la factura
+    no cambia si el producto se edita o se borra. La restricción única (sale, product)
+    también sirve de índice para leer las líneas de una venta.
+    """
+    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name="lines", db_index=False)
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, related_name="sale_lines")
+    name = models.CharField(max_length=100)
+    price = models.FloatField()
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sale", "product"], name="app_saleline_once"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} x {self.quantity}"
+
+    @property
+    def subtotal(self):
+        """
+        Importe de la línea.
+        """
+        return self.price * self.quantity
+
+
+class Reservation(models.Model):
+    """
+    Unidades de un producto retenidas por una venta abierta hasta `expires_at`.
+
+    El stock disponible de un producto es su stock menos las reservas vigentes
+    (`Product.with_available`); las vencidas dejan de contar aunque sigan en la tabla
+    hasta que `manage.py sweep_reservations` las borra. El índice (product,
+    expires_at, quantity) resuelve la suma de las reservas vigentes de un producto sin
+    leer la tabla, y el índice sobre `expires_at` sirve el barrido. Cada alta, cambio o
+    borrado de reservas envía `reservations_changed` con los productos afectados.
+
+    Atributos:
+        sale (Sale): La venta que reserva.
+        product (Product): El producto reservado.
+        quantity (int): Unidades reservadas.
+        expires_at (datetime): Momento en que vence la reserva.
+    """
+    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name="reservations", db_index=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reservations", db_index=False)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["sale", "product"], name="app_reservation_once"),
+        ]
+        indexes = [
+            models.Index(fields=["product", "expires_at", "quantity"], name="app_reservation_product"),
+            models.Index(fields=["expires_at"], name="app_reservation_expires"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} x {self.quantity} hasta {self.expires_at}"
+
+    @classmethod
+    def hold(cls, sale, product_id, quantity):
+        """
+        Reserva `quantity` unidades del producto para la venta durante
+        `RESERVATION_MINUTES` minutos, en lugar de su reserva anterior.
+
+        Debe llamarse dentro de una transacción, que el llamador revierte si no hay
+        stock disponible. Después de escribir la reserva se bloquea el producto (`SELECT
+        ... FOR UPDATE`; en SQLite la transacción ya tiene el bloqueo de escritura) y
+        el total reservado se suma en otra consulta, de modo que dos reservas
+        simultáneas del mismo producto se serializan y la segunda ve la primera.
+
+        Returns:
+            bool: True si el stock alcanza para todas las reservas vigentes.
+        """
+        now = timezone.now()
+        cls.objects.update_or_create(
+            sale=sale, product_id=product_id,
+            defaults={"quantity": quantity, "expires_at": now + timedelta(minutes=settings.RESERVATION_MINUTES)},
+        )
+        stock = Product.objects.select_for_update().values_list("stock", flat=True).get(pk=product_id)
+        held = cls.objects.filter(product_id=product_id, expires_at__gt=now).aggregate(total=Sum("quantity"))["total"]
+        reservations_changed.send(sender=cls, product_ids=[product_id])
+        return held <= stock
+
+    @classmethod
+    def sweep(cls, now, batch_size):
+        """
+        Borra las reservas vencidas hasta `now`, en lotes de `batch_size` recorridos
+        por el índice de `expires_at`, cada uno en su propia transacción.
+
+        Returns:
+            int: La cantidad de reservas borradas.
+        """
+        expired = cls.objects.filter(expires_at__lte=now).order_by("expires_at").values_list("pk", "product_id")
+        total = 0
+        while True:
+            rows = list(expired[:batch_size])
+            if not rows:
+                return total
+            with transaction.atomic():
+                total += cls.objects.filter(pk__in=[pk for pk, _ in rows]).delete()[0]
+                reservations_changed.send(sender=cls, product_ids=list({product_id for _, product_id in rows}))
+
+
+OVERLAP_MESSAGE = "El veterinario ya tiene un turno en ese horario."
+
+
+def max_appointment_duration():
+    """
+    Devuelve la duración máxima de un turno (`APPOINTMENT_MAX_MINUTES`).
+    """
+    return timedelta(minutes=settings.APPOINTMENT_MAX_MINUTES)
+
+
+def parse_moment(value):
+    """
+    Convierte una fecha y hora ISO 8601 en un datetime con zona horaria.
+
+    Los valores sin zona horaria se interpretan en la zona horaria actual.
+    """
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def validate_appointment(data):
+    """
+    Valida los datos completos de un turno.
+
+    Además de los campos, verifica que el turno termine después de empezar, que no
+    supere la duración máxima y que la mascota y el veterinario existan.
+
+    Returns:
+        dict: Los errores de validación; vacío si los datos son válidos.
+    """
+    errors = appointment_validator(data)
+    if errors:
+        return errors
+
+    start, end = parse_moment(data["start"]), parse_moment(data["end"])
+    if end <= start:
+        return {"end": "El turno debe terminar después de empezar."}
+    if end - start > max_appointment_duration():
+        return {"end": f"El turno no puede durar más de {settings.APPOINTMENT_MAX_MINUTES} minutos."}
+    if not Pet.objects.filter(pk=data["pet_id"]).exists():
+        return {"pet_id": "Por favor seleccione una mascota válida"}
+    if not Veterinary.objects.filter(pk=data["veterinary_id"]).exists():
+        return {"veterinary_id": "Por favor seleccione un veterinario válido"}
+    return {}
+
+
+def lock_veterinary(veterinary_id):
+    """
+    Bloquea la fila del veterinario hasta el fin de la transacción actual.
+
+    Serializa las reservas de un mismo veterinario en las bases que admiten
+    `SELECT ... FOR UPDATE`. SQLite no lo necesita: la primera escritura de la
+    transacción toma el bloqueo de escritura de toda la base.
+    """
+    if connection.features.has_select_for_update:
+        list(Veterinary.objects.select_for_update().filter(pk=veterinary_id).values_list("pk"))
+
+
+class Appointment(SoftDeleteModel):
+    """
+    Turno de una mascota con un veterinario.
+
+    El índice compuesto (veterinary, start), parcial sobre los turnos vivos, resuelve
+    la detección de superposiciones con una sola consulta por rango: como ningún turno
+    dura más que `APPOINTMENT_MAX_MINUTES`, los que pueden pisarse con [start, end)
+    empiezan dentro de (start - duración máxima, end).
+
+    Atributos:
+        pet (Pet): La mascota atendida.
+        veterinary (Veterinary): El veterinario que atiende.
+        start (datetime): Inicio del turno.
+        end (datetime): Fin del turno (excluido).
+    """
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="appointments")
+    veterinary = models.ForeignKey(
+        Veterinary, on_delete=models.CASCADE, related_name="appointments", db_index=False,
+    )
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta(SoftDeleteModel.Meta):
+        indexes = [
+            *SoftDeleteModel.Meta.indexes,
+            models.Index(
+                fields=["veterinary", "start"],
+                condition=Q(deleted_at__isnull=True),
+                name="app_appointment_vet_start",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.pet_id} con {self.veterinary_id} ({self.start:%Y-%m-%d %H:%M})"
+
+    @classmethod
+    def overlapping(cls, veterinary_id, start, end):
+        """
+        Devuelve los turnos del veterinario que se superponen con [start, end).
+        """
+        return cls.objects.filter(
+            veterinary_id=veterinary_id,
+            start__gt=start - max_appointment_duration(),
+            start__lt=end,
+            end__gt=start,
+        )
+
+    def conflicts(self):
+        """
+        Devuelve los otros turnos del veterinario que se superponen con este.
+        """
+        return Appointment.overlapping(self.veterinary_id, self.start, self.end).exclude(pk=self.pk)
+
+    @classmethod
+    def save_appointment(cls, appointment_data):
+        """
+        Reserva un turno si el veterinario está libre en ese horario.
+
+        El turno se inserta y luego se buscan superposiciones dentro de la misma
+        transacción, que se revierte si aparece alguna. Así dos reservas simultáneas
+        del mismo horario no pueden confirmarse ambas.
+        """
+        errors = validate_appointment(appointment_data)
+        if errors:
+            return False, errors
+
+        with transaction.atomic():
+            lock_veterinary(appointment_data["veterinary_id"])
+            instance = cls.objects.create(
+                pet_id=appointment_data["pet_id"],
+                veterinary_id=appointment_data["veterinary_id"],
+                start=parse_moment(appointment_data["start"]),
+                end=parse_moment(appointment_data["end"]),
+            )
+            if instance.conflicts().exists():
+                transaction.set_rollback(True)
+                return False, {"start": OVERLAP_MESSAGE}
+        return instance, None
+
+    def update_appointment(self, appointment_data):
+        """
+        Modifica el turno con la misma verificación de superposiciones que `save_appointment`.
+        """
+        data = {"version": appointment_data.get("version")}
+        for name in appointment_validator.names:
+            value = appointment_data.get(name)
+            data[name] = getattr(self, name) if value is None or value == "" else value
+        errors = validate_appointment(data)
+        if errors:
+            return False, errors
+        data["start"], data["end"] = parse_moment(data["start"]), parse_moment(data["end"])
+        previous_start = self.start
+
+        with transaction.atomic():
+            lock_veterinary(data["veterinary_id"])
+            saved, errors = update_instance(self, data, appointment_validator)
+            overlap = saved and self.conflicts().exists()
+            if overlap:
+                transaction.set_rollback(True)
+        if overlap:
+            self.refresh_from_db()
+            return False, {"start": OVERLAP_MESSAGE}
+        if saved and self.start != previous_start:
+            appointment_moved.send(sender=Appointment, instance=self, previous_start=previous_start)
+        return saved, errors
+
+    @classmethod
+    def free_slots(cls, veterinary_id, day, duration=None):
+        """
+        Calcula los huecos libres del veterinario en el horario de atención de `day`.
+
+        Lee los turnos del día con una consulta por rango sobre el índice (veterinary,
+        start), ya ordenados por inicio, y los recorre una sola vez avanzando un cursor
+        hasta el fin del último turno visto.
+
+        Args:
+            veterinary_id (int): El veterinario.
+            day (date): El día a consultar.
+            duration (timedelta, opcional): Duración mínima de un hueco; por defecto
+                `APPOINTMENT_SLOT_MINUTES`.
+
+        Returns:
+            list[tuple[datetime, datetime]]: Los huecos libres, en orden.
+        """
+        duration = duration or timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+        opening = timezone.make_aware(datetime.combine(day, settings.CLINIC_OPENING))
+        closing = timezone.make_aware(datetime.combine(day, settings.CLINIC_CLOSING))
+
+        slots = []
+        cursor = opening
+        booked = cls.overlapping(veterinary_id, opening, closing).order_by("start").values_list("start", "end")
+        for start, end in booked:
+            if start - cursor >= duration:
+                slots.append((cursor, start))
+            cursor = max(cursor, end)
+        if closing - cursor >= duration:
+            slots.append((cursor, closing))
+        return slots
+
+
+class Schedule(SoftDeleteModel):
+    """
+    Plan de vacunación o de tratamiento de una mascota.
+
+    `next_due` es la fecha de la próxima dosis, o None si el plan ya se completó. El
+    índice parcial (next_due, id) sobre los planes vivos y pendientes permite que el
+    generador de recordatorios recorra solo los planes vencidos, en orden y por bloques.
+
+    Atributos:
+        pet (Pet): La mascota.
+        kind (str): Vacuna o Tratamiento.
+        name (str): Nombre de la vacuna o del tratamiento.
+        interval_days (int | None): Días entre dosis, o None si es una dosis única.
+        next_due (date | None): Fecha de la próxima dosis.
+    """
+    class Kind(models.TextChoices):
+        Vacuna = "Vacuna"
+        Tratamiento = "Tratamiento"
+
+    pet = models.ForeignKey(Pet, on_delete=models.CASCADE, related_name="schedules")
+    kind = models.CharField(choices=Kind.choices, max_length=20)
+    name = models.CharField(max_length=100)
+    interval_days = models.PositiveIntegerField(null=True, blank=True)
+    next_due = models.DateField(null=True, blank=True)
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta(SoftDeleteModel.Meta):
+        indexes = [
+            *SoftDeleteModel.Meta.indexes,
+            models.Index(
+                fields=["next_due", "id"],
+                condition=Q(deleted_at__isnull=True, next_due__isnull=False),
+                name="app_schedule_next_due",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.name}"
+
+    @classmethod
+    def save_schedule(cls, pet, schedule_data):
+        """
+        Guarda un plan para la mascota `pet`.
+        """
+        errors = schedule_validator(schedule_data)
+        if errors:
+            return False, errors
+
+        instance = cls.objects.create(pet=pet, **schedule_validator.values(schedule_data))
+        return instance, None
+
+    @classmethod
+    def due(cls, day):
+        """
+        Devuelve los planes con una dosis vencida o que vence el día `day`.
+        """
+        return cls.objects.filter(next_due__lte=day)
+
+    def apply_dose(self, day):
+        """
+        Registra la dosis aplicada el día `day` y calcula la siguiente.
+
+        Si el plan es de dosis única queda completo (`next_due` en None).
+        """
+        next_due = day + timedelta(days=self.interval_days) if self.interval_days else None
+        Schedule.objects.for_ids([self.pk]).update(next_due=next_due, version=F("version") + 1)
+        self.next_due = next_due
+        self.version += 1
+
+
+class Reminder(models.Model):
+    """
+    Recordatorio de una dosis vencida, generado por `manage.py generate_reminders`.
+
+    La restricción única (schedule, due_on) hace idempotente la generación: un plan
+    vencido tiene un solo recordatorio por fecha de vencimiento aunque el comando se
+    ejecute varias veces.
+
+    Atributos:
+        schedule (Schedule): El plan vencido.
+        due_on (date): La fecha de vencimiento de la dosis.
+        created_at (datetime): Momento en que se generó.
+    """
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name="reminders", db_index=False)
+    due_on = models.DateField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["schedule", "due_on"], name="app_reminder_once")]
+
+
+class ReminderRun(models.Model):
+    """
+    Avance de la generación de recordatorios de un día.
+
+    Después de cada bloque se guarda el último plan procesado, en la misma transacción
+    que sus recordatorios, para que una ejecución interrumpida continúe desde ahí.
+
+    Atributos:
+        day (date): El día para el que se generan los recordatorios.
+        last_due (date | None): `next_due` del último plan procesado.
+        last_id (int): ID del último plan procesado.
+        processed (int): Cantidad de planes vencidos procesados.
+        finished_at (datetime | None): Momento en que terminó, o None si no terminó.
+    """
+    day = models.DateField(unique=True)
+    last_due = models.DateField(null=True)
+    last_id = models.BigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True)
+
+
+class Change(models.Model):
+    """
+    Entrada del registro de cambios que alimenta la sincronización incremental.
+
+    `seq` es autoincremental y SQLite no reutiliza sus valores aunque se borren filas,
+    por lo que crece de forma monótona y sirve como cursor de `/api/changes/`.
+
+    Atributos:
+        seq (int): Número de secuencia del cambio.
+        resource (str): Nombre del recurso de la API ("clients", "pets", ...).
+        object_id (int): ID del registro modificado.
+        action (str): UPSERT si el registro se creó o modificó, DELETE si se borró.
+        created_at (datetime): Momento del cambio.
+    """
+    seq = models.BigAutoField(primary_key=True)
+    resource = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=[(UPSERT, UPSERT), (DELETE, DELETE)])
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["resource", "object_id", "seq"], name="app_change_object")]
+
+
+class ChangeLogState(models.Model):
+    """
+    Estado de la compactación del registro de cambios (una sola fila).
+
+    Atributos:
+        horizon (int): Mayor `seq` de un borrado descartado por la compactación. Un cliente
+            sincronizado hasta antes de ese número pudo perder borrados y debe descargar todo.
+    """
+    horizon = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        """
+        Devuelve la única fila de estado, creándola si no existe.
+        """
+        return cls.objects.get_or_create(pk=1)[0]
+
+
+class SummaryCount(models.Model):
+    """
+    Contador de una tabla resumen del tablero de inicio.
+
+    Lo mantienen los triggers que instala `app.summaries`, no el código de Python.
+
+    Atributos:
+        summary (str): Nombre del resumen ("clients_by_city", "pets_by_breed", ...).
+        key (str): Grupo dentro del resumen (una ciudad, una raza, un día); vacío si el
+            resumen es un único total.
+        count (int): Cantidad de registros vivos del grupo.
+    """
+    summary = models.CharField(max_length=30)
+    key = models.CharField(max_length=50, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["summary", "key"], name="app_summarycount_key")]
@@ -0,0 +1,206 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+
+PROFILE_SALT = "app.profiling"
+PROFILE_HEADER = "HTTP_X_VETSOFT_PROFILE"
+PROFILE_PARAM = "profile"
+
+
+def make_profile_token():
+    """
+    Genera un token firmado que habilita el perfilado de una solicitud.
+
+    Returns:
+        str: El token a enviar en el header `X-Vetsoft-Profile`.
+    """
+    return signing.dumps({"profile": True}, salt=PROFILE_SALT)
+
+
+def is_valid_profile_token(token):
+    """
+    Verifica la firma y la vigencia de un token de perfilado.
+    """
+    try:
+        signing.loads(token, salt=PROFILE_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def should_profile(request):
+    """
+    Indica si la solicitud pidió ser perfilada.
+
+    Se perfila cuando llega un token firmado válido en el header `X-Vetsoft-Profile`,
+    o cuando un usuario staff agrega `?profile=1` a la URL.
+    """
+    token = request.META.get(PROFILE_HEADER)
+    if token:
+        return is_valid_profile_token(token)
+
+    if request.GET.get(PROFILE_PARAM) != "1":
+        return False
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+async def ashould_profile(request):
+    """
+    Variante asíncrona de `should_profile`: carga el usuario con `request.auser()`.
+    """
+    token = request.META.get(PROFILE_HEADER)
+    if token:
+        return is_valid_profile_token(token)
+
+    if request.GET.get(PROFILE_PARAM) != "1" or not hasattr(request, "auser"):
+        return False
+    user = await request.auser()
+    return user.is_staff
+
+
+class StackSampler:
+    """
+    Profiler por muestreo que toma la pila de un hilo cada `interval` segundos.
+
+    Las pilas se acumulan en formato "collapsed" (frames separados por ';'), que es
+    el formato de entrada de flamegraph.pl y speedscope.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """
+        Comienza a tomar muestras en un hilo en segundo plano.
+        """
+        self._thread.start()
+
+    def stop(self):
+        """
+        Detiene el muestreo y espera a que termine el hilo.
+        """
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def write(self, path):
+        """
+        Escribe las pilas acumuladas en `path`, una por línea con su cantidad de muestras.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class ProfilerMiddleware:
+    """
+    Middleware que perfila la vista de las solicitudes que lo piden.
+
+    Por cada solicitud perfilada guarda en `PROFILE_DIR` un volcado de pstats (`.prof`)
+    generado con cProfile y un archivo de pilas colapsadas (`.collapsed`) generado
+    por muestreo, ambos con el mismo prefijo.
+
+    Admite los modos síncrono y asíncrono; en el asíncrono `process_view` se reemplaza
+    por `aprocess_view` para que Django no lo ejecute en un hilo en cada solicitud.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        """
+        Procesa la solicitud sin cambios; el perfilado ocurre en `process_view`.
+        """
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Ejecuta la vista bajo cProfile y el muestreador si la solicitud lo pidió.
+        """
+        if not should_profile(request):
+            return None
+        return self.profile(request, view_func, view_args, view_kwargs)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Variante de `process_view` para el modo asíncrono.
+
+        Las vistas síncronas se perfilan en el hilo donde se ejecutan. Las asíncronas
+        se perfilan en el event loop, así que el perfil también incluye lo que hayan
+        ejecutado otras solicitudes concurrentes mientras la vista esperaba.
+        """
+        if not await ashould_profile(request):
+            return None
+        if not iscoroutinefunction(view_func):
+            return await sync_to_async(self.profile)(request, view_func, view_args, view_kwargs)
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL)
+        sampler.start()
+        profiler.enable()
+        try:
+            response = await view_func(request, *view_args, **view_kwargs)
+        finally:
+            profiler.disable()
+            sampler.stop()
+        return self.save(request, response, profiler, sampler)
+
+    def profile(self, request, view_func, view_args, view_kwargs):
+        """
+        Ejecuta una vista síncrona bajo cProfile y el muestreador y guarda el perfil.
+        """
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL)
+        sampler.start()
+        try:
+            response = profiler.runcall(view_func, request, *view_args, **view_kwargs)
+        finally:
+            sampler.stop()
+        return self.save(request, response, profiler, sampler)
+
+    def save(self, request, response, profiler, sampler):
+        """
+        Guarda el `.prof` y el `.collapsed` en `PROFILE_DIR` e indica el prefijo en la respuesta.
+        """
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        view_name = request.resolver_match.view_name if request.resolver_match else "view"
+        prefix = f"{time.strftime('%Y%m%d-%H%M%S')}-{view_name}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(directory / f"{prefix}.prof")
+        sampler.write(directory / f"{prefix}.collapsed")
+        response["X-Vetsoft-Profile"] = prefix
+        return response
@@ -0,0 +1,62 @@
+"""
+Generación diaria de recordatorios de vacunas y tratamientos vencidos.
+
+Los planes vencidos se recorren por bloques ordenados por (next_due, id), sobre el
+índice parcial `app_schedule_next_due`, con una consulta por bloque que continúa desde
+el último plan visto. Cada bloque se guarda con un `bulk_create` en su propia
+transacción junto con el avance de `ReminderRun`; la memoria usada no depende de la
+cantidad de planes, y una ejecución interrumpida retoma desde el último bloque confirmado.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Reminder, ReminderRun, Schedule
+
+
+def generate_reminders(day, chunk_size, restart=False):
+    """
+    Genera los recordatorios de los planes vencidos al día `day`.
+
+    Es idempotente: los recordatorios que ya existen se ignoran gracias a la
+    restricción única (schedule, due_on), y un día ya terminado no se vuelve a recorrer
+    salvo con `restart`.
+
+    Args:
+        day (date): El día de referencia.
+        chunk_size (int): Cantidad de planes por bloque.
+        restart (bool): Si es True, recorre de nuevo todos los planes vencidos.
+
+    Returns:
+        ReminderRun: El avance del día.
+    """
+    run, _ = ReminderRun.objects.get_or_create(day=day)
+    if restart:
+        run.last_due, run.last_id, run.processed, run.finished_at = None, 0, 0, None
+        run.save()
+    if run.finished_at is not None:
+        return run
+
+    due = Schedule.due(day).order_by("next_due", "pk").values_list("pk", "next_due")
+    while True:
+        page = due
+        if run.last_due is not None:
+            page = due.filter(next_due__gte=run.last_due).filter(
+                Q(next_due__gt=run.last_due) | Q(pk__gt=run.last_id),
+            )
+        rows = list(page[:chunk_size])
+        if not rows:
+            break
+
+        with transaction.atomic():
+            Reminder.objects.bulk_create(
+                [Reminder(schedule_id=pk, due_on=next_due) for pk, next_due in rows],
+                ignore_conflicts=True,
+            )
+            run.last_id, run.last_due = rows[-1]
+            run.processed += len(rows)
+            run.save(update_fields=["last_due", "last_id", "processed"])
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=["finished_at"])
+    return run
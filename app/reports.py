@@ -0,0 +1,122 @@
+"""
+Reportes de gerencia: valor del inventario por tipo de producto y productos más vendidos.
+
+Todas las cifras se calculan en la base de datos con `annotate`/`aggregate`: cada
+tabla es una consulta agrupada y el puesto de cada fila es una función de ventana
+(`RANK() OVER (ORDER BY ...)`) sobre el agregado del grupo, de modo que los empates
+comparten puesto. Ninguna consulta trae los productos o las líneas a Python.
+
+`report()` guarda el resultado en la caché con una clave que incluye un token de la
+versión de los datos. Los receptores de `connect()` reemplazan el token cuando cambian
+productos o ventas; el resultado anterior deja de leerse y vence solo.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Sum, Window
+from django.db.models.functions import Rank
+from django.db.models.signals import post_save
+
+from .models import Product, Sale, SaleLine, records_changed
+
+VERSION_KEY = "reports:version"
+
+
+def inventory_value():
+    """
+    Devuelve el valor del inventario (`price * stock`) agrupado por tipo de producto,
+    del tipo más valioso al menos valioso.
+
+    Returns:
+        list: Un diccionario por tipo con type, products, units, value y rank.
+    """
+    value = Sum(F("price") * F("stock"), output_field=FloatField())
+    return list(
+        Product.objects.values("type").annotate(
+            products=Count("pk"),
+            units=Sum("stock"),
+            value=value,
+            rank=Window(Rank(), order_by=value.desc()),
+        ).order_by("rank", "type"),
+    )
+
+
+def inventory_totals():
+    """
+    Devuelve la cantidad de productos, las unidades y el valor total del inventario.
+    """
+    return Product.objects.aggregate(
+        products=Count("pk"),
+        units=Sum("stock", default=0),
+        value=Sum(F("price") * F("stock"), output_field=FloatField(), default=0),
+    )
+
+
+def top_sellers(limit):
+    """
+    Devuelve los productos más vendidos por unidades en las ventas cobradas.
+
+    El puesto se filtra sobre la función de ventana, así que un empate en el último
+    puesto devuelve más de `limit` filas.
+
+    Returns:
+        list: Un diccionario por producto con product_id, name, units, revenue y rank.
+    """
+    units = Sum("quantity")
+    return list(
+        SaleLine.objects.filter(
+            sale__paid_at__isnull=False, sale__deleted_at__isnull=True, product__isnull=False,
+        ).values("product_id").annotate(
+            name=F("product__name"),
+            units=units,
+            revenue=Sum(F("price") * F("quantity"), output_field=FloatField()),
+            rank=Window(Rank(), order_by=units.desc()),
+        ).filter(rank__lte=limit).order_by("rank", "name"),
+    )
+
+
+def new_token():
+    """
+    Genera un token de versión; al ser aleatorio, un token desalojado no vuelve a
+    coincidir con el resultado que se guardó con él.
+    """
+    return uuid4().hex
+
+
+def report():
+    """
+    Devuelve las cifras de la página de reportes, desde la caché si están vigentes.
+
+    El token se lee antes de consultar: si un cambio se confirma mientras se calculan
+    las cifras, quedan guardadas con un token que ya fue reemplazado.
+    """
+    token = cache.get_or_set(VERSION_KEY, new_token, None)
+    key = f"reports:data:{token}"
+    data = cache.get(key)
+    if data is None:
+        data = {
+            "inventory": inventory_value(),
+            "totals": inventory_totals(),
+            "top_sellers": top_sellers(settings.REPORT_TOP_SELLERS),
+        }
+        cache.set(key, data, settings.REPORT_CACHE_SECONDS)
+    return data
+
+
+def invalidate(**kwargs):
+    """
+    Reemplaza el token de versión al confirmarse la transacción; receptor de los
+    cambios de productos y ventas.
+    """
+    transaction.on_commit(lambda: cache.delete(VERSION_KEY))
+
+
+def connect():
+    """
+    Conecta los receptores que invalidan los reportes en caché.
+    """
+    for model in (Product, Sale):
+        post_save.connect(invalidate, sender=model, dispatch_uid=f"reports.save.{model.__name__}")
+        records_changed.connect(invalidate, sender=model, dispatch_uid=f"reports.bulk.{model.__name__}")
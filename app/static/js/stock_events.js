@@ -0,0 +1,25 @@
+// Actualiza las celdas de stock y de stock disponible del repositorio de productos con los eventos del servidor.
+(function () {
+    const url = document.currentScript.dataset.url;
+    if (!url || !window.EventSource) {
+        return;
+    }
+
+    const source = new EventSource(url);
+    source.addEventListener("stock", (event) => {
+        const message = JSON.parse(event.data);
+        const cell = document.querySelector(`[data-stock-id="${message.id}"]`);
+        if (!cell) {
+            return;
+        }
+        if (message.deleted) {
+            cell.closest("tr").remove();
+            return;
+        }
+        cell.textContent = message.stock;
+        const available = document.querySelector(`[data-available-id="${message.id}"]`);
+        if (available) {
+            available.textContent = message.available;
+        }
+    });
+})();
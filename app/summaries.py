@@ -0,0 +1,218 @@
+"""
+Tablas resumen del tablero de inicio: clientes por ciudad, mascotas por raza, productos
+sin stock y turnos por día.
+
+Cada resumen es un conjunto de filas `SummaryCount` (resumen, clave, cantidad) que
+mantienen triggers de SQLite sobre la tabla de origen. Al insertar, modificar o borrar
+una fila, el trigger descuenta su aporte anterior y suma el nuevo con un
+`INSERT ... ON CONFLICT DO UPDATE SET count = count + ...`, dentro de la misma
+sentencia. Así cada escritura sigue siendo una sola sentencia para Django, el costo
+depende de las filas escritas y no del tamaño de las tablas, y también se cuentan las
+escrituras en lote y con SQL directo. `dashboard()` lee el tablero completo con una
+única consulta sobre `SummaryCount`, cuyo tamaño está acotado por las ciudades, razas y
+días con turnos.
+
+La migración 0025 instala los triggers con una copia fija de estas definiciones. SQLite
+borra los triggers de una tabla cuando una migración la reconstruye (por ejemplo, al
+modificar una columna); `ensure_triggers()`, conectado a `post_migrate`, detecta al final
+de cada `migrate` los que faltan y llama a `rebuild()`, que vuelve a crearlos y recalcula
+los contadores desde cero. `manage.py rebuild_summaries` hace lo mismo a pedido.
+
+Los triggers usan la sintaxis de SQLite. En otras bases la migración no los instala,
+`ensure_triggers()` no hace nada y `dashboard()` calcula las cifras con consultas
+agrupadas sobre las tablas de origen (ver `from_tables()`).
+"""
+from collections import namedtuple
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db import connection as default_connection
+from django.db.models import Count, Q
+
+from .models import Appointment, Client, Pet, Product, SummaryCount
+
+CLIENTS_BY_CITY = "clients_by_city"
+PETS_BY_BREED = "pets_by_breed"
+PRODUCTS_OUT_OF_STOCK = "products_out_of_stock"
+APPOINTMENTS_BY_DAY = "appointments_by_day"
+
+# `key` y `condition` son SQL sobre una fila de la tabla, nombrada `{row}`; `columns`
+# son las columnas de las que dependen, además de `deleted_at`. `date()` toma el día en
+# UTC, la zona en la que Django guarda los horarios; coincide con el día local mientras
+# TIME_ZONE sea UTC.
+Summary = namedtuple("Summary", "name model columns key condition")
+
+SUMMARIES = (
+    Summary(CLIENTS_BY_CITY, Client, ["city"], "{row}.city", "{row}.deleted_at IS NULL"),
+    Summary(PETS_BY_BREED, Pet, ["breed"], "{row}.breed", "{row}.deleted_at IS NULL"),
+    Summary(PRODUCTS_OUT_OF_STOCK, Product, ["stock"], "''", "{row}.deleted_at IS NULL AND {row}.stock = 0"),
+    Summary(APPOINTMENTS_BY_DAY, Appointment, ["start"], "date({row}.start)", "{row}.deleted_at IS NULL"),
+)
+
+TRIGGER_EVENTS = ("insert", "update", "delete")
+
+
+def trigger_name(summary, event):
+    """
+    Devuelve el nombre del trigger de `summary` para `event` ("insert", "update" o "delete").
+    """
+    return f"app_summary_{summary.name}_{event}"
+
+
+def add_sql(summary, row, amount):
+    """
+    Devuelve la sentencia que suma `amount` al contador de la fila `row` ("NEW" u "OLD"),
+    si la fila entra en el resumen.
+    """
+    return (
+        f'INSERT INTO {SummaryCount._meta.db_table} (summary, "key", "count") '
+        f"SELECT '{summary.name}', {summary.key.format(row=row)}, {amount} "
+        f"WHERE {summary.condition.format(row=row)} "
+        f'ON CONFLICT (summary, "key") DO UPDATE SET "count" = "count" + excluded."count";'
+    )
+
+
+def trigger_sql(summary):
+    """
+    Devuelve las sentencias que crean los triggers de `summary`.
+
+    El trigger de modificación solo se dispara cuando cambia una columna de la que
+    depende el resumen y la fila cambia de grupo o entra o sale del resumen.
+    """
+    table = summary.model._meta.db_table
+    columns = ", ".join([*summary.columns, "deleted_at"])
+    moved = (
+        f"({summary.condition.format(row='OLD')}) IS NOT ({summary.condition.format(row='NEW')}) "
+        f"OR {summary.key.format(row='OLD')} IS NOT {summary.key.format(row='NEW')}"
+    )
+    return [
+        f"CREATE TRIGGER {trigger_name(summary, 'insert')} AFTER INSERT ON {table} "
+        f"BEGIN {add_sql(summary, 'NEW', 1)} END",
+        f"CREATE TRIGGER {trigger_name(summary, 'update')} AFTER UPDATE OF {columns} ON {table} "
+        f"WHEN {moved} BEGIN {add_sql(summary, 'OLD', -1)} {add_sql(summary, 'NEW', 1)} END",
+        f"CREATE TRIGGER {trigger_name(summary, 'delete')} AFTER DELETE ON {table} "
+        f"BEGIN {add_sql(summary, 'OLD', -1)} END",
+    ]
+
+
+def count_sql(summary):
+    """
+    Devuelve la sentencia que guarda los contadores de `summary` contando toda su tabla.
+    """
+    table = summary.model._meta.db_table
+    return (
+        f'INSERT INTO {SummaryCount._meta.db_table} (summary, "key", "count") '
+        f"SELECT '{summary.name}', {summary.key.format(row=table)}, COUNT(*) FROM {table} "
+        f"WHERE {summary.condition.format(row=table)} GROUP BY 2"
+    )
+
+
+def supported(connection=default_connection):
+    """
+    Indica si la base de `connection` mantiene los resúmenes con triggers (solo SQLite).
+    """
+    return connection.vendor == "sqlite"
+
+
+def drop_triggers(connection=default_connection):
+    """
+    Elimina los triggers de los resúmenes que existan.
+    """
+    with connection.cursor() as cursor:
+        for summary in SUMMARIES:
+            for event in TRIGGER_EVENTS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name(summary, event)}")
+
+
+def missing_triggers(connection=default_connection):
+    """
+    Devuelve los nombres de los triggers de los resúmenes que no existen en la base.
+    """
+    names = [trigger_name(summary, event) for summary in SUMMARIES for event in TRIGGER_EVENTS]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN ({', '.join(['%s'] * len(names))})",
+            names,
+        )
+        present = {name for name, in cursor.fetchall()}
+    return [name for name in names if name not in present]
+
+
+def ensure_triggers(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Receptor de `post_migrate`: si falta algún trigger, los vuelve a crear y recalcula
+    los contadores, que dejaron de actualizarse mientras faltaba.
+
+    No hace nada si la base no es SQLite o si la tabla de contadores no existe, por
+    ejemplo al revertir la migración que la crea.
+    """
+    connection = connections[using]
+    if not supported(connection):
+        return
+    if SummaryCount._meta.db_table not in connection.introspection.table_names():
+        return
+    if missing_triggers(connection):
+        rebuild(connection)
+
+
+def rebuild(connection=default_connection):
+    """
+    Vuelve a crear los triggers y recalcula todos los contadores, en una transacción.
+
+    Args:
+        connection: La conexión a usar; `ensure_triggers()` pasa la de la base migrada.
+
+    Returns:
+        int: La cantidad de contadores guardados.
+    """
+    with transaction.atomic(using=connection.alias):
+        drop_triggers(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SummaryCount._meta.db_table}")
+            for summary in SUMMARIES:
+                cursor.execute(count_sql(summary))
+                for statement in trigger_sql(summary):
+                    cursor.execute(statement)
+            cursor.execute(f"SELECT COUNT(*) FROM {SummaryCount._meta.db_table}")
+            return cursor.fetchone()[0]
+
+
+def from_tables(today):
+    """
+    Calcula las cifras del tablero con consultas agrupadas sobre las tablas de origen,
+    para las bases sin triggers. Devuelve lo mismo que `dashboard()`.
+    """
+    return {
+        "clients_by_city": list(Client.objects.values_list("city").annotate(Count("pk")).order_by("city")),
+        "pets_by_breed": list(Pet.objects.values_list("breed").annotate(Count("pk")).order_by("breed")),
+        "products_out_of_stock": Product.objects.filter(stock=0).count(),
+        "appointments_today": Appointment.objects.filter(start__date=today).count(),
+    }
+
+
+def dashboard(today):
+    """
+    Devuelve las cifras del tablero de inicio con una única consulta.
+
+    Args:
+        today (date): El día cuyos turnos se cuentan.
+
+    Returns:
+        dict: clients_by_city y pets_by_breed como listas de (clave, cantidad);
+            products_out_of_stock y appointments_today como cantidades.
+    """
+    if not supported():
+        return from_tables(today)
+    rows = SummaryCount.objects.filter(
+        Q(summary__in=[CLIENTS_BY_CITY, PETS_BY_BREED, PRODUCTS_OUT_OF_STOCK])
+        | Q(summary=APPOINTMENTS_BY_DAY, key=str(today)),
+        count__gt=0,
+    ).order_by("summary", "key").values_list("summary", "key", "count")
+    groups = {summary.name: {} for summary in SUMMARIES}
+    for name, key, count in rows:
+        groups[name][key] = count
+    return {
+        "clients_by_city": list(groups[CLIENTS_BY_CITY].items()),
+        "pets_by_breed": list(groups[PETS_BY_BREED].items()),
+        "products_out_of_stock": groups[PRODUCTS_OUT_OF_STOCK].get("", 0),
+        "appointments_today": groups[APPOINTMENTS_BY_DAY].get(str(today), 0),
+    }
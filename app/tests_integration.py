@@ -1,9 +1,42 @@
-from datetime import date
-
+import json
+from datetime import date, datetime, timedelta
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.shortcuts import reverse
-from django.test import TestCase
-
-from app.models import Client, Med, Pet, Product, Provider, Veterinary
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app import async_views, changes
+from app.factories import (
+    ClientFactory,
+    MedFactory,
+    PetFactory,
+    ProductFactory,
+    ProviderFactory,
+    VeterinaryFactory,
+)
+from app.models import (
+    CONFLICT_MESSAGE,
+    OVERLAP_MESSAGE,
+    STOCK_MESSAGE,
+    Appointment,
+    Change,
+    ChangeLogState,
+    Client,
+    Med,
+    Pet,
+    Prescription,
+    Product,
+    Provider,
+    Sale,
+    Schedule,
+    Veterinary,
+)
 
 
 class HomePageTest(TestCase):
@@ -15,6 +48,7 @@ class HomePageTest(TestCase):
 
     Métodos de prueba:
         test_use_home_template: Verifica si se está utilizando el template "home.html" en la vista de la página de inicio.
+        test_home_shows_the_summary: Verifica que se muestren las cifras de las tablas resumen.
 
     """
     def test_use_home_template(self):
@@ -24,6 +58,69 @@ class HomePageTest(TestCase):
         response = self.client.get(reverse("home"))
         self.assertTemplateUsed(response, "home.html")
 
+    def test_home_shows_the_summary(self):
+        """
+        Verifica que la página de inicio muestre las cifras de las tablas resumen.
+        """
+        ClientFactory.create_batch(2, city="Berisso")
+        PetFactory.create(breed="Gato")
+        ProductFactory.create(stock=0)
+
+        response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.context["summary"]["clients_by_city"], [("Berisso", 2)])
+        self.assertEqual(response.context["summary"]["pets_by_breed"], [("Gato", 1)])
+        self.assertContains(response, "Productos sin stock")
+        self.assertContains(response, "Berisso")
+
+
+class BirthdaysTest(TestCase):
+    """
+    Pruebas de los próximos cumpleaños en la página principal y en la exportación.
+    """
+    def setUp(self):
+        """
+        Crea una mascota que cumple 4 años en dos días y otra que cumple en un mes.
+        """
+        self.birthday = timezone.localdate() + timedelta(days=2)
+        owner = ClientFactory.create(name="Juan Sebastian Veron")
+        self.pet = PetFactory.create(
+            name="Firulais", birthday=self.birthday.replace(year=self.birthday.year - 4), client=owner,
+        )
+        later = timezone.localdate() + timedelta(days=30)
+        PetFactory.create(name="Manchita", birthday=later.replace(year=later.year - 4))
+
+    def test_home_lists_upcoming_birthdays(self):
+        """
+        Verifica que la página principal muestre solo los cumpleaños de la próxima semana.
+        """
+        response = self.client.get(reverse("home"))
+
+        self.assertEqual(response.context["birthdays"], [(self.pet, self.birthday, 4)])
+        self.assertContains(response, "Firulais (Juan Sebastian Veron)")
+        self.assertNotContains(response, "Manchita")
+
+    def test_export_streams_csv(self):
+        """
+        Verifica que la exportación devuelva un CSV con la ventana pedida.
+        """
+        response = self.client.get(reverse("pets_birthdays_export"), {"days": 31})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(lines[0], "mascota,cumpleaños,edad,dueño,email,teléfono")
+        self.assertTrue(lines[1].startswith(f"Firulais,{self.birthday.isoformat()},4,Juan Sebastian Veron,"))
+        self.assertTrue(lines[2].startswith("Manchita,"))
+        self.assertTrue(lines[2].endswith(",,,"))
+
+    def test_export_rejects_invalid_days(self):
+        """
+        Verifica que la exportación rechace una cantidad de días inválida.
+        """
+        for days in ("x", "-1"):
+            response = self.client.get(reverse("pets_birthdays_export"), {"days": days})
+            self.assertEqual(response.status_code, 400)
+
 
 class ClientsTest(TestCase):
     """
@@ -595,6 +692,20 @@ class MedicinesTest(TestCase):
         self.assertEqual(editedMedicine.desc, medicine.desc)
         self.assertEqual(editedMedicine.dose, medicine.dose)
 
+    def test_edit_can_unlink_the_product(self):
+        """
+        Verifica que la opción "Sin producto" quite el producto asociado al medicamento.
+        """
+        medicine = Med.objects.create(name="Ivermectina", desc="Antiparasitario", dose=3, product=ProductFactory.create())
+
+        response = self.client.post(reverse("meds_form"), data={
+            "id": medicine.id, "name": "Ivermectina", "desc": "Antiparasitario", "dose": 3, "product_id": "",
+        })
+
+        self.assertRedirects(response, reverse("meds_repo"))
+        medicine.refresh_from_db()
+        self.assertIsNone(medicine.product)
+
 
 class ProductsTest(TestCase):
     """
@@ -605,9 +716,6 @@ class ProductsTest(TestCase):
 
     Métodos de prueba:
         test_can_create_product: Verifica si se puede crear un producto correctamente.
-        test_can_update_stock_product: Verifica si se puede actualizar el stock de un producto existente.
-        test_update_product_with_empty_stock: Verifica si se muestra un mensaje de error al intentar actualizar un producto con un stock vacío.
-        test_update_product_with_negative_stock: Verifica si se muestra un mensaje de error al intentar actualizar un producto con un stock negativo.
 
     """
     def test_validation_errors_create_product(self):
@@ -645,16 +753,30 @@ class ProductsTest(TestCase):
 
         self.assertRedirects(response, reverse("products_repo"))
 
+class ProductsEditTest(TestCase):
+    """
+    Clase de prueba para la edición de productos existentes.
+
+    El producto editado se crea una sola vez en `setUpTestData`; cada prueba trabaja
+    dentro de su propia transacción, por lo que sus cambios no afectan a las demás.
+
+    Métodos de prueba:
+        test_can_update_stock_product: Verifica si se puede actualizar el stock de un producto existente.
+        test_update_product_with_empty_stock: Verifica si se muestra un mensaje de error al intentar actualizar un producto con un stock vacío.
+        test_update_product_with_negative_stock: Verifica si se muestra un mensaje de error al intentar actualizar un producto con un stock negativo.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Crea una vez, para todas las pruebas de la clase, el producto que se edita.
+        """
+        cls.product = ProductFactory.create(name="Lavandina", type="Limpieza", price=100, stock=50)
+
     def test_can_update_stock_product(self):
         """
         Verifica que se pueda actualizar el stock de un producto correctamente.
         """
-        product = Product.objects.create(
-            name= "Lavandina",
-            type= "Limpieza",
-            price= 100,
-            stock= 50,
-        )
+        product = self.product
 
         response = self.client.post(
             reverse("products_form"),
@@ -675,12 +797,7 @@ class ProductsTest(TestCase):
         """
         Verifica que no se pueda actualizar el stock de un producto con un valor vacío.
         """
-        product = Product.objects.create(
-            name= "Lavandina",
-            type= "Limpieza",
-            price= 100,
-            stock= 50,
-        )
+        product = self.product
 
         response = self.client.post(
             reverse("products_form"),
@@ -701,12 +818,7 @@ class ProductsTest(TestCase):
         """
         Verifica que no se pueda actualizar el stock de un producto con un valor negativo.
         """
-        product = Product.objects.create(
-            name= "Lavandina",
-            type= "Limpieza",
-            price= 100,
-            stock= 50,
-        )
+        product = self.product
 
         response = self.client.post(
             reverse("products_form"),
@@ -881,6 +993,20 @@ class PetsTest(TestCase):
         self.assertEqual(editedPet.breed, pet.breed)
         self.assertEqual(str(editedPet.birthday), "2015-05-20")
 
+    def test_edit_can_remove_the_owner(self):
+        """
+        Verifica que la opción "Sin dueño" quite el dueño de la mascota.
+        """
+        pet = PetFactory.create(client=ClientFactory.create())
+
+        response = self.client.post(reverse("pets_form"), data={
+            "id": pet.id, "name": pet.name, "breed": pet.breed, "birthday": pet.birthday, "client_id": "",
+        })
+
+        self.assertRedirects(response, reverse("pets_repo"))
+        pet.refresh_from_db()
+        self.assertIsNone(pet.client)
+
     def test_invalid_birthday_format(self):
         """
         Verifica que el formato de nacimiento sea el adecuado
@@ -940,3 +1066,1348 @@ class VetsTest(TestCase):
         self.assertEqual(veterinaries[0].email, "joser@hotmail.com")
 
         self.assertRedirects(response, reverse("veterinary_repo"))
+
+
+class LargeDatasetRepositoryTest(TestCase):
+    """
+    Pruebas de los repositorios con muchos registros creados con `create_batch`.
+
+    Los datos se crean una sola vez por clase en `setUpTestData` con un `bulk_create`
+    por modelo, por lo que agregar registros no encarece cada prueba.
+    """
+    size = 300
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Crea `size` registros de cada modelo.
+        """
+        cls.clients = ClientFactory.create_batch(cls.size)
+        cls.providers = ProviderFactory.create_batch(cls.size)
+        cls.products = ProductFactory.create_batch(cls.size)
+        cls.veterinarians = VeterinaryFactory.create_batch(cls.size)
+        cls.pets = PetFactory.create_batch(cls.size)
+        cls.meds = MedFactory.create_batch(cls.size)
+
+    def assertRepositoryLists(self, url_name, objects):
+        """
+        Verifica que el repositorio muestre el primer y el último registro creados.
+        """
+        response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, objects[0].name)
+        self.assertContains(response, objects[-1].name)
+
+    def test_clients_repository(self):
+        """
+        Verifica el repositorio de clientes con muchos registros.
+        """
+        self.assertRepositoryLists("clients_repo", self.clients)
+
+    def test_providers_repository(self):
+        """
+        Verifica el repositorio de proveedores con muchos registros.
+        """
+        self.assertRepositoryLists("providers_repo", self.providers)
+
+    def test_products_repository(self):
+        """
+        Verifica el repositorio de productos con muchos registros.
+        """
+        self.assertRepositoryLists("products_repo", self.products)
+
+    def test_veterinary_repository(self):
+        """
+        Verifica el repositorio de veterinarios con muchos registros.
+        """
+        self.assertRepositoryLists("veterinary_repo", self.veterinarians)
+
+    def test_pets_repository(self):
+        """
+        Verifica el repositorio de mascotas con muchos registros.
+        """
+        self.assertRepositoryLists("pets_repo", self.pets)
+
+    def test_meds_repository(self):
+        """
+        Verifica el repositorio de medicamentos con muchos registros.
+        """
+        self.assertRepositoryLists("meds_repo", self.meds)
+
+
+class OptimisticConcurrencyTest(TestCase):
+    """
+    Pruebas del control de concurrencia optimista de los formularios de edición.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Crea el cliente que editan dos recepcionistas a la vez.
+        """
+        cls.client_obj = ClientFactory.create(name="Juan Veron", city="La Plata")
+
+    def post_edit(self, **data):
+        """
+        Envía el formulario de edición del cliente.
+        """
+        return self.client.post(reverse("clients_form"), {"id": self.client_obj.id, **data})
+
+    def test_edit_form_carries_the_version(self):
+        """
+        Verifica que el formulario de edición incluya la versión del registro.
+        """
+        response = self.client.get(reverse("clients_edit", kwargs={"id": self.client_obj.id}))
+
+        self.assertContains(response, 'value="0" name="version"')
+
+    def test_stale_form_is_rejected_and_rerendered_with_current_version(self):
+        """
+        Verifica que un formulario con una versión vieja no pise los cambios de otro usuario.
+        """
+        first = self.post_edit(version=0, name="Guido Carrillo")
+        second = self.post_edit(version=0, name="Pedro Troglio")
+
+        self.assertRedirects(first, reverse("clients_repo"))
+        self.assertEqual(second.status_code, 200)
+        self.assertContains(second, CONFLICT_MESSAGE)
+        self.assertContains(second, 'value="1" name="version"')
+        self.assertContains(second, "Pedro Troglio")
+        self.assertEqual(Client.objects.get(pk=self.client_obj.id).name, "Guido Carrillo")
+
+        retry = self.post_edit(version=1, name="Pedro Troglio")
+
+        self.assertRedirects(retry, reverse("clients_repo"))
+        client = Client.objects.get(pk=self.client_obj.id)
+        self.assertEqual((client.name, client.version), ("Pedro Troglio", 2))
+
+    def test_concurrent_write_between_read_and_update_is_detected(self):
+        """
+        Verifica que el UPDATE condicionado a la versión detecte escrituras intermedias.
+        """
+        stale = Client.objects.get(pk=self.client_obj.id)
+        Client.objects.get(pk=self.client_obj.id).update_client({"city": "Berisso"})
+
+        saved, errors = stale.update_client({"name": "Pedro Troglio"})
+
+        self.assertFalse(saved)
+        self.assertEqual(errors, {"version": CONFLICT_MESSAGE})
+        self.assertEqual(stale.version, 1)
+        self.assertEqual(Client.objects.get(pk=self.client_obj.id).name, "Juan Veron")
+
+    def test_stock_buttons_bump_the_version(self):
+        """
+        Verifica que los botones de stock invaliden los formularios abiertos del producto.
+        """
+        product = ProductFactory.create(stock=1)
+
+        self.client.post(reverse("decrement_stock", args=[product.id]))
+        self.client.post(reverse("decrement_stock", args=[product.id]))
+
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.version), (0, 1))
+
+
+class BulkActionsTest(TestCase):
+    """
+    Pruebas de las acciones en lote de los repositorios.
+    """
+    def test_repositories_render_the_bulk_form(self):
+        """
+        Verifica que cada repositorio tenga una casilla por fila asociada al formulario en lote.
+        """
+        for factory, url_name in [
+            (ClientFactory, "clients_repo"),
+            (ProviderFactory, "providers_repo"),
+            (ProductFactory, "products_repo"),
+            (VeterinaryFactory, "veterinary_repo"),
+            (PetFactory, "pets_repo"),
+            (MedFactory, "meds_repo"),
+        ]:
+            with self.subTest(url_name=url_name):
+                instance = factory.create()
+                response = self.client.get(reverse(url_name))
+
+                self.assertContains(response, 'id="bulk-form"')
+                self.assertContains(
+                    response, f'name="ids" value="{instance.id}" form="bulk-form"',
+                )
+
+    def test_bulk_delete_uses_a_single_statement(self):
+        """
+        Verifica que el borrado en lote elimine solo los seleccionados con un único DELETE.
+        """
+        clients = ClientFactory.create_batch(5)
+        selected = [client.id for client in clients[:3]]
+
+        # SAVEPOINT x2, UPDATE, INSERT en el registro de cambios, RELEASE x2
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                reverse("clients_bulk"), {"action": "delete", "ids": selected},
+            )
+
+        self.assertRedirects(response, reverse("clients_repo"))
+        self.assertQuerySetEqual(
+            Client.objects.order_by("id"), [client.id for client in clients[3:]], lambda client: client.id,
+        )
+
+    def test_bulk_update_changes_the_field_and_the_version(self):
+        """
+        Verifica que la edición en lote cambie la raza con un único UPDATE y aumente la versión.
+        """
+        pets = PetFactory.create_batch(4, breed="Perro")
+        selected = [pet.id for pet in pets[:2]]
+
+        # SAVEPOINT x2, UPDATE, INSERT en el registro de cambios, RELEASE x2
+        with self.assertNumQueries(6):
+            self.client.post(
+                reverse("pets_bulk"), {"action": "update", "breed": "Gato", "ids": selected},
+            )
+
+        self.assertEqual(
+            list(Pet.objects.order_by("id").values_list("breed", "version")),
+            [("Gato", 1), ("Gato", 1), ("Perro", 0), ("Perro", 0)],
+        )
+
+    def test_bulk_update_rejects_values_outside_the_choices(self):
+        """
+        Verifica que no se pueda asignar una ciudad que no está entre las opciones.
+        """
+        client = ClientFactory.create(city="La Plata")
+
+        response = self.client.post(
+            reverse("clients_bulk"),
+            {"action": "update", "city": "Córdoba", "ids": [client.id]},
+            follow=True,
+        )
+
+        self.assertContains(response, "Por favor ingrese un valor válido.")
+        client.refresh_from_db()
+        self.assertEqual((client.city, client.version), ("La Plata", 0))
+
+    def test_bulk_update_accepts_free_text_fields(self):
+        """
+        Verifica que la edición en lote del tipo de producto acepte cualquier texto no vacío.
+        """
+        products = ProductFactory.create_batch(2)
+
+        response = self.client.post(
+            reverse("products_bulk"),
+            {"action": "update", "type": "Juguete", "ids": [product.id for product in products]},
+            follow=True,
+        )
+
+        self.assertContains(response, "Se actualizaron 2 registros.")
+        self.assertEqual(set(Product.objects.values_list("type", flat=True)), {"Juguete"})
+
+    def test_bulk_action_without_selection_changes_nothing(self):
+        """
+        Verifica que enviar el formulario sin seleccionar registros no haga cambios.
+        """
+        MedFactory.create()
+
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse("meds_bulk"), {"action": "delete"})
+
+        self.assertRedirects(response, reverse("meds_repo"))
+        self.assertEqual(Med.objects.count(), 1)
+
+    def test_delete_only_repositories_reject_updates(self):
+        """
+        Verifica que los repositorios sin campo editable en lote solo permitan borrar.
+        """
+        provider = ProviderFactory.create()
+        veterinary = VeterinaryFactory.create()
+
+        self.client.post(reverse("providers_bulk"), {"action": "update", "ids": [provider.id]})
+        self.client.post(reverse("veterinary_bulk"), {"action": "delete", "ids": [veterinary.id]})
+
+        self.assertTrue(Provider.objects.filter(pk=provider.id).exists())
+        self.assertFalse(Veterinary.objects.exists())
+
+    def test_bulk_actions_reject_gets_and_invalid_ids(self):
+        """
+        Verifica que las acciones en lote solo se acepten por POST y con IDs numéricos.
+        """
+        client = ClientFactory.create()
+        for name in ("clients_bulk", "pets_bulk", "products_bulk", "providers_bulk", "veterinary_bulk", "meds_bulk"):
+            with self.subTest(name):
+                url = reverse(name)
+                self.assertEqual(self.client.get(url, {"action": "delete", "ids": [client.id]}).status_code, 405)
+                self.assertEqual(
+                    self.client.post(url, {"action": "delete", "ids": [client.id, "todos"]}).status_code, 400,
+                )
+
+        self.assertTrue(Client.objects.filter(pk=client.id).exists())
+
+
+class ApiTest(TestCase):
+    """
+    Pruebas de la API JSON.
+    """
+    def test_list_projects_fields_and_paginates_with_a_cursor(self):
+        """
+        Verifica la proyección de campos y que el cursor recorra todas las páginas.
+        """
+        clients = ClientFactory.create_batch(5)
+        url = reverse("api_collection", args=["clients"])
+
+        with self.assertNumQueries(1):
+            first = self.client.get(url, {"fields": "name", "limit": 3}).json()
+        second = self.client.get(url, {"fields": "name", "limit": 3, "cursor": first["next"]}).json()
+
+        self.assertEqual(first["results"][0], {"id": clients[0].id, "name": clients[0].name})
+        self.assertEqual(
+            [row["id"] for row in first["results"] + second["results"]], [client.id for client in clients],
+        )
+        self.assertIsNone(second["next"])
+
+    def test_list_filters(self):
+        """
+        Verifica los filtros exactos y con sufijo.
+        """
+        ProductFactory.create(name="Collar", stock=0)
+        ProductFactory.create(name="Correa", stock=5)
+        url = reverse("api_collection", args=["products"])
+
+        out_of_stock = self.client.get(url, {"stock": 0}).json()["results"]
+        matching = self.client.get(url, {"name__icontains": "corr"}).json()["results"]
+
+        self.assertEqual([row["name"] for row in out_of_stock], ["Collar"])
+        self.assertEqual([row["name"] for row in matching], ["Correa"])
+
+    def test_invalid_parameters_are_rejected(self):
+        """
+        Verifica que los campos, filtros, cursores y límites inválidos respondan 400.
+        """
+        url = reverse("api_collection", args=["pets"])
+
+        for params in [{"fields": "owner"}, {"color": "negro"}, {"cursor": "%%%"}, {"limit": "x"},
+                       {"limit": 0}, {"birthday__gte": "ayer"}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+        self.assertEqual(self.client.get("/api/owners/").status_code, 404)
+
+    def test_create_reuses_model_validation(self):
+        """
+        Verifica que el alta valide con `save_*` y devuelva el registro creado.
+        """
+        url = reverse("api_collection", args=["meds"])
+
+        invalid = self.client.post(url, {"name": "Ibu", "desc": "Analgésico", "dose": 20},
+                                   content_type="application/json")
+        created = self.client.post(url, {"name": "Ibu", "desc": "Analgésico", "dose": 2},
+                                   content_type="application/json")
+
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(invalid.json()["errors"], {"dose": "La dosis debe estar entre 1 y 10"})
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(created.json()["dose"], 2.0)
+        self.assertEqual(Med.objects.get().pk, created.json()["id"])
+
+    def test_detail_update_and_delete(self):
+        """
+        Verifica la lectura, la edición con control de versión y el borrado de un registro.
+        """
+        pet = PetFactory.create(breed="Perro")
+        url = reverse("api_detail", args=["pets", pet.id])
+
+        self.assertEqual(self.client.get(url, {"fields": "breed"}).json(), {"id": pet.id, "breed": "Perro"})
+
+        updated = self.client.patch(url, {"breed": "Gato", "version": 0}, content_type="application/json")
+        stale = self.client.patch(url, {"name": "Otro", "version": 0}, content_type="application/json")
+
+        self.assertEqual((updated.json()["breed"], updated.json()["version"]), ("Gato", 1))
+        self.assertEqual(stale.status_code, 409)
+        self.assertEqual(stale.json()["errors"], {"version": CONFLICT_MESSAGE})
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+
+    def test_invalid_bodies_and_methods(self):
+        """
+        Verifica las respuestas ante cuerpos JSON inválidos y métodos no permitidos.
+        """
+        product = ProductFactory.create()
+        url = reverse("api_detail", args=["products", product.id])
+
+        broken = self.client.patch(url, "{", content_type="application/json")
+        not_object = self.client.patch(url, "[]", content_type="application/json")
+        invalid = self.client.patch(url, {"stock": -1}, content_type="application/json")
+
+        self.assertEqual(broken.json()["errors"], {"body": "JSON inválido"})
+        self.assertEqual(not_object.status_code, 400)
+        self.assertEqual(invalid.json()["errors"], {"stock": "El stock no puede ser negativo."})
+        self.assertEqual(self.client.put(url).status_code, 405)
+        self.assertEqual(self.client.delete(reverse("api_collection", args=["products"])).status_code, 405)
+
+    def test_invalid_prices_are_rejected(self):
+        """
+        Verifica que un precio que no es un número finito y positivo responda 400 en el
+        alta, la edición y los lotes, sin guardar nada.
+        """
+        product = ProductFactory.create(price=10.0)
+        url = reverse("api_collection", args=["products"])
+        expected = {"price": "El precio debe ser un número"}
+
+        created = self.client.post(url, ProductFactory.data(price="abc"), content_type="application/json")
+        edited = self.client.patch(
+            reverse("api_detail", args=["products", product.id]), {"price": "nan"}, content_type="application/json",
+        )
+        batch = self.client.post(reverse("api_batch"), {"operations": [
+            {"op": "create", "resource": "products", "data": ProductFactory.data(price="abc")},
+        ]}, content_type="application/json")
+        negative = self.client.post(url, ProductFactory.data(price="-1"), content_type="application/json")
+
+        self.assertEqual([created.status_code, edited.status_code, batch.status_code], [400, 400, 400])
+        self.assertEqual(created.json()["errors"], expected)
+        self.assertEqual(edited.json()["errors"], expected)
+        self.assertEqual(batch.json()["errors"], expected)
+        self.assertEqual(negative.json()["errors"], {"price": "El precio no puede ser negativo."})
+        self.assertEqual(Product.objects.get().price, 10.0)
+
+    def test_form_encoded_bodies_are_rejected(self):
+        """
+        Verifica que las escrituras rechacen los datos de formulario con 415, porque otro
+        sitio podría enviarlos sin protección CSRF.
+        """
+        provider = ProviderFactory.create()
+        data = {"name": "Distribuidora", "email": "ventas@example.com", "address": "Calle 7"}
+
+        created = self.client.post(reverse("api_collection", args=["providers"]), data)
+        batch = self.client.post(reverse("api_batch"), {"operations": "[]"})
+        edited = self.client.patch(
+            reverse("api_detail", args=["providers", provider.id]), "name=Otro",
+            content_type="application/x-www-form-urlencoded",
+        )
+
+        self.assertEqual([created.status_code, batch.status_code, edited.status_code], [415, 415, 415])
+        self.assertEqual(created.json()["errors"], {"body": "El cuerpo debe ser JSON (application/json)"})
+        self.assertEqual(Provider.objects.count(), 1)
+
+
+class BatchApiTest(TestCase):
+    """
+    Pruebas del endpoint de operaciones en lote.
+    """
+    def post_batch(self, operations):
+        """
+        Envía un lote de operaciones como JSON.
+        """
+        return self.client.post(reverse("api_batch"), {"operations": operations}, content_type="application/json")
+
+    def test_mixed_operations_run_in_order_with_bulk_statements(self):
+        """
+        Verifica un lote mixto: cada racha homogénea usa una sentencia en lote.
+        """
+        product = ProductFactory.create(stock=5)
+        pet = PetFactory.create(breed="Perro")
+        meds = MedFactory.create_batch(2)
+        operations = [
+            {"op": "create", "resource": "clients", "data": ClientFactory.data()},
+            {"op": "create", "resource": "clients", "data": ClientFactory.data()},
+            {"op": "update", "resource": "pets", "id": pet.id, "data": {"breed": "Gato", "version": 0}},
+            {"op": "delete", "resource": "meds", "id": meds[0].id},
+            {"op": "delete", "resource": "meds", "id": meds[1].id},
+            {"op": "stock", "id": product.id, "delta": -5},
+            {"op": "stock", "id": product.id, "delta": 3},
+        ]
+
+        # Sin contar SAVEPOINT: INSERT de clientes, SELECT y UPDATE de mascotas, SELECT y UPDATE
+        # de medicamentos y UPDATE de stock, cada escritura con el INSERT de su registro de cambios.
+        with self.assertNumQueries(20):
+            response = self.post_batch(operations)
+
+        body = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body["committed"])
+        self.assertEqual([result["status"] for result in body["results"]], [201, 201, 200, 204, 204, 200, 200])
+        self.assertEqual(Client.objects.count(), 2)
+        self.assertEqual(Pet.objects.get().breed, "Gato")
+        self.assertFalse(Med.objects.exists())
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.version), (3, 1))
+
+    def test_failure_rolls_back_the_whole_batch(self):
+        """
+        Verifica que una operación inválida revierta las anteriores e indique cuál falló.
+        """
+        product = ProductFactory.create(stock=1)
+        operations = [
+            {"op": "create", "resource": "providers", "data": ProviderFactory.data()},
+            {"op": "stock", "id": product.id, "delta": 1},
+            {"op": "create", "resource": "clients", "data": ClientFactory.data(email="sin-arroba")},
+        ]
+
+        response = self.post_batch(operations)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["failed"], 2)
+        self.assertIn("email", response.json()["errors"])
+        self.assertFalse(Provider.objects.exists())
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 1)
+
+    def test_stock_deltas_cannot_go_negative_at_any_step(self):
+        """
+        Verifica que los movimientos se validen en orden aunque su suma sea positiva.
+        """
+        product = ProductFactory.create(stock=2)
+
+        response = self.post_batch([
+            {"op": "stock", "id": product.id, "delta": -3},
+            {"op": "stock", "id": product.id, "delta": 5},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["failed"], 0)
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.version), (2, 0))
+
+    def test_failed_stock_run_reports_the_failing_product(self):
+        """
+        Verifica que, si un producto de la racha no alcanza, el fallo se informe sobre el
+        stock anterior al lote y no sobre el de los productos que sí se actualizaron.
+        """
+        plenty = ProductFactory.create(stock=5)
+        short = ProductFactory.create(stock=1)
+
+        response = self.post_batch([
+            {"op": "stock", "id": plenty.id, "delta": -3},
+            {"op": "stock", "id": short.id, "delta": -2},
+        ])
+
+        self.assertEqual((response.status_code, response.json()["failed"]), (400, 1))
+        plenty.refresh_from_db()
+        self.assertEqual((plenty.stock, plenty.version), (5, 0))
+
+    def test_missing_records_and_conflicts(self):
+        """
+        Verifica los códigos de registros inexistentes y de conflictos de versión.
+        """
+        veterinary = VeterinaryFactory.create()
+        cases = [
+            ([{"op": "stock", "id": 999, "delta": 1}], 404),
+            ([{"op": "delete", "resource": "providers", "id": 999}], 404),
+            ([{"op": "update", "resource": "meds", "id": 999, "data": {}}], 404),
+            ([{"op": "update", "resource": "veterinarians", "id": veterinary.id,
+               "data": {"name": "Otro", "version": 3}}], 409),
+        ]
+        for operations, status in cases:
+            with self.subTest(operations=operations):
+                self.assertEqual(self.post_batch(operations).status_code, status)
+
+    def test_malformed_requests_are_rejected(self):
+        """
+        Verifica que los lotes y operaciones mal formados respondan 400.
+        """
+        for operations in [
+            [],
+            "create",
+            [{"op": "merge", "resource": "clients"}],
+            [{"op": "create", "resource": "owners", "data": {}}],
+            [{"op": "delete", "resource": "clients", "id": "1"}],
+            [{"op": "update", "resource": "clients", "id": 1}],
+            [{"op": "stock", "id": 1, "delta": "2"}],
+            [{"op": "stock", "id": True, "delta": 2}],
+            [{"op": "stock", "id": 1, "delta": False}],
+            [{"op": "delete", "resource": "clients", "id": True}],
+        ]:
+            with self.subTest(operations=operations):
+                self.assertEqual(self.post_batch(operations).status_code, 400)
+
+        self.assertEqual(self.client.post(reverse("api_batch"), "{", content_type="application/json").status_code, 400)
+        self.assertEqual(self.client.get(reverse("api_batch")).status_code, 405)
+
+
+class ChangeFeedTest(TestCase):
+    """
+    Pruebas de la sincronización incremental con `/api/changes/`.
+    """
+    def read_feed(self, since=0):
+        """
+        Consulta el registro de cambios y devuelve las líneas JSON de la respuesta.
+        """
+        response = self.client.get(reverse("api_changes"), {"since": since})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    def test_every_write_path_is_recorded(self):
+        """
+        Verifica que altas, ediciones, movimientos de stock y borrados queden registrados.
+        """
+        saved, _ = Client.save_client(ClientFactory.data())
+        saved.update_client({"city": "Berisso" if saved.city != "Berisso" else "Ensenada"})
+        product = ProductFactory.create(stock=1)
+        self.client.post(reverse("increment_stock", args=[product.id]))
+        pets = PetFactory.create_batch(2)
+        self.client.post(reverse("pets_bulk"), {"action": "delete", "ids": [pets[0].id]})
+
+        self.assertEqual(
+            list(Change.objects.values_list("resource", "action")),
+            [("clients", "upsert"), ("clients", "upsert"), ("products", "upsert"), ("products", "upsert"),
+             ("pets", "upsert"), ("pets", "upsert"), ("pets", "delete")],
+        )
+
+    def test_bulk_writes_only_record_the_rows_they_touched(self):
+        """
+        Verifica que los IDs pedidos que no existen o no cumplen el filtro no se registren.
+        """
+        pets = PetFactory.create_batch(2)
+        since = Change.objects.latest("seq").seq
+        missing = pets[1].id + 1
+
+        self.client.post(reverse("pets_bulk"), {"action": "delete", "ids": [pets[0].id, missing]})
+        Pet.objects.for_ids([pets[0].id, pets[1].id]).update(name="Renombrada")
+
+        self.assertEqual(
+            list(Change.objects.filter(seq__gt=since).values_list("object_id", "action")),
+            [(pets[0].id, "delete"), (pets[1].id, "upsert")],
+        )
+        self.assertEqual([line["id"] for line in self.read_feed(since)[:-1]], [pets[0].id, pets[1].id])
+
+    def test_feed_streams_compact_deltas_since_a_sequence(self):
+        """
+        Verifica que el registro devuelva solo el último estado de cada registro modificado.
+        """
+        client = ClientFactory.create()
+        since = self.read_feed()[-1]["next"]
+        client.update_client({"name": "Juan Veron"})
+        client.update_client({"name": "Juan Sebastian Veron"})
+        med = MedFactory.create()
+        med.delete()
+
+        lines = self.read_feed(since)
+
+        self.assertEqual(
+            [(line["resource"], line["id"], line["op"]) for line in lines[:-1]],
+            [("clients", client.id, "upsert"), ("meds", med.id, "delete")],
+        )
+        self.assertEqual(lines[0]["data"]["name"], "Juan Sebastian Veron")
+        self.assertEqual(lines[-1], {"next": Change.objects.latest("seq").seq})
+        self.assertEqual(self.read_feed(lines[-1]["next"]), [{"next": lines[-1]["next"]}])
+
+    def test_feed_reads_in_chunks(self):
+        """
+        Verifica que los bloques de lectura no cambien el resultado.
+        """
+        pets = PetFactory.create_batch(5)
+
+        deltas = list(changes.deltas(0, chunk_size=2))
+
+        self.assertEqual([delta["id"] for delta in deltas], [pet.id for pet in pets])
+
+    def test_compaction_bounds_the_log_and_moves_the_horizon(self):
+        """
+        Verifica la compactación y que los clientes anteriores al horizonte deban resincronizar.
+        """
+        product = ProductFactory.create()
+        for _ in range(3):
+            self.client.post(reverse("increment_stock", args=[product.id]))
+        provider = ProviderFactory.create()
+        provider.delete()
+        Change.objects.filter(action="delete").update(created_at=timezone.now() - timedelta(days=60))
+
+        out = StringIO()
+        call_command("compact_changes", "--days", "30", "--batch-size", "2", stdout=out)
+
+        self.assertIn("4 cambios reemplazados y 1 borrados descartados.", out.getvalue())
+        self.assertEqual(list(Change.objects.values_list("resource", flat=True)), ["products"])
+        gone = self.client.get(reverse("api_changes"), {"since": 1})
+        self.assertEqual(gone.status_code, 410)
+        self.assertEqual(gone.json()["horizon"], ChangeLogState.current().horizon)
+        self.assertEqual(self.read_feed(0)[0]["data"]["stock"], product.stock + 3)
+
+    def test_invalid_requests(self):
+        """
+        Verifica las respuestas ante un `since` inválido o un método no permitido.
+        """
+        self.assertEqual(self.client.get(reverse("api_changes"), {"since": "ayer"}).status_code, 400)
+        self.assertEqual(self.client.post(reverse("api_changes")).status_code, 405)
+
+
+class PetOwnershipTest(TestCase):
+    """
+    Pruebas de la relación entre clientes y mascotas en los listados y formularios.
+    """
+    def create_owners(self, size):
+        """
+        Crea `size` clientes con dos mascotas cada uno y `size` mascotas sin dueño.
+        """
+        owners = ClientFactory.create_batch(size)
+        PetFactory.create_batch(size, client=None)
+        Pet.objects.bulk_create(
+            [pet for owner in owners for pet in PetFactory.build_batch(2, client=owner)],
+        )
+        return owners
+
+    def repository_queries(self, url_name):
+        """
+        Devuelve la cantidad de consultas que hace un listado.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_listings_use_a_constant_number_of_queries(self):
+        """
+        Verifica que los listados de mascotas y clientes no hagan una consulta por fila.
+        """
+        self.create_owners(2)
+        few = {name: self.repository_queries(name) for name in ("pets_repo", "clients_repo")}
+        self.create_owners(30)
+        many = {name: self.repository_queries(name) for name in ("pets_repo", "clients_repo")}
+
+        self.assertEqual(few, many)
+        self.assertEqual(many, {"pets_repo": 1, "clients_repo": 2})
+
+    def test_pets_repository_shows_the_owner(self):
+        """
+        Verifica que el listado de mascotas muestre el dueño, salvo que esté borrado.
+        """
+        owner, deleted = ClientFactory.create_batch(2)
+        PetFactory.create(client=owner)
+        PetFactory.create(client=deleted)
+        deleted.delete()
+
+        response = self.client.get(reverse("pets_repo"))
+
+        self.assertContains(response, owner.name)
+        self.assertNotContains(response, deleted.name)
+
+    def test_pets_repository_lists_pets_in_creation_order(self):
+        """
+        Verifica que el listado de mascotas siga el orden de carga y no el de sus cumpleaños.
+        """
+        pets = [
+            PetFactory.create(birthday=date(2020, month, 1)) for month in (12, 6, 1)
+        ]
+
+        response = self.client.get(reverse("pets_repo"))
+
+        self.assertEqual(list(response.context["pets"]), pets)
+
+    def test_clients_repository_counts_live_pets(self):
+        """
+        Verifica que el listado de clientes cuente y nombre solo las mascotas vivas.
+        """
+        owner = ClientFactory.create()
+        kept = PetFactory.create(client=owner, name="Firulais")
+        PetFactory.create(client=owner, name="Michi").delete()
+
+        response = self.client.get(reverse("clients_repo"))
+
+        client = next(client for client in response.context["clients"] if client.pk == owner.pk)
+        self.assertEqual(client.pet_count, 1)
+        self.assertEqual(list(client.pets.all()), [kept])
+        self.assertContains(response, "Firulais")
+        self.assertNotContains(response, "Michi")
+
+    def test_pet_form_assigns_the_owner(self):
+        """
+        Verifica que el formulario ofrezca los clientes como dueños y guarde el elegido.
+        """
+        owner = ClientFactory.create()
+
+        form = self.client.get(reverse("pets_form"))
+        response = self.client.post(
+            reverse("pets_form"),
+            data={"name": "Firulais", "breed": "Perro", "birthday": "2021-01-01", "client_id": owner.id},
+        )
+        invalid = self.client.post(
+            reverse("pets_form"),
+            data={"name": "Michi", "breed": "Gato", "birthday": "2021-01-01", "client_id": owner.id + 1},
+        )
+
+        self.assertContains(form, f'<option value="{owner.id}"')
+        self.assertRedirects(response, reverse("pets_repo"))
+        self.assertEqual(Pet.objects.get(name="Firulais").client, owner)
+        self.assertContains(invalid, "Por favor seleccione un dueño válido")
+
+    def test_api_and_batch_accept_the_owner(self):
+        """
+        Verifica que la API y el endpoint de lotes acepten `client_id` y validen que exista.
+        """
+        owner = ClientFactory.create()
+        data = {"name": "Firulais", "breed": "Perro", "birthday": "2021-01-01"}
+
+        created = self.client.post(
+            reverse("api_collection", args=["pets"]), {**data, "client_id": owner.id}, content_type="application/json",
+        )
+        rejected = self.client.post(
+            reverse("api_batch"),
+            {"operations": [
+                {"op": "create", "resource": "pets", "data": data},
+                {"op": "create", "resource": "pets", "data": {**data, "client_id": owner.id + 1}},
+            ]},
+            content_type="application/json",
+        )
+
+        self.assertEqual(created.status_code, 201)
+        self.assertEqual(created.json()["client_id"], owner.id)
+        self.assertEqual(rejected.json()["failed"], 1)
+        self.assertEqual(rejected.json()["errors"], {"client_id": "Por favor seleccione un dueño válido"})
+
+
+class AppointmentsTest(TestCase):
+    """
+    Pruebas de las páginas de turnos y de la consulta de huecos libres.
+    """
+    def setUp(self):
+        """
+        Crea una mascota y un veterinario.
+        """
+        self.pet = PetFactory.create(name="Firulais")
+        self.vet = VeterinaryFactory.create()
+        self.start = (timezone.localtime() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def post(self, start, end, **extra):
+        """
+        Envía el formulario de turnos.
+        """
+        return self.client.post(reverse("appointments_form"), data={
+            "pet_id": self.pet.id,
+            "veterinary_id": self.vet.id,
+            "start": start.strftime("%Y-%m-%dT%H:%M"),
+            "end": end.strftime("%Y-%m-%dT%H:%M"),
+            **extra,
+        })
+
+    def test_booking_and_double_booking(self):
+        """
+        Verifica que el formulario reserve un turno y rechace un horario superpuesto.
+        """
+        response = self.post(self.start, self.start + timedelta(hours=1))
+        conflict = self.post(self.start + timedelta(minutes=30), self.start + timedelta(hours=2))
+
+        self.assertRedirects(response, reverse("appointments_repo"))
+        self.assertContains(conflict, OVERLAP_MESSAGE)
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_edit_form_and_cancel(self):
+        """
+        Verifica que el formulario de edición muestre el horario y que se pueda cancelar el turno.
+        """
+        self.post(self.start, self.start + timedelta(hours=1))
+        appointment = Appointment.objects.get()
+
+        form = self.client.get(reverse("appointments_edit", args=[appointment.id]))
+        moved = self.post(
+            self.start + timedelta(hours=2), self.start + timedelta(hours=3),
+            id=appointment.id, version=appointment.version,
+        )
+        cancelled = self.client.post(reverse("appointments_delete"), data={"appointment_id": appointment.id})
+
+        self.assertContains(form, self.start.strftime("%Y-%m-%dT%H:%M"))
+        self.assertRedirects(moved, reverse("appointments_repo"))
+        self.assertRedirects(cancelled, reverse("appointments_repo"))
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_cancel_rejects_gets_and_invalid_ids(self):
+        """
+        Verifica que un turno solo se cancele por POST y con el ID de un turno existente.
+        """
+        self.post(self.start, self.start + timedelta(hours=1))
+        appointment = Appointment.objects.get()
+        url = reverse("appointments_delete")
+
+        self.assertEqual(self.client.get(url, {"appointment_id": appointment.id}).status_code, 405)
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(self.client.post(url, data={"appointment_id": "uno"}).status_code, 400)
+        self.assertEqual(self.client.post(url, data={"appointment_id": appointment.id + 1}).status_code, 404)
+        self.assertTrue(Appointment.objects.exists())
+
+    def test_repository_reads_related_rows_in_one_query(self):
+        """
+        Verifica que la página de turnos muestre mascota y veterinario con una sola consulta.
+        """
+        for hours in range(5):
+            Appointment.objects.create(
+                pet=self.pet, veterinary=self.vet,
+                start=self.start + timedelta(hours=hours), end=self.start + timedelta(hours=hours, minutes=30),
+            )
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("appointments_repo"))
+
+        self.assertContains(response, "Firulais", count=5)
+        self.assertContains(response, self.vet.name, count=5)
+
+    def test_free_slots_endpoint(self):
+        """
+        Verifica los huecos libres devueltos como JSON y el error ante parámetros inválidos.
+        """
+        self.post(self.start, self.start + timedelta(hours=1))
+        url = reverse("appointments_free_slots")
+
+        response = self.client.get(url, {"veterinary_id": self.vet.id, "date": self.start.date().isoformat()})
+        long_slots = self.client.get(
+            url, {"veterinary_id": self.vet.id, "date": self.start.date().isoformat(), "minutes": 61},
+        )
+        invalid = self.client.get(url, {"veterinary_id": self.vet.id, "date": "mañana"})
+
+        slots = response.json()["slots"]
+        self.assertEqual(len(slots), 2)
+        self.assertEqual(datetime.fromisoformat(slots[0]["end"]), self.start)
+        self.assertEqual(len(long_slots.json()["slots"]), 1)
+        self.assertEqual(invalid.status_code, 400)
+
+
+class PetPrescriptionsTest(TestCase):
+    """
+    Pruebas de la página de recetas de una mascota.
+    """
+    def setUp(self):
+        """
+        Crea una mascota, un veterinario y un medicamento asociado a un producto con 2 unidades.
+        """
+        self.pet = PetFactory.create(name="Firulais")
+        self.vet = VeterinaryFactory.create()
+        self.product = ProductFactory.create(stock=2)
+        self.med = MedFactory.create(name="Amoxicilina", product=self.product)
+        self.url = reverse("pets_prescriptions", kwargs={"id": self.pet.id})
+
+    def post(self, quantity):
+        """
+        Envía el formulario de recetas.
+        """
+        return self.client.post(self.url, data={
+            "med_id": self.med.id, "veterinary_id": self.vet.id, "quantity": quantity,
+        })
+
+    def test_prescribe_and_dispense(self):
+        """
+        Verifica que se pueda recetar y dispensar, y que el stock se descuente.
+        """
+        response = self.post(2)
+        prescription = Prescription.objects.get()
+
+        self.assertRedirects(response, self.url)
+        self.assertContains(self.client.get(self.url), "Amoxicilina")
+
+        response = self.client.post(reverse("prescriptions_dispense"), data={"prescription_id": prescription.id})
+
+        self.assertRedirects(response, self.url)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+        self.assertContains(self.client.get(self.url), "Dispensada el")
+
+    def test_dispense_without_stock_shows_error(self):
+        """
+        Verifica que una dispensa sin stock suficiente se informe y no descuente nada.
+        """
+        self.post(3)
+        prescription = Prescription.objects.get()
+
+        response = self.client.post(
+            reverse("prescriptions_dispense"), data={"prescription_id": prescription.id}, follow=True,
+        )
+
+        self.assertContains(response, STOCK_MESSAGE)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 2)
+
+    def test_dispense_rejects_gets_and_invalid_ids(self):
+        """
+        Verifica que solo se dispense por POST y con el ID de una receta existente.
+        """
+        self.post(2)
+        prescription = Prescription.objects.get()
+        url = reverse("prescriptions_dispense")
+
+        self.assertEqual(self.client.get(url, {"prescription_id": prescription.id}).status_code, 405)
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(self.client.post(url, data={"prescription_id": "-1"}).status_code, 400)
+        self.assertEqual(self.client.post(url, data={"prescription_id": prescription.id + 1}).status_code, 404)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 2)
+
+    def test_invalid_prescription_shows_errors(self):
+        """
+        Verifica que una receta inválida vuelva a mostrar el formulario con sus errores.
+        """
+        response = self.post(0)
+
+        self.assertContains(response, "La cantidad debe ser de al menos 1")
+        self.assertFalse(Prescription.objects.exists())
+
+    def test_med_form_links_a_product(self):
+        """
+        Verifica que el formulario de medicamentos ofrezca y guarde el producto del inventario.
+        """
+        self.assertContains(self.client.get(reverse("meds_form")), self.product.name)
+
+        self.client.post(reverse("meds_form"), data={
+            "name": "Ivermectina", "desc": "Antiparasitario", "dose": "3", "product_id": self.product.id,
+        })
+
+        self.assertEqual(Med.objects.get(name="Ivermectina").product, self.product)
+
+
+class SalesTest(TestCase):
+    """
+    Pruebas de las páginas de ventas: carrito, cobro y facturas.
+    """
+    def setUp(self):
+        """
+        Crea un producto con 3 unidades.
+        """
+        self.product = ProductFactory.create(name="Alimento", price=10.0, stock=3)
+
+    def open_sale(self, quantity):
+        """
+        Abre una venta con `quantity` unidades del producto y devuelve la venta.
+        """
+        response = self.client.post(reverse("sales_new"))
+        sale = Sale.objects.latest("pk")
+        self.assertRedirects(response, reverse("sales_detail", kwargs={"id": sale.id}))
+        self.client.post(
+            reverse("sales_detail", kwargs={"id": sale.id}),
+            data={"product_id": self.product.id, "quantity": quantity},
+        )
+        return sale
+
+    def test_cart_checkout_and_invoice(self):
+        """
+        Verifica que se pueda armar el carrito, cobrarlo y ver la factura en el listado.
+        """
+        sale = self.open_sale(2)
+
+        response = self.client.get(reverse("sales_detail", kwargs={"id": sale.id}))
+        self.assertContains(response, "Alimento")
+        self.assertContains(response, "Cobrar")
+
+        response = self.client.post(reverse("sales_checkout"), data={"sale_id": sale.id}, follow=True)
+
+        self.assertContains(response, f"Venta {sale.id} cobrada por $20.00.")
+        self.assertContains(response, f"Factura {sale.id}")
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+        self.assertContains(self.client.get(reverse("sales_repo")), "$20.00")
+
+    def test_checkout_without_stock_shows_error(self):
+        """
+        Verifica que un cobro sin stock suficiente se informe y deje la venta abierta.
+        """
+        sale = self.open_sale(2)
+        Product.objects.filter(pk=self.product.pk).update(stock=1)
+
+        response = self.client.post(reverse("sales_checkout"), data={"sale_id": sale.id}, follow=True)
+
+        self.assertContains(response, "No hay stock suficiente de: Alimento.")
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+        self.assertIsNone(Sale.objects.get(pk=sale.pk).paid_at)
+
+    def test_cart_reserves_stock(self):
+        """
+        Verifica que lo agregado a un carrito se muestre reservado y que otro carrito no
+        pueda agregar más de lo disponible.
+        """
+        self.open_sale(2)
+        sale = self.open_sale(0)
+
+        response = self.client.post(
+            reverse("sales_detail", kwargs={"id": sale.id}), data={"product_id": self.product.id, "quantity": 2},
+        )
+
+        self.assertContains(response, "No hay stock disponible suficiente de Alimento.")
+        self.assertContains(response, "disponible 1")
+        self.assertContains(
+            self.client.get(reverse("products_repo")), f'<td data-available-id="{self.product.id}">1</td>', html=True,
+        )
+
+    def test_invalid_line_shows_errors(self):
+        """
+        Verifica que un producto inválido vuelva a mostrar el formulario con sus errores.
+        """
+        sale = self.open_sale(0)
+
+        response = self.client.post(
+            reverse("sales_detail", kwargs={"id": sale.id}), data={"product_id": self.product.id, "quantity": 0},
+        )
+
+        self.assertContains(response, "La cantidad debe ser de al menos 1")
+        self.assertFalse(sale.lines.exists())
+
+    def test_remove_line_and_discard_sale(self):
+        """
+        Verifica que se pueda quitar un producto del carrito y descartar la venta abierta.
+        """
+        sale = self.open_sale(1)
+
+        self.client.post(reverse("sales_remove_line"), data={"sale_id": sale.id, "line_id": sale.lines.get().id})
+        self.assertFalse(sale.lines.exists())
+
+        response = self.client.post(reverse("sales_delete"), data={"sale_id": sale.id})
+
+        self.assertRedirects(response, reverse("sales_repo"))
+        self.assertFalse(Sale.objects.exists())
+
+    def test_new_sale_requires_post(self):
+        """
+        Verifica que abrir una venta no pueda hacerse con un GET.
+        """
+        self.assertEqual(self.client.get(reverse("sales_new")).status_code, 405)
+        self.assertFalse(Sale.objects.exists())
+
+    def test_cart_actions_reject_gets_and_invalid_ids(self):
+        """
+        Verifica que quitar líneas, cobrar y descartar solo se acepten por POST y con IDs
+        existentes, sin tocar la venta.
+        """
+        sale = self.open_sale(1)
+        line = sale.lines.get()
+        other = Sale.objects.create()
+
+        for name in ("sales_remove_line", "sales_checkout", "sales_delete"):
+            with self.subTest(name):
+                url = reverse(name)
+                self.assertEqual(self.client.get(url, {"sale_id": sale.id}).status_code, 405)
+                self.assertEqual(self.client.post(url).status_code, 400)
+                self.assertEqual(self.client.post(url, data={"sale_id": "x", "line_id": line.id}).status_code, 400)
+                self.assertEqual(self.client.post(url, data={"sale_id": 0, "line_id": line.id}).status_code, 404)
+
+        url = reverse("sales_remove_line")
+        self.assertEqual(self.client.post(url, data={"sale_id": sale.id}).status_code, 400)
+        self.assertEqual(self.client.post(url, data={"sale_id": other.id, "line_id": line.id}).status_code, 404)
+        self.assertTrue(sale.lines.exists())
+        sale.refresh_from_db()
+        self.assertIsNone(sale.paid_at)
+
+
+class ReportsPageTest(TestCase):
+    """
+    Pruebas de la página de reportes.
+    """
+    def setUp(self):
+        """
+        Vacía la caché de los reportes.
+        """
+        cache.clear()
+
+    def test_reports_page_shows_inventory_and_top_sellers(self):
+        """
+        Verifica que la página muestre el valor por tipo y los productos vendidos.
+        """
+        product = ProductFactory.create(name="Alimento", type="Alimento", price=10.0, stock=5)
+        sale = Sale.objects.create()
+        sale.add_line({"product_id": product.id, "quantity": 2})
+        sale.checkout()
+
+        response = self.client.get(reverse("reports"))
+
+        self.assertContains(response, "Valor del inventario por tipo")
+        self.assertContains(response, "$30.00", count=2)
+        self.assertContains(response, "<td>Alimento</td>", count=2, html=True)
+        self.assertContains(response, "$20.00")
+
+    def test_empty_reports(self):
+        """
+        Verifica que la página funcione sin productos ni ventas.
+        """
+        response = self.client.get(reverse("reports"))
+
+        self.assertContains(response, "No existen productos")
+        self.assertContains(response, "No existen ventas cobradas")
+
+
+class PetSchedulesTest(TestCase):
+    """
+    Pruebas de la página de vacunas y tratamientos de una mascota.
+    """
+    def setUp(self):
+        """
+        Crea una mascota.
+        """
+        self.pet = PetFactory.create(name="Firulais")
+        self.url = reverse("pets_schedules", kwargs={"id": self.pet.id})
+
+    def test_create_and_apply_dose(self):
+        """
+        Verifica que se pueda crear un plan y registrar la dosis aplicada.
+        """
+        today = timezone.localdate()
+        response = self.client.post(self.url, data={
+            "kind": "Vacuna", "name": "Antirrábica", "next_due": today.isoformat(), "interval_days": "365",
+        })
+        schedule = Schedule.objects.get()
+
+        self.assertRedirects(response, self.url)
+        self.assertContains(self.client.get(self.url), "Vencida")
+
+        response = self.client.post(reverse("schedules_apply"), data={"schedule_id": schedule.id})
+
+        self.assertRedirects(response, self.url)
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_due, today + timedelta(days=365))
+        self.assertNotContains(self.client.get(self.url), "Vencida")
+
+    def test_invalid_plan_shows_errors(self):
+        """
+        Verifica que un plan inválido vuelva a mostrar el formulario con sus errores.
+        """
+        response = self.client.post(self.url, data={"kind": "Vacuna", "name": "Triple", "next_due": "mañana"})
+
+        self.assertContains(response, "Formato de fecha invalido")
+        self.assertContains(response, 'value="Triple"')
+        self.assertFalse(Schedule.objects.exists())
+
+    def test_pets_list_links_to_schedules(self):
+        """
+        Verifica que el listado de mascotas enlace a sus vacunas.
+        """
+        self.assertContains(self.client.get(reverse("pets_repo")), self.url)
+
+    def test_apply_dose_rejects_gets_and_invalid_ids(self):
+        """
+        Verifica que la dosis solo se registre por POST y con el ID de un plan existente.
+        """
+        today = timezone.localdate()
+        schedule = Schedule.objects.create(
+            pet=self.pet, kind="Vacuna", name="Antirrábica", next_due=today, interval_days=365,
+        )
+        url = reverse("schedules_apply")
+
+        self.assertEqual(self.client.get(url, {"schedule_id": schedule.id}).status_code, 405)
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(self.client.post(url, data={"schedule_id": "uno"}).status_code, 400)
+        self.assertEqual(self.client.post(url, data={"schedule_id": schedule.id + 1}).status_code, 404)
+        self.assertEqual(self.client.post(url, data={"schedule_id": 2 ** 70}).status_code, 404)
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_due, today)
+
+
+class AppointmentCalendarTest(TestCase):
+    """
+    Pruebas de la página de agenda semanal.
+    """
+    def setUp(self):
+        """
+        Vacía la caché y reserva un turno.
+        """
+        cache.clear()
+        self.vet = VeterinaryFactory.create(name="Ana")
+        self.monday = date(2030, 3, 4)
+        self.appointment, _ = Appointment.save_appointment({
+            "pet_id": PetFactory.create(name="Firulais").id,
+            "veterinary_id": self.vet.id,
+            "start": "2030-03-06T10:00",
+            "end": "2030-03-06T11:00",
+        })
+
+    def test_calendar_shows_the_week(self):
+        """
+        Verifica que la agenda muestre los turnos de la semana pedida y enlace las semanas vecinas.
+        """
+        response = self.client.get(reverse("appointments_calendar"), {"week": "2030-03-06"})
+
+        self.assertTemplateUsed(response, "appointments/calendar.html")
+        self.assertEqual(response.context["monday"], self.monday)
+        self.assertContains(response, "Ana")
+        self.assertContains(response, 'rowspan="2"')
+        self.assertContains(response, reverse("appointments_edit", kwargs={"id": self.appointment.id}))
+        self.assertContains(response, "?week=2030-02-25")
+        self.assertContains(response, "?week=2030-03-11")
+
+    def test_calendar_defaults_to_current_week(self):
+        """
+        Verifica que sin semana, o con una fecha inválida, se muestre la semana actual.
+        """
+        today = timezone.localdate()
+        monday = today - timedelta(days=today.weekday())
+
+        for params in ({}, {"week": "no-es-fecha"}):
+            response = self.client.get(reverse("appointments_calendar"), params)
+            self.assertEqual(response.context["monday"], monday)
+            self.assertNotContains(response, "Firulais")
+
+    def test_rescheduling_from_the_form_updates_the_calendar(self):
+        """
+        Verifica que una reprogramación desde el formulario se vea en la agenda en caché.
+        """
+        url = reverse("appointments_calendar")
+        self.client.get(url, {"week": "2030-03-04"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("appointments_form"), data={
+                "id": self.appointment.id,
+                "version": self.appointment.version,
+                "pet_id": self.appointment.pet_id,
+                "veterinary_id": self.vet.id,
+                "start": "2030-03-13T10:00",
+                "end": "2030-03-13T11:00",
+            })
+
+        self.assertNotContains(self.client.get(url, {"week": "2030-03-04"}), "Firulais")
+        self.assertContains(self.client.get(url, {"week": "2030-03-11"}), "Firulais")
+
+
+@override_settings(ROOT_URLCONF="vetsoft.urls_async")
+class AsyncViewsTest(TestCase):
+    """
+    Pruebas de las vistas asíncronas que se usan con ASYNC_VIEWS (modo ASGI).
+    """
+    async def test_repositories_are_served_by_async_views(self):
+        """
+        Verifica que los listados se resuelvan a las vistas asíncronas y muestren los registros.
+        """
+        client = await sync_to_async(ClientFactory.create)(name="Juan Sebastián Veron")
+        pet = await sync_to_async(PetFactory.create)(name="Firulais")
+
+        await sync_to_async(PetFactory.create)(client=client, name="Michi")
+
+        clients = await self.async_client.get(reverse("clients_repo"))
+        pets = await self.async_client.get(reverse("pets_repo"))
+        form = await self.async_client.get(reverse("pets_form"))
+
+        self.assertEqual(clients.resolver_match.func, async_views.clients_repository)
+        self.assertTemplateUsed(clients, "clients/repository.html")
+        self.assertContains(clients, client.name)
+        self.assertContains(clients, "Michi")
+        self.assertContains(pets, pet.name)
+        self.assertContains(pets, client.name)
+        self.assertEqual(form.context["clients"], [client])
+        for name in ("products_repo", "providers_repo", "veterinary_repo", "meds_repo"):
+            response = await self.async_client.get(reverse(name))
+            self.assertEqual(response.status_code, 200)
+
+    async def test_products_repository_warns_about_empty_stock(self):
+        """
+        Verifica que la variante asíncrona avise de los productos sin stock.
+        """
+        await sync_to_async(ProductFactory.create)(name="Lavandina", stock=0)
+
+        response = await self.async_client.get(reverse("products_repo"))
+
+        self.assertContains(response, 'El stock del producto &quot;Lavandina&quot; es 0.')
+        self.assertContains(response, "js/stock_events.js")
+
+    async def test_edit_form_reads_the_record(self):
+        """
+        Verifica que el formulario de edición lea el registro con aget() y responda 404 si no existe.
+        """
+        product = await sync_to_async(ProductFactory.create)(name="Lavandina")
+
+        response = await self.async_client.get(reverse("products_edit", args=[product.id]))
+        missing = await self.async_client.get(reverse("products_edit", args=[product.id + 1]))
+        empty = await self.async_client.get(reverse("clients_form"))
+
+        self.assertEqual(response.resolver_match.func, async_views.products_form)
+        self.assertEqual(response.context["product"], product)
+        self.assertEqual(missing.status_code, 404)
+        self.assertIsNone(empty.context["client"])
+        self.assertIn("La Plata", empty.context["cities"])
+
+    async def test_form_submissions_use_the_sync_view(self):
+        """
+        Verifica que el POST de un formulario asíncrono se procese con la vista síncrona.
+        """
+        response = await self.async_client.post(
+            reverse("providers_form"),
+            data={"name": "Proveedor", "email": "proveedor@example.com", "address": "Calle 7 1234"},
+        )
+
+        self.assertRedirects(response, reverse("providers_repo"), fetch_redirect_response=False)
+        self.assertTrue(await Provider.objects.filter(name="Proveedor").aexists())
@@ -1,20 +1,80 @@
+import asyncio
+import json
+import logging
+import tempfile
 from datetime import date, timedelta
-
-from django.test import TestCase
+from io import StringIO
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-
+from django.utils import timezone
+
+from app import agenda, reports, summaries
+from app.db_logging import JsonFormatter, SlowQueryLogMiddleware
+from app.events import (
+    Broker,
+    ChangeLogBroker,
+    InProcessBroker,
+    format_event,
+    get_broker,
+    offer,
+)
+from app.factories import (
+    ClientFactory,
+    MedFactory,
+    PetFactory,
+    ProductFactory,
+    ProviderFactory,
+    VeterinaryFactory,
+    letters,
+)
 from app.models import (
+    DISPENSED_MESSAGE,
+    NO_PRODUCT_MESSAGE,
+    OVERLAP_MESSAGE,
+    PAID_MESSAGE,
+    STOCK_MESSAGE,
+    Appointment,
     Client,
     Med,
     Pet,
+    Prescription,
     Product,
     Provider,
+    Reminder,
+    ReminderRun,
+    Reservation,
+    Sale,
+    Schedule,
+    SummaryCount,
     Veterinary,
+    day_of_year,
     validate_client,
+    validate_med,
     validate_pet,
+    validate_product,
     validate_provider,
     validate_veterinary,
 )
+from app.profiling import ProfilerMiddleware, is_valid_profile_token, make_profile_token
+from app.reminders import generate_reminders
+from app.validation import client_validator, pet_validator
+
+
+def statements(queries):
+    """
+    Devuelve el SQL de las consultas capturadas sin los SAVEPOINT de las transacciones anidadas.
+    """
+    return [query["sql"] for query in queries if "SAVEPOINT" not in query["sql"]]
 
 
 class ClientModelTest(TestCase):
@@ -859,6 +919,112 @@ class PetModelTest(TestCase):
         pet_updated = Pet.objects.get(pk=1)
         self.assertEqual(pet_updated.birthday, date(2021, 1, 1))
 
+    def test_pet_can_have_an_owner(self):
+        """
+        Verifica que save_pet y update_pet guarden el dueño y rechacen uno inexistente.
+        """
+        owner, other = ClientFactory.create_batch(2)
+        data = {"name": "Benita", "breed": "Perro", "birthday": "2021-01-01"}
+
+        pet, errors = Pet.save_pet({**data, "client_id": str(owner.id)})
+        saved, update_errors = pet.update_pet({"client_id": other.id})
+        missing, missing_errors = Pet.save_pet({**data, "client_id": str(other.id + 1)})
+
+        self.assertIsNone(errors)
+        self.assertTrue(saved, update_errors)
+        self.assertEqual(Pet.objects.get(pk=pet.pk).client, other)
+        self.assertEqual(list(other.pets.all()), [pet])
+        self.assertFalse(missing)
+        self.assertEqual(missing_errors, {"client_id": "Por favor seleccione un dueño válido"})
+        self.assertEqual(pet.update_pet({"client_id": other.id + 1})[1], missing_errors)
+
+
+class UpcomingBirthdaysTest(TestCase):
+    """
+    Pruebas del día del año guardado de las mascotas y de la búsqueda de cumpleaños.
+    """
+    def pet(self, name, birthday):
+        """
+        Crea una mascota nacida en `birthday`.
+        """
+        return PetFactory.create(name=name, birthday=birthday)
+
+    def upcoming(self, days, today):
+        """
+        Devuelve los nombres de las mascotas que cumplen años en la ventana, en orden.
+        """
+        return [name for pets in Pet.upcoming_birthdays(days, today) for name in pets.values_list("name", flat=True)]
+
+    def test_day_of_year_is_stable_across_leap_years(self):
+        """
+        Verifica que cada fecha tenga el mismo número en cualquier año.
+        """
+        self.assertEqual(day_of_year(date(2023, 2, 28)), 59)
+        self.assertEqual(day_of_year(date(2020, 2, 29)), 60)
+        self.assertEqual(day_of_year(date(2023, 3, 1)), 61)
+        self.assertEqual(day_of_year(date(2023, 12, 31)), 366)
+
+    def test_day_of_year_is_maintained_on_every_write(self):
+        """
+        Verifica que la columna se calcule al crear, al editar y en las altas en lote.
+        """
+        pet, _ = Pet.save_pet({"name": "Benita", "breed": "Perro", "birthday": "2021-03-01"})
+        Pet.objects.bulk_create([Pet(name="Paco", breed="Gato", birthday=date(2020, 12, 31))])
+        pet.update_pet({"birthday": "2020-02-29"})
+
+        self.assertEqual(pet.birthday_doy, 60)
+        self.assertEqual(
+            dict(Pet.objects.values_list("name", "birthday_doy")), {"Benita": 60, "Paco": 366},
+        )
+
+    def test_window_within_the_year(self):
+        """
+        Verifica que se devuelvan solo los cumpleaños de la ventana, del más cercano al más lejano.
+        """
+        self.pet("Tarde", date(2019, 6, 20))
+        self.pet("Pronto", date(2018, 6, 11))
+        self.pet("Hoy", date(2020, 6, 10))
+        self.pet("Ayer", date(2020, 6, 9))
+        self.pet("Borrada", date(2020, 6, 12)).delete()
+
+        self.assertEqual(self.upcoming(10, date(2030, 6, 10)), ["Hoy", "Pronto", "Tarde"])
+        self.assertEqual(self.upcoming(0, date(2030, 6, 10)), ["Hoy"])
+
+    def test_window_wraps_around_year_end(self):
+        """
+        Verifica que una ventana que cruza el fin de año incluya enero después de diciembre.
+        """
+        self.pet("Enero", date(2019, 1, 2))
+        self.pet("Diciembre", date(2019, 12, 30))
+        self.pet("Febrero", date(2019, 2, 1))
+
+        self.assertEqual(self.upcoming(7, date(2030, 12, 28)), ["Diciembre", "Enero"])
+        self.assertEqual(self.upcoming(400, date(2030, 12, 28)), ["Diciembre", "Enero", "Febrero"])
+        self.assertEqual(Pet.birthday_windows(365, date(2030, 1, 1)), [(1, 366)])
+
+    def test_leap_day_birthdays_in_common_years(self):
+        """
+        Verifica que los nacidos un 29 de febrero cumplan el 28 en los años no bisiestos.
+        """
+        pet = self.pet("Bisiesta", date(2020, 2, 29))
+
+        self.assertEqual(self.upcoming(0, date(2031, 2, 28)), ["Bisiesta"])
+        self.assertEqual(self.upcoming(0, date(2032, 2, 29)), ["Bisiesta"])
+        self.assertEqual(self.upcoming(0, date(2031, 3, 1)), [])
+        self.assertEqual(pet.next_birthday(date(2031, 2, 1)), date(2031, 2, 28))
+        self.assertEqual(pet.next_birthday(date(2031, 3, 1)), date(2032, 2, 29))
+
+    def test_window_is_read_from_the_index(self):
+        """
+        Verifica que la búsqueda recorra el índice de `birthday_doy`.
+        """
+        plans = [pets.explain() for pets in Pet.upcoming_birthdays(7, date(2030, 12, 28))]
+
+        self.assertEqual(len(plans), 2)
+        for plan in plans:
+            self.assertIn("USING INDEX app_pet_birthday_doy", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
 
 class VeterinaryModelTest(TestCase):
     """
@@ -944,3 +1110,1689 @@ class VeterinaryModelTest(TestCase):
         veterinary.update_veterinary({"phone": "5414504506"})
         veterinary_updated = Veterinary.objects.get(pk=1)
         self.assertEqual(veterinary_updated.phone, "5414504506")
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_EXPLAIN_SAMPLE_RATE=1)
+class SlowQueryLogTest(TestCase):
+    """
+    Pruebas del registro de consultas lentas instalado por SlowQueryLogMiddleware.
+    """
+    def test_logs_query_with_view_frame_and_plan(self):
+        """
+        Verifica que la consulta de products_repository quede registrada con su vista,
+        el frame de app/views.py y el plan de ejecución de SQLite.
+        """
+        Product.objects.create(name="Lavandina", type="Limpieza", price=100, stock=5)
+
+        with self.assertLogs("app.slow_queries", level="WARNING") as logs:
+            self.client.get(reverse("products_repo"))
+
+        entries = [record.query for record in logs.records]
+        entry = next(entry for entry in entries if '"app_product"' in entry["sql"])
+        self.assertEqual(entry["view"], "products_repo")
+        self.assertTrue(entry["frame"].startswith("app/views.py:"))
+        self.assertIn("products_repository", entry["frame"])
+        self.assertTrue(any("SCAN" in row for row in entry["plan"]))
+
+    def test_json_formatter_includes_query_fields(self):
+        """
+        Verifica que JsonFormatter serialice el mensaje junto con los datos de la consulta.
+        """
+        record = logging.LogRecord(
+            "app.slow_queries", logging.WARNING, __file__, 1, "slow query", None, None,
+        )
+        record.query = {"duration_ms": 12.5, "view": "products_repo"}
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual(entry["message"], "slow query")
+        self.assertEqual(entry["duration_ms"], 12.5)
+        self.assertEqual(entry["view"], "products_repo")
+
+    @override_settings(ROOT_URLCONF="vetsoft.urls_async", SLOW_QUERY_THRESHOLD_MS=0)
+    async def test_logs_queries_of_async_views(self):
+        """
+        Verifica que el middleware también registre las consultas del ORM asíncrono.
+        """
+        with self.assertLogs("app.slow_queries", level="WARNING") as logs:
+            await self.async_client.get(reverse("products_repo"))
+
+        entry = next(record.query for record in logs.records if '"app_product"' in record.query["sql"])
+        self.assertEqual(entry["view"], "products_repo")
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=10_000)
+    def test_fast_queries_are_not_logged(self):
+        """
+        Verifica que las consultas por debajo del umbral no se registren.
+        """
+        with self.assertNoLogs("app.slow_queries", level="WARNING"):
+            self.client.get(reverse("products_repo"))
+
+
+class ProfilerMiddlewareTest(TestCase):
+    """
+    Pruebas del perfilado bajo demanda de ProfilerMiddleware y del comando profiles.
+    """
+    def setUp(self):
+        """
+        Usa un directorio temporal como PROFILE_DIR.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_override = override_settings(PROFILE_DIR=self.directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_staff_query_param_saves_pstats_and_collapsed_stacks(self):
+        """
+        Verifica que un usuario staff con ?profile=1 genere el .prof y el .collapsed.
+        """
+        staff = User.objects.create_user("staff", password="secreto", is_staff=True)
+        self.client.force_login(staff)
+
+        response = self.client.get(reverse("products_repo"), {"profile": "1"})
+
+        prefix = response["X-Vetsoft-Profile"]
+        self.assertTrue((Path(self.directory.name) / f"{prefix}.prof").exists())
+        self.assertTrue((Path(self.directory.name) / f"{prefix}.collapsed").exists())
+
+    def test_query_param_is_ignored_for_anonymous_users(self):
+        """
+        Verifica que ?profile=1 no tenga efecto sin un usuario staff.
+        """
+        response = self.client.get(reverse("products_repo"), {"profile": "1"})
+
+        self.assertNotIn("X-Vetsoft-Profile", response)
+        self.assertEqual(list(Path(self.directory.name).iterdir()), [])
+
+    def test_signed_header_enables_profiling_and_command_lists_it(self):
+        """
+        Verifica que el header firmado habilite el perfilado y que el comando lo liste.
+        """
+        response = self.client.get(
+            reverse("products_repo"), headers={"X-Vetsoft-Profile": make_profile_token()},
+        )
+        rejected = self.client.get(
+            reverse("products_repo"), headers={"X-Vetsoft-Profile": "token-invalido"},
+        )
+
+        self.assertNotIn("X-Vetsoft-Profile", rejected)
+        out = StringIO()
+        call_command("profiles", stdout=out)
+        self.assertIn(response["X-Vetsoft-Profile"], out.getvalue())
+
+    def test_async_mode_does_not_wrap_process_view_in_a_thread(self):
+        """
+        Verifica que los middlewares propios funcionen en modo asíncrono sin adaptar.
+        """
+        async def get_response(request):
+            return None
+
+        profiler = ProfilerMiddleware(get_response)
+        slow_queries = SlowQueryLogMiddleware(get_response)
+
+        self.assertTrue(iscoroutinefunction(profiler))
+        self.assertTrue(iscoroutinefunction(profiler.process_view))
+        self.assertTrue(iscoroutinefunction(slow_queries))
+
+    @override_settings(ROOT_URLCONF="vetsoft.urls_async")
+    async def test_profiles_async_and_sync_views_under_asgi(self):
+        """
+        Verifica el perfilado en modo asíncrono de una vista asíncrona y de una síncrona.
+        """
+        staff = await sync_to_async(User.objects.create_user)("staff", password="secreto", is_staff=True)
+        anonymous = await self.async_client.get(reverse("products_repo"), {"profile": "1"})
+        await self.async_client.aforce_login(staff)
+
+        async_view = await self.async_client.get(reverse("products_repo"), {"profile": "1"})
+        sync_view = await self.async_client.get(
+            reverse("api_collection", args=["products"]), headers={"X-Vetsoft-Profile": make_profile_token()},
+        )
+
+        for response in (async_view, sync_view):
+            prefix = response["X-Vetsoft-Profile"]
+            self.assertTrue((Path(self.directory.name) / f"{prefix}.prof").exists())
+            self.assertTrue((Path(self.directory.name) / f"{prefix}.collapsed").exists())
+        self.assertNotIn("X-Vetsoft-Profile", anonymous)
+
+    def test_command_prints_token_and_reports_empty_directory(self):
+        """
+        Verifica que el comando genere un token válido y avise cuando no hay perfiles.
+        """
+        token = StringIO()
+        call_command("profiles", "--token", stdout=token)
+        empty = StringIO()
+        call_command("profiles", stdout=empty)
+
+        self.assertTrue(is_valid_profile_token(token.getvalue().strip()))
+        self.assertIn("No hay perfiles", empty.getvalue())
+
+
+class SquashedMigrationTest(TestCase):
+    """
+    Verifica que la migración squash produzca el mismo esquema que el historial original.
+    """
+    squashed = ("app", "0001_squashed_0013_merge_20240605_2343")
+    original_leaf = ("app", "0013_merge_20240605_2343")
+
+    @staticmethod
+    def schema(state):
+        """
+        Devuelve los campos deconstruidos y las opciones de cada modelo de la app.
+        """
+        return {
+            name: (
+                {field_name: field.deconstruct()[1:] for field_name, field in model.fields.items()},
+                model.options,
+            )
+            for (app_label, name), model in state.models.items()
+            if app_label == "app"
+        }
+
+    def test_squash_matches_original_history(self):
+        """
+        Compara el estado final de ambos caminos de migración.
+        """
+        loader = MigrationLoader(None, replace_migrations=False)
+
+        original = loader.project_state(self.original_leaf)
+        squashed = loader.project_state(self.squashed)
+
+        self.assertEqual(self.schema(squashed), self.schema(original))
+
+    def test_fresh_databases_use_the_squashed_migration(self):
+        """
+        Verifica que una base nueva aplique la migración squash en lugar de las originales.
+        """
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        loader.applied_migrations = {}
+        loader.build_graph()
+
+        self.assertIn(self.squashed, loader.graph.nodes)
+        self.assertNotIn(self.original_leaf, loader.graph.nodes)
+
+
+class FactoriesTest(TestCase):
+    """
+    Pruebas de las fábricas de datos de app/factories.py.
+    """
+    def test_generated_data_is_valid(self):
+        """
+        Verifica que los datos de cada fábrica pasen la validación de su modelo.
+        """
+        cases = [
+            (ClientFactory, validate_client),
+            (ProviderFactory, validate_provider),
+            (ProductFactory, validate_product),
+            (VeterinaryFactory, validate_veterinary),
+            (PetFactory, validate_pet),
+            (MedFactory, validate_med),
+        ]
+        for factory, validate in cases:
+            with self.subTest(factory=factory.__name__):
+                for _ in range(30):
+                    self.assertEqual(validate(factory.data()), {})
+
+    def test_build_batch_does_not_touch_the_database(self):
+        """
+        Verifica que build_batch devuelva instancias sin guardar.
+        """
+        with self.assertNumQueries(0):
+            pets = PetFactory.build_batch(5, breed="Gato")
+
+        self.assertEqual(len(pets), 5)
+        self.assertTrue(all(pet.pk is None and pet.breed == "Gato" for pet in pets))
+
+    def test_create_batch_uses_a_single_insert(self):
+        """
+        Verifica que create_batch guarde todo el lote, y su registro de cambios, con un INSERT cada uno.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            ClientFactory.create_batch(50)
+
+        inserts = statements(queries)
+        self.assertEqual(len(inserts), 2)
+        self.assertTrue(inserts[0].startswith('INSERT INTO "app_client"'))
+        self.assertTrue(inserts[1].startswith('INSERT INTO "app_change"'))
+
+        self.assertEqual(Client.objects.count(), 50)
+        self.assertEqual(Client.objects.values("email").distinct().count(), 50)
+
+    def test_letters(self):
+        """
+        Verifica la conversión de números a letras usada en los nombres.
+        """
+        self.assertEqual([letters(1), letters(26), letters(27)], ["A", "Z", "AA"])
+
+
+class ValidationEngineTest(TestCase):
+    """
+    Pruebas del motor de validación compartido de app/validation.py.
+    """
+    def test_partial_only_validates_sent_fields(self):
+        """
+        Verifica que en modo parcial se ignoren los campos ausentes o vacíos.
+        """
+        self.assertEqual(client_validator({"phone": "", "name": "Ana"}, partial=True), {})
+        self.assertEqual(
+            client_validator({"phone": "1234"}, partial=True),
+            {"phone": "El telefono debe comenzar con '54'"},
+        )
+
+    def test_first_failing_rule_defines_the_message(self):
+        """
+        Verifica que cada campo informe solo el primer error en el orden declarado.
+        """
+        errors = client_validator({"name": "O'Brien 7", "phone": "12a", "city": "La Plata", "email": "a@b.com"})
+
+        self.assertEqual(errors, {
+            "name": "El nombre no puede contener números.",
+            "phone": "Por favor ingrese un numero de telefono valido, solo digitos",
+            "email": "Por favor ingrese un email valido que termine con @vetsoft.com",
+        })
+
+    def test_non_string_values_are_validated_as_text(self):
+        """
+        Verifica que valores numéricos o fechas se validen como su representación en texto.
+        """
+        self.assertEqual(validate_med({"name": "Dog", "desc": "Desc", "dose": 8}), {})
+        self.assertEqual(pet_validator({"name": "Benita", "breed": "Perro", "birthday": date(2021, 1, 1)}), {})
+        self.assertEqual(
+            pet_validator({"birthday": date.today() + timedelta(days=1)}, partial=True),
+            {"birthday": "La fecha de nacimiento no puede ser posterior al día actual."},
+        )
+
+    def test_optional_fields_are_only_validated_when_sent(self):
+        """
+        Verifica que un campo opcional no sea obligatorio y que values() lo omita si está vacío.
+        """
+        data = {"name": "Benita", "breed": "Perro", "birthday": "2021-01-01"}
+
+        self.assertEqual(pet_validator(data), {})
+        self.assertEqual(
+            pet_validator({**data, "client_id": "uno"}), {"client_id": "Por favor seleccione un dueño válido"},
+        )
+        self.assertEqual(pet_validator.values({**data, "client_id": ""}), data)
+        self.assertEqual(pet_validator.values({**data, "client_id": 3}), {**data, "client_id": 3})
+
+    def test_partition_splits_valid_and_invalid_rows(self):
+        """
+        Verifica que partition devuelva las filas válidas y los errores por índice.
+        """
+        good = ClientFactory.data()
+        valid, invalid = client_validator.partition([good, {**good, "email": ""}])
+
+        self.assertEqual(valid, [good])
+        self.assertEqual(invalid, [(1, {"email": "Por favor ingrese un email"})])
+
+
+class ImportDataCommandTest(TestCase):
+    """
+    Pruebas del comando import_data.
+    """
+    def test_imports_valid_rows_and_reports_invalid_ones(self):
+        """
+        Verifica que se guarden las filas válidas y se informen las inválidas.
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, encoding="utf-8") as file:
+            file.write("name,breed,birthday\n")
+            file.write("Benita,Perro,2021-01-01\n")
+            file.write("Paco,Gato,2021-13-01\n")
+        self.addCleanup(Path(file.name).unlink)
+
+        out, err = StringIO(), StringIO()
+        call_command("import_data", "pets", file.name, stdout=out, stderr=err)
+
+        self.assertEqual(list(Pet.objects.values_list("name", flat=True)), ["Benita"])
+        self.assertIn("Fila 3", err.getvalue())
+        self.assertIn("Importados 1 registros, 1 con errores.", out.getvalue())
+
+    def test_rows_that_cannot_be_stored_are_reported(self):
+        """
+        Verifica que un precio inválido o un dueño inexistente se informen como errores de
+        su fila en lugar de interrumpir la importación.
+        """
+        owner = ClientFactory.create()
+        for entity, lines in (
+            ("products", ["name,type,price,stock", "Collar,Accesorio,abc,3", "Correa,Accesorio,12.5,2"]),
+            ("pets", ["name,breed,birthday,client_id", f"Benita,Perro,2021-01-01,{owner.id + 1}",
+                      f"Paco,Gato,2021-01-01,{owner.id}"]),
+        ):
+            with self.subTest(entity), tempfile.NamedTemporaryFile(
+                "w", suffix=".csv", delete=False, encoding="utf-8",
+            ) as file:
+                file.write("\n".join(lines) + "\n")
+                file.close()
+                self.addCleanup(Path(file.name).unlink)
+
+                out, err = StringIO(), StringIO()
+                call_command("import_data", entity, file.name, stdout=out, stderr=err)
+
+                self.assertTrue(err.getvalue().startswith("Fila 2: "))
+                self.assertIn("Importados 1 registros, 1 con errores.", out.getvalue())
+
+        self.assertEqual(list(Product.objects.values_list("name", flat=True)), ["Correa"])
+        self.assertEqual(list(Pet.objects.values_list("name", "client_id")), [("Paco", owner.id)])
+
+
+class UpdateQueryCountTest(TestCase):
+    """
+    Verifica la cantidad de consultas de los métodos update_*.
+
+    La validación ocurre antes de modificar el objeto, solo se escriben las columnas
+    que cambian y, si nada cambia, no se escribe nada.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Crea un registro de cada modelo editado.
+        """
+        cls.client_obj = ClientFactory.create()
+        cls.pet = PetFactory.create()
+        cls.product = ProductFactory.create(stock=50)
+        cls.med = MedFactory.create()
+
+    def test_changed_field_is_written_alone(self):
+        """
+        Verifica que un cambio genere un único UPDATE con solo la columna modificada, más su
+        entrada en el registro de cambios.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            saved, errors = self.client_obj.update_client({"phone": "54221999999"})
+
+        self.assertTrue(saved)
+        sql, change = statements(queries)
+        self.assertTrue(change.startswith('INSERT INTO "app_change"'))
+        self.assertTrue(sql.startswith("UPDATE"))
+        self.assertIn('"phone"', sql)
+        self.assertNotIn('"email"', sql)
+        self.client_obj.refresh_from_db()
+        self.assertEqual(self.client_obj.phone, 54221999999)
+
+    def test_unchanged_data_does_not_write(self):
+        """
+        Verifica que enviar los mismos valores no ejecute consultas.
+        """
+        data = {
+            "name": self.pet.name,
+            "breed": self.pet.breed,
+            "birthday": self.pet.birthday.isoformat(),
+        }
+        with self.assertNumQueries(0):
+            saved, errors = self.pet.update_pet(data)
+
+        self.assertTrue(saved)
+
+    def test_invalid_data_does_not_query_or_mutate(self):
+        """
+        Verifica que un error no toque la base de datos ni modifique la instancia.
+        """
+        with self.assertNumQueries(0):
+            saved, errors = self.product.update_product({"name": "Nuevo", "stock": "-5"})
+            med_saved, med_errors = self.med.update_med({"dose": "18"})
+
+        self.assertFalse(saved)
+        self.assertEqual(errors, {"stock": "El stock no puede ser negativo."})
+        self.assertEqual(self.product.stock, 50)
+        self.assertNotEqual(self.product.name, "Nuevo")
+        self.assertFalse(med_saved)
+
+    def test_edit_view_uses_one_read_and_one_write(self):
+        """
+        Verifica que editar desde el formulario ejecute una lectura, una escritura y el
+        registro del cambio.
+        """
+        city = next(city for city in ClientFactory.cities if city != self.client_obj.city)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("clients_form"), {"id": self.client_obj.id, "city": city},
+            )
+
+        self.assertEqual(
+            [sql.split()[0] for sql in statements(queries)], ["SELECT", "UPDATE", "INSERT"],
+        )
+
+        self.assertRedirects(response, reverse("clients_repo"), fetch_redirect_response=False)
+
+
+class PrescriptionModelTest(TestCase):
+    """
+    Pruebas de las recetas y del descuento de stock al dispensarlas.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Crea una mascota, un veterinario y un medicamento asociado a un producto con 5 unidades.
+        """
+        cls.pet = PetFactory.create()
+        cls.vet = VeterinaryFactory.create()
+        cls.product = ProductFactory.create(stock=5)
+        cls.med = MedFactory.create(dose=2.5, product=cls.product)
+
+    def prescribe(self, quantity, med=None, **extra):
+        """
+        Guarda una receta de `quantity` unidades y devuelve su resultado.
+        """
+        return Prescription.save_prescription({
+            "pet_id": self.pet.id,
+            "med_id": (med or self.med).id,
+            "veterinary_id": self.vet.id,
+            "quantity": quantity,
+            **extra,
+        })
+
+    def stock(self):
+        """
+        Devuelve el stock actual del producto.
+        """
+        return Product.objects.values_list("stock", flat=True).get(pk=self.product.pk)
+
+    def test_dose_defaults_to_the_med_dose(self):
+        """
+        Verifica que la receta use la dosis del medicamento si no se indica otra.
+        """
+        default, _ = self.prescribe(1)
+        explicit, _ = self.prescribe(1, dose="4")
+
+        self.assertEqual(Prescription.objects.get(pk=default.pk).dose, 2.5)
+        self.assertEqual(Prescription.objects.get(pk=explicit.pk).dose, 4.0)
+        self.assertIsNone(default.dispensed_at)
+
+    def test_invalid_prescriptions_are_rejected(self):
+        """
+        Verifica que se validen la cantidad, la dosis y la existencia del medicamento.
+        """
+        self.assertEqual(
+            self.prescribe(0, dose="11"),
+            (False, {"quantity": "La cantidad debe ser de al menos 1", "dose": "La dosis debe estar entre 1 y 10"}),
+        )
+        self.assertEqual(
+            Prescription.save_prescription({
+                "pet_id": self.pet.id, "med_id": 999, "veterinary_id": self.vet.id, "quantity": 1,
+            }),
+            (False, {"med_id": "Por favor seleccione un medicamento válido"}),
+        )
+
+    def test_dispense_deducts_stock_with_conditional_updates(self):
+        """
+        Verifica que dispensar marque la receta y descuente el stock con dos UPDATE condicionados.
+        """
+        prescription, _ = self.prescribe(3)
+
+        with CaptureQueriesContext(connection) as queries:
+            dispensed, errors = prescription.dispense()
+
+        updates = [sql for sql in statements(queries) if sql.startswith("UPDATE")]
+        self.assertEqual((dispensed, errors), (True, None))
+        self.assertEqual(self.stock(), 2)
+        self.assertIsNotNone(Prescription.objects.get(pk=prescription.pk).dispensed_at)
+        self.assertEqual(len(updates), 2)
+        self.assertIn('"dispensed_at" IS NULL', updates[0])
+        self.assertIn('"stock" >= (COALESCE((SELECT SUM(U0."quantity")', updates[1])
+        self.assertIn("THEN 3 ELSE NULL END))", updates[1])
+
+    def test_prescription_is_dispensed_once(self):
+        """
+        Verifica que una receta no pueda dispensarse dos veces, aunque se lea dos veces.
+        """
+        prescription, _ = self.prescribe(2)
+        stale = Prescription.objects.get(pk=prescription.pk)
+
+        prescription.dispense()
+        dispensed, errors = stale.dispense()
+
+        self.assertFalse(dispensed)
+        self.assertEqual(errors, {"dispensed_at": DISPENSED_MESSAGE})
+        self.assertEqual(self.stock(), 3)
+
+    def test_competing_dispenses_never_oversell(self):
+        """
+        Verifica que si el stock no alcanza se revierta la dispensa y la receta siga pendiente.
+        """
+        first, _ = self.prescribe(3)
+        second, _ = self.prescribe(3)
+
+        self.assertTrue(first.dispense()[0])
+        dispensed, errors = second.dispense()
+
+        self.assertFalse(dispensed)
+        self.assertEqual(errors, {"quantity": STOCK_MESSAGE})
+        self.assertEqual(self.stock(), 2)
+        self.assertIsNone(Prescription.objects.get(pk=second.pk).dispensed_at)
+
+    def test_med_without_product_cannot_be_dispensed(self):
+        """
+        Verifica que no se dispense un medicamento sin producto del inventario.
+        """
+        prescription, _ = self.prescribe(1, med=MedFactory.create())
+
+        self.assertEqual(prescription.dispense(), (False, {"med_id": NO_PRODUCT_MESSAGE}))
+        self.assertIsNone(Prescription.objects.get(pk=prescription.pk).dispensed_at)
+
+    def test_med_product_must_exist(self):
+        """
+        Verifica que el producto asociado a un medicamento deba existir.
+        """
+        saved, errors = Med.save_med({"name": "Amoxicilina", "desc": "Antibiótico", "dose": "2", "product_id": "999"})
+
+        self.assertFalse(saved)
+        self.assertEqual(errors, {"product_id": "Por favor seleccione un producto válido"})
+        self.assertEqual(self.med.update_med({"product_id": "999"})[1], errors)
+
+    def test_history_is_read_from_the_index(self):
+        """
+        Verifica que el historial de una mascota recorra el índice (pet, prescribed_at) ya ordenado.
+        """
+        plan = Prescription.history(self.pet.id).explain()
+
+        self.assertIn("USING INDEX app_prescription_pet_history", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+
+class SaleModelTest(TestCase):
+    """
+    Pruebas de las ventas y del descuento de stock de todas sus líneas al cobrarlas.
+    """
+    def setUp(self):
+        """
+        Crea dos productos con 5 y 2 unidades y una venta abierta con ambos.
+        """
+        self.food = ProductFactory.create(name="Alimento", price=10.0, stock=5)
+        self.collar = ProductFactory.create(name="Collar", price=4.5, stock=2)
+        self.sale = Sale.objects.create()
+        self.sale.add_line({"product_id": self.food.id, "quantity": "3"})
+        self.sale.add_line({"product_id": self.collar.id, "quantity": "2"})
+
+    def stocks(self):
+        """
+        Devuelve el stock actual de los dos productos.
+        """
+        return [Product.objects.values_list("stock", flat=True).get(pk=pk) for pk in (self.food.pk, self.collar.pk)]
+
+    def test_adding_a_product_twice_adds_the_quantities(self):
+        """
+        Verifica que el mismo producto se acumule en una línea con el precio copiado.
+        """
+        line, errors = self.sale.add_line({"product_id": self.food.id, "quantity": "1"})
+
+        self.assertIsNone(errors)
+        self.assertEqual(line.quantity, 4)
+        self.assertEqual(self.sale.lines.get(product=self.food).quantity, 4)
+        self.assertEqual(self.sale.lines.get(product=self.food).price, 10.0)
+        self.assertEqual(self.sale.lines.count(), 2)
+
+    def test_invalid_lines_are_rejected(self):
+        """
+        Verifica que se validen la cantidad y la existencia del producto.
+        """
+        self.assertEqual(
+            self.sale.add_line({"product_id": self.food.id, "quantity": "0"}),
+            (False, {"quantity": "La cantidad debe ser de al menos 1"}),
+        )
+        self.assertEqual(
+            self.sale.add_line({"product_id": "999", "quantity": "1"}),
+            (False, {"product_id": "Por favor seleccione un producto válido"}),
+        )
+
+    def test_checkout_deducts_every_line_with_one_update(self):
+        """
+        Verifica que el cobro marque la venta y descuente todas las líneas con un único
+        UPDATE condicionado de productos.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            paid, errors = self.sale.checkout()
+
+        updates = [sql for sql in statements(queries) if sql.startswith('UPDATE "app_product"')]
+        self.assertEqual((paid, errors), (True, None))
+        self.assertEqual(self.stocks(), [2, 0])
+        self.assertEqual(Sale.objects.get(pk=self.sale.pk).total, 39.0)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"stock" >= (COALESCE((SELECT SUM(U0."quantity")', updates[0])
+        self.assertIn('THEN 3 WHEN "app_product"."id" = 2 THEN 2 ELSE NULL END))', updates[0])
+
+    def test_checkout_is_rejected_if_any_line_lacks_stock(self):
+        """
+        Verifica que si una línea no tiene stock no se descuente ninguna y la venta siga abierta.
+        """
+        Product.objects.filter(pk=self.collar.pk).update(stock=1)
+
+        paid, errors = self.sale.checkout()
+
+        self.assertFalse(paid)
+        self.assertEqual(errors, {"stock": "No hay stock suficiente de: Collar."})
+        self.assertEqual(self.stocks(), [5, 1])
+        self.assertIsNone(Sale.objects.get(pk=self.sale.pk).paid_at)
+
+    def test_sale_is_paid_once(self):
+        """
+        Verifica que una venta no pueda cobrarse dos veces ni modificarse después del cobro.
+        """
+        stale = Sale.objects.get(pk=self.sale.pk)
+
+        self.sale.checkout()
+
+        self.assertEqual(stale.checkout(), (False, {"paid_at": PAID_MESSAGE}))
+        self.assertEqual(self.stocks(), [2, 0])
+        self.assertEqual(self.sale.add_line({"product_id": self.food.id, "quantity": "1"}), (False, {"paid_at": PAID_MESSAGE}))
+        self.assertFalse(self.sale.remove_line(self.sale.lines.first().pk))
+
+    def test_empty_sale_cannot_be_paid(self):
+        """
+        Verifica que una venta sin líneas no se cobre.
+        """
+        sale = Sale.objects.create()
+
+        self.assertEqual(sale.checkout(), (False, {"lines": "La venta no tiene productos."}))
+
+    def test_deduct_stock_reports_every_short_product(self):
+        """
+        Verifica que `deduct_stock` informe los productos sin stock y no descuente los demás.
+        """
+        short = Product.deduct_stock({self.food.pk: 5, self.collar.pk: 3, 999: 1}, sale=self.sale)
+
+        self.assertEqual(short, [self.collar.pk, 999])
+        self.assertEqual(self.stocks(), [5, 2])
+
+
+class ReservationTest(TestCase):
+    """
+    Pruebas de las reservas de stock de las ventas abiertas.
+    """
+    def setUp(self):
+        """
+        Crea un producto con 2 unidades y dos ventas abiertas.
+        """
+        self.product = ProductFactory.create(name="Pipeta", stock=2)
+        self.first = Sale.objects.create()
+        self.second = Sale.objects.create()
+
+    def add(self, sale, quantity):
+        """
+        Agrega `quantity` unidades del producto a la venta.
+        """
+        return sale.add_line({"product_id": self.product.id, "quantity": quantity})
+
+    def available(self):
+        """
+        Devuelve el stock disponible del producto.
+        """
+        return Product.with_available().get(pk=self.product.pk).available
+
+    def expire(self, sale):
+        """
+        Vence las reservas de la venta.
+        """
+        Reservation.objects.filter(sale=sale).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+    def test_competing_carts_cannot_reserve_the_same_unit(self):
+        """
+        Verifica que dos carritos no puedan reservar la misma última unidad.
+        """
+        self.assertIsNone(self.add(self.first, 1)[1])
+        self.assertIsNone(self.add(self.second, 1)[1])
+
+        saved, errors = self.add(self.second, 1)
+
+        self.assertFalse(saved)
+        self.assertEqual(errors, {"quantity": "No hay stock disponible suficiente de Pipeta."})
+        self.assertEqual(self.second.lines.get().quantity, 1)
+        self.assertEqual(Reservation.objects.get(sale=self.second).quantity, 1)
+        self.assertEqual(self.available(), 0)
+
+    def test_expired_reservations_do_not_hold_stock(self):
+        """
+        Verifica que una reserva vencida no cuente, aunque el barrido todavía no la borró.
+        """
+        self.add(self.first, 2)
+        self.expire(self.first)
+
+        self.assertEqual(self.available(), 2)
+        self.assertIsNone(self.add(self.second, 2)[1])
+
+    def test_checkout_turns_the_reservation_into_a_deduction(self):
+        """
+        Verifica que el cobro descuente el stock reservado y borre la reserva.
+        """
+        self.add(self.first, 2)
+
+        self.assertEqual(self.first.checkout(), (True, None))
+        self.assertFalse(Reservation.objects.exists())
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.available()), (0, 0))
+
+    def test_checkout_cannot_take_stock_reserved_by_another_cart(self):
+        """
+        Verifica que una venta con la reserva vencida no cobre unidades reservadas por otra.
+        """
+        self.add(self.first, 2)
+        self.expire(self.first)
+        self.add(self.second, 1)
+
+        paid, errors = self.first.checkout()
+
+        self.assertFalse(paid)
+        self.assertEqual(errors, {"stock": "No hay stock suficiente de: Pipeta."})
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 2)
+
+    def test_removing_lines_and_discarding_release_reservations(self):
+        """
+        Verifica que quitar la línea o descartar la venta libere la reserva.
+        """
+        line, _ = self.add(self.first, 2)
+        self.first.remove_line(line.pk)
+        self.assertEqual(self.available(), 2)
+
+        self.add(self.second, 2)
+        self.second.discard()
+
+        self.assertEqual(self.available(), 2)
+        self.assertFalse(Sale.objects.filter(pk=self.second.pk).exists())
+
+    def test_products_listing_is_one_query(self):
+        """
+        Verifica que el stock disponible de todos los productos se lea en una consulta.
+        """
+        ProductFactory.create()
+        self.add(self.first, 1)
+
+        with self.assertNumQueries(1):
+            available = {product.pk: product.available for product in Product.with_available()}
+
+        self.assertEqual(available[self.product.pk], 1)
+
+    def test_sweep_deletes_expired_reservations_in_batches(self):
+        """
+        Verifica que el barrido borre solo las reservas vencidas, en lotes por `expires_at`.
+        """
+        self.add(self.first, 1)
+        self.add(self.second, 1)
+        self.expire(self.first)
+        expired = Reservation.objects.filter(expires_at__lte=timezone.now()).order_by("expires_at")
+
+        out = StringIO()
+        call_command("sweep_reservations", "--batch-size", "1", stdout=out)
+
+        self.assertEqual(out.getvalue().strip(), "1 reservas vencidas eliminadas.")
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.assertIn("app_reservation_expires", expired.explain())
+
+
+class AppointmentModelTest(TestCase):
+    """
+    Pruebas de la reserva de turnos, la detección de superposiciones y los huecos libres.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Crea una mascota y dos veterinarios.
+        """
+        cls.pet = PetFactory.create()
+        cls.vet, cls.other_vet = VeterinaryFactory.create_batch(2)
+        cls.day = date(2030, 3, 4)
+
+    def at(self, hour, minute=0):
+        """
+        Devuelve la fecha y hora de `day` a la hora indicada, en formato ISO.
+        """
+        return f"{self.day.isoformat()}T{hour:02d}:{minute:02d}"
+
+    def book(self, start, end, vet=None):
+        """
+        Reserva un turno con `save_appointment` y devuelve su resultado.
+        """
+        return Appointment.save_appointment({
+            "pet_id": self.pet.id,
+            "veterinary_id": (vet or self.vet).id,
+            "start": start,
+            "end": end,
+        })
+
+    def test_overlapping_bookings_are_rejected(self):
+        """
+        Verifica que no se pueda reservar un horario ocupado del mismo veterinario.
+        """
+        first, errors = self.book(self.at(10), self.at(11))
+        overlap = self.book(self.at(10, 30), self.at(11, 30))
+        inside = self.book(self.at(10, 15), self.at(10, 45))
+        adjacent, _ = self.book(self.at(11), self.at(12))
+        other_vet, _ = self.book(self.at(10), self.at(11), vet=self.other_vet)
+
+        self.assertIsNone(errors)
+        self.assertEqual(overlap, (False, {"start": OVERLAP_MESSAGE}))
+        self.assertEqual(inside, (False, {"start": OVERLAP_MESSAGE}))
+        self.assertTrue(adjacent)
+        self.assertTrue(other_vet)
+        self.assertEqual(Appointment.objects.count(), 3)
+
+        first.delete()
+        self.assertTrue(self.book(self.at(10), self.at(11))[0])
+
+    def test_invalid_times_and_relations(self):
+        """
+        Verifica los errores de horario, duración y referencias inexistentes.
+        """
+        self.assertEqual(self.book(self.at(11), self.at(10))[1], {"end": "El turno debe terminar después de empezar."})
+        self.assertEqual(
+            self.book(self.at(9), self.at(14))[1], {"end": "El turno no puede durar más de 240 minutos."},
+        )
+        self.assertEqual(self.book("mañana", self.at(10))[1], {"start": "Formato de fecha y hora inválido"})
+        missing = Appointment.save_appointment({
+            "pet_id": self.pet.id + 100, "veterinary_id": self.vet.id, "start": self.at(10), "end": self.at(11),
+        })
+        self.assertEqual(missing[1], {"pet_id": "Por favor seleccione una mascota válida"})
+
+    def test_rescheduling_checks_overlaps(self):
+        """
+        Verifica que reprogramar sobre otro turno falle sin cambios y que a un hueco libre funcione.
+        """
+        self.book(self.at(10), self.at(11))
+        appointment, _ = self.book(self.at(12), self.at(13))
+
+        conflict = appointment.update_appointment({"start": self.at(10, 30)})
+        moved = appointment.update_appointment({"start": self.at(14), "end": self.at(15)})
+
+        self.assertEqual(conflict, (False, {"start": OVERLAP_MESSAGE}))
+        self.assertEqual(moved, (True, None))
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.start.hour, 14)
+        self.assertEqual(appointment.version, 1)
+
+    def test_overlap_check_is_an_indexed_range_query(self):
+        """
+        Verifica que la búsqueda de superposiciones recorra el índice (veterinary, start).
+        """
+        start = timezone.now()
+        sql, params = Appointment.overlapping(self.vet.id, start, start + timedelta(hours=1)).query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+
+        self.assertIn("USING INDEX app_appointment_vet_start", plan)
+
+    def test_free_slots(self):
+        """
+        Verifica los huecos libres del día, aun con turnos superpuestos cargados directamente.
+        """
+        for start, end in [((10, 0), (11, 0)), ((10, 30), (12, 0)), ((15, 0), (16, 0)), ((17, 45), (18, 0))]:
+            Appointment.objects.create(
+                pet=self.pet, veterinary=self.vet, start=self.at(*start) + "Z", end=self.at(*end) + "Z",
+            )
+
+        with self.assertNumQueries(1):
+            slots = Appointment.free_slots(self.vet.id, self.day)
+
+        self.assertEqual(
+            [(start.strftime("%H:%M"), end.strftime("%H:%M")) for start, end in slots],
+            [("09:00", "10:00"), ("12:00", "15:00"), ("16:00", "17:45")],
+        )
+        self.assertEqual(len(Appointment.free_slots(self.vet.id, self.day, timedelta(hours=2))), 1)
+        self.assertEqual(len(Appointment.free_slots(self.other_vet.id, self.day)), 1)
+
+
+class AgendaTest(TestCase):
+    """
+    Pruebas de la agenda semanal: armado de la grilla y HTML en caché.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Crea una mascota y dos veterinarios.
+        """
+        cls.pet = PetFactory.create(name="Firulais")
+        cls.vet = VeterinaryFactory.create(name="Ana")
+        cls.other_vet = VeterinaryFactory.create(name="Bruno")
+        cls.monday = date(2030, 3, 4)
+
+    def setUp(self):
+        """
+        Vacía la caché para que cada prueba arme su agenda.
+        """
+        cache.clear()
+
+    def book(self, day, start, end, vet=None, pet=None):
+        """
+        Reserva un turno el día `day` de la semana entre las horas "HH:MM" indicadas.
+        """
+        moment = (self.monday + timedelta(days=day)).isoformat()
+        appointment, errors = Appointment.save_appointment({
+            "pet_id": (pet or self.pet).id,
+            "veterinary_id": (vet or self.vet).id,
+            "start": f"{moment}T{start}",
+            "end": f"{moment}T{end}",
+        })
+        self.assertIsNone(errors)
+        return appointment
+
+    def test_week_grid_buckets_appointments_into_slots(self):
+        """
+        Verifica que cada turno ocupe sus franjas y que los turnos que comparten una
+        franja por el redondeo queden en el mismo bloque.
+        """
+        first = self.book(0, "10:00", "11:00")
+        short = self.book(0, "11:00", "11:10")
+        rounded = self.book(0, "11:15", "11:30")
+        other = self.book(2, "09:00", "09:30", vet=self.other_vet)
+        self.book(0, "07:00", "08:00")
+        self.book(7, "10:00", "11:00")
+
+        labels, veterinarians = agenda.week_grid(self.monday)
+        (vet_id, name, days), (other_id, _, other_days) = veterinarians
+        monday = days[0]
+
+        self.assertEqual(labels[0], "09:00")
+        self.assertEqual(len(labels), 18)
+        self.assertEqual((vet_id, name, other_id), (self.vet.id, "Ana", self.other_vet.id))
+        self.assertEqual(monday[2:4], [(2, ((first.id, "Firulais", "10:00"),)), False])
+        self.assertEqual(monday[4], (1, ((short.id, "Firulais", "11:00"), (rounded.id, "Firulais", "11:15"))))
+        self.assertEqual(monday.count(None), 15)
+        self.assertTrue(all(cell is None for day in days[1:] for cell in day))
+        self.assertEqual(other_days[2][0], (1, ((other.id, "Firulais", "09:00"),)))
+
+    def test_week_is_read_with_one_appointments_query(self):
+        """
+        Verifica que la semana se lea con una consulta de veterinarios y una de turnos,
+        sin importar la cantidad de turnos.
+        """
+        for day in range(5):
+            self.book(day, "10:00", "11:00")
+            self.book(day, "12:00", "12:30", vet=self.other_vet)
+
+        with CaptureQueriesContext(connection) as queries:
+            agenda.week_grid(self.monday)
+
+        self.assertEqual(len(queries), 2)
+
+    def test_cached_week_runs_no_queries(self):
+        """
+        Verifica que la segunda lectura de una semana salga de la caché.
+        """
+        self.book(0, "10:00", "11:00")
+        html = agenda.render_week(self.monday)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(agenda.render_week(self.monday), html)
+
+    def test_changes_invalidate_only_their_week(self):
+        """
+        Verifica que reservar, reprogramar y cancelar un turno renueven la semana afectada.
+        """
+        next_monday = self.monday + timedelta(days=7)
+        self.assertNotIn("Firulais", agenda.render_week(self.monday))
+        empty_next = agenda.render_week(next_monday)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment = self.book(1, "10:00", "11:00")
+        self.assertIn("Firulais", agenda.render_week(self.monday))
+        self.assertEqual(agenda.render_week(next_monday), empty_next)
+
+        moved = (self.monday + timedelta(days=8)).isoformat()
+        with self.captureOnCommitCallbacks(execute=True):
+            saved, _ = appointment.update_appointment({"start": f"{moved}T10:00", "end": f"{moved}T11:00"})
+        self.assertTrue(saved)
+        self.assertNotIn("Firulais", agenda.render_week(self.monday))
+        self.assertIn("Firulais", agenda.render_week(next_monday))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.delete()
+        self.assertNotIn("Firulais", agenda.render_week(next_monday))
+
+    def test_pet_rename_invalidates_every_week(self):
+        """
+        Verifica que cambiar el nombre de una mascota renueve las semanas en caché.
+        """
+        self.book(0, "10:00", "11:00")
+        agenda.render_week(self.monday)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Pet.objects.filter(pk=self.pet.pk).update(name="Manchita")
+
+        self.assertIn("Manchita", agenda.render_week(self.monday))
+
+    def test_rolled_back_changes_keep_the_cache(self):
+        """
+        Verifica que un turno rechazado por superposición no invalide la semana.
+        """
+        self.book(0, "10:00", "11:00")
+        html = agenda.render_week(self.monday)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            saved, _ = Appointment.save_appointment({
+                "pet_id": self.pet.id,
+                "veterinary_id": self.vet.id,
+                "start": f"{self.monday.isoformat()}T10:30",
+                "end": f"{self.monday.isoformat()}T11:30",
+            })
+
+        self.assertFalse(saved)
+        self.assertEqual(callbacks, [])
+        with self.assertNumQueries(0):
+            self.assertEqual(agenda.render_week(self.monday), html)
+
+
+class ReportsTest(TestCase):
+    """
+    Pruebas de las cifras de la página de reportes y de su caché.
+    """
+    def setUp(self):
+        """
+        Vacía la caché y crea productos de dos tipos.
+        """
+        cache.clear()
+        self.food = ProductFactory.create(name="Alimento", type="Alimento", price=10.0, stock=5)
+        self.treat = ProductFactory.create(name="Snack", type="Alimento", price=2.0, stock=10)
+        self.collar = ProductFactory.create(name="Collar", type="Accesorio", price=100.0, stock=1)
+
+    def sell(self, product, quantity, pay=True):
+        """
+        Crea una venta de `quantity` unidades del producto y la cobra si `pay` es True.
+        """
+        sale = Sale.objects.create()
+        sale.add_line({"product_id": product.id, "quantity": quantity})
+        if pay:
+            self.assertTrue(sale.checkout()[0])
+        return sale
+
+    def test_inventory_value_is_grouped_and_ranked_in_one_query(self):
+        """
+        Verifica el valor por tipo, el puesto de la función de ventana y que los
+        productos borrados no cuenten.
+        """
+        ProductFactory.create(type="Limpieza", price=1000.0, stock=1).delete()
+
+        with self.assertNumQueries(1):
+            inventory = reports.inventory_value()
+
+        self.assertEqual(inventory, [
+            {"type": "Accesorio", "products": 1, "units": 1, "value": 100.0, "rank": 1},
+            {"type": "Alimento", "products": 2, "units": 15, "value": 70.0, "rank": 2},
+        ])
+        self.assertEqual(reports.inventory_totals(), {"products": 3, "units": 16, "value": 170.0})
+
+    def test_inventory_value_reads_the_covering_index(self):
+        """
+        Verifica que el valor por tipo recorra el índice de cobertura, sin ordenar aparte.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            reports.inventory_value()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries.captured_queries[0]['sql']}")
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+
+        self.assertIn("COVERING INDEX app_product_valuation", plan)
+        self.assertNotIn("TEMP B-TREE FOR GROUP BY", plan)
+
+    def test_top_sellers_rank_paid_sales_and_keep_ties(self):
+        """
+        Verifica que solo cuenten las ventas cobradas y que un empate en el último
+        puesto se incluya.
+        """
+        Product.objects.filter(pk=self.collar.pk).update(stock=10)
+        self.sell(self.treat, 4)
+        self.sell(self.food, 2)
+        self.sell(self.collar, 1)
+        self.sell(self.treat, 1)
+        self.sell(self.food, 1)
+        self.sell(self.collar, 5, pay=False)
+
+        self.assertEqual(reports.top_sellers(1), [
+            {"product_id": self.treat.id, "name": "Snack", "units": 5, "revenue": 10.0, "rank": 1},
+        ])
+        self.assertEqual(
+            [(row["name"], row["rank"]) for row in reports.top_sellers(2)],
+            [("Snack", 1), ("Alimento", 2)],
+        )
+        self.sell(self.collar, 2)
+        self.assertEqual(
+            [(row["name"], row["rank"]) for row in reports.top_sellers(2)],
+            [("Snack", 1), ("Alimento", 2), ("Collar", 2)],
+        )
+
+    def test_report_is_cached_until_products_or_sales_change(self):
+        """
+        Verifica que el reporte se lea de la caché y se recalcule al cambiar el stock
+        o cobrarse una venta.
+        """
+        first = reports.report()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(reports.report(), first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.collar.pk).update(stock=3)
+        self.assertEqual(reports.report()["totals"]["units"], 18)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sell(self.food, 2)
+        self.assertEqual(reports.report()["top_sellers"][0]["units"], 2)
+
+
+class SummariesTest(TestCase):
+    """
+    Pruebas de las tablas resumen del tablero de inicio y de sus triggers.
+    """
+    def setUp(self):
+        """
+        Crea clientes de dos ciudades, sus mascotas y productos con y sin stock.
+        """
+        self.plata, self.berisso = ClientFactory.create_batch(2, city="La Plata")
+        ClientFactory.create(city="Berisso")
+        self.dog = PetFactory.create(breed="Perro", client=self.plata)
+        PetFactory.create(breed="Gato", client=self.berisso)
+        self.empty = ProductFactory.create(stock=0)
+        self.full = ProductFactory.create(stock=3)
+
+    def test_dashboard_reads_the_counters_in_one_query(self):
+        """
+        Verifica que el tablero se lea con una sola consulta a los contadores.
+        """
+        with self.assertNumQueries(1):
+            data = summaries.dashboard(timezone.localdate())
+
+        self.assertEqual(data, {
+            "clients_by_city": [("Berisso", 1), ("La Plata", 2)],
+            "pets_by_breed": [("Gato", 1), ("Perro", 1)],
+            "products_out_of_stock": 1,
+            "appointments_today": 0,
+        })
+
+    def test_triggers_move_the_counters_without_extra_statements(self):
+        """
+        Verifica que las escrituras no agreguen sentencias sobre los contadores y que
+        los triggers los actualicen.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            Client.objects.for_ids([self.berisso.pk]).update(city="Ensenada")
+            self.plata.delete()
+            Product.objects.for_ids([self.full.pk]).update(stock=0)
+            PetFactory.create_batch(3, breed="Conejo")
+        self.assertEqual([sql for sql in statements(queries) if "app_summarycount" in sql], [])
+
+        Product.objects.for_ids([self.empty.pk]).update(stock=F("stock") + 1)
+        self.dog.hard_delete()
+
+        data = summaries.dashboard(timezone.localdate())
+        self.assertEqual(data["clients_by_city"], [("Berisso", 1), ("Ensenada", 1)])
+        self.assertEqual(data["pets_by_breed"], [("Conejo", 3), ("Gato", 1)])
+        self.assertEqual(data["products_out_of_stock"], 1)
+
+    def test_appointments_are_counted_by_day(self):
+        """
+        Verifica que solo cuenten los turnos vivos del día pedido.
+        """
+        vet = VeterinaryFactory.create()
+        start = timezone.localtime().replace(hour=10, minute=0, second=0, microsecond=0)
+        end = start + timedelta(minutes=30)
+        today = start.date()
+        Appointment.objects.create(pet=self.dog, veterinary=vet, start=start, end=end)
+        moved = Appointment.objects.create(pet=self.dog, veterinary=vet, start=start, end=end)
+        Appointment.objects.create(pet=self.dog, veterinary=vet, start=start, end=end).delete()
+
+        self.assertEqual(summaries.dashboard(today)["appointments_today"], 2)
+        moved.start += timedelta(days=1)
+        moved.save()
+        self.assertEqual(summaries.dashboard(today)["appointments_today"], 1)
+        self.assertEqual(summaries.dashboard(today + timedelta(days=1))["appointments_today"], 1)
+
+    def test_table_fallback_matches_the_counters(self):
+        """
+        Verifica que las consultas agrupadas que usan las bases sin triggers devuelvan las
+        mismas cifras que los contadores.
+        """
+        vet = VeterinaryFactory.create()
+        start = timezone.localtime().replace(hour=10, minute=0, second=0, microsecond=0)
+        Appointment.objects.create(pet=self.dog, veterinary=vet, start=start, end=start + timedelta(minutes=30))
+        self.berisso.delete()
+        today = start.date()
+
+        self.assertTrue(summaries.supported())
+        self.assertEqual(summaries.from_tables(today), summaries.dashboard(today))
+
+    def test_migrate_restores_dropped_triggers(self):
+        """
+        Verifica que, al terminar una migración que reconstruyó una tabla y borró sus
+        triggers, `post_migrate` los reponga y recalcule los contadores.
+        """
+        summaries.drop_triggers()
+        ClientFactory.create(city="Ensenada")
+        self.assertEqual(len(summaries.missing_triggers()), 12)
+
+        call_command("migrate", verbosity=0)
+
+        self.assertEqual(summaries.missing_triggers(), [])
+        self.assertIn(("Ensenada", 1), summaries.dashboard(timezone.localdate())["clients_by_city"])
+
+    def test_rebuild_restores_the_triggers_and_the_counters(self):
+        """
+        Verifica que `rebuild_summaries` recalcule los contadores y vuelva a crear los
+        triggers que una migración de SQLite pudo borrar.
+        """
+        summaries.drop_triggers()
+        SummaryCount.objects.update(count=0)
+        ClientFactory.create(city="Ensenada")
+
+        out = StringIO()
+        call_command("rebuild_summaries", stdout=out)
+
+        self.assertEqual(out.getvalue(), "6 contadores recalculados.\n")
+        ClientFactory.create(city="Ensenada")
+        self.assertEqual(
+            summaries.dashboard(timezone.localdate())["clients_by_city"],
+            [("Berisso", 1), ("Ensenada", 2), ("La Plata", 2)],
+        )
+
+
+class ReminderJobTest(TestCase):
+    """
+    Pruebas de los planes de vacunación y de la generación de recordatorios.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Crea una mascota y un día de referencia.
+        """
+        cls.pet = PetFactory.create()
+        cls.day = date(2030, 3, 4)
+
+    def plan(self, days_from_day, interval_days=None):
+        """
+        Crea un plan cuya próxima dosis vence `days_from_day` días después de `day`.
+        """
+        schedule, errors = Schedule.save_schedule(self.pet, {
+            "kind": Schedule.Kind.Vacuna,
+            "name": "Antirrábica",
+            "next_due": (self.day + timedelta(days=days_from_day)).isoformat(),
+            "interval_days": interval_days or "",
+        })
+        self.assertIsNone(errors)
+        schedule.refresh_from_db()
+        return schedule
+
+    def test_schedule_validation(self):
+        """
+        Verifica que el plan exija una fecha válida y un intervalo positivo.
+        """
+        saved, errors = Schedule.save_schedule(self.pet, {
+            "kind": "Vacuna", "name": "Triple", "next_due": "2030-02-30", "interval_days": "0",
+        })
+
+        self.assertFalse(saved)
+        self.assertEqual(set(errors), {"next_due", "interval_days"})
+
+    def test_due_and_overdue_plans_get_one_reminder(self):
+        """
+        Verifica que solo los planes vencidos, vivos y pendientes generen recordatorio.
+        """
+        overdue = self.plan(-10)
+        due = self.plan(0)
+        self.plan(1)
+        self.plan(-3).delete()
+        completed = self.plan(-5)
+        completed.apply_dose(self.day - timedelta(days=5))
+
+        run = generate_reminders(self.day, chunk_size=1)
+
+        self.assertEqual(run.processed, 2)
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(
+            set(Reminder.objects.values_list("schedule_id", "due_on")),
+            {(overdue.id, overdue.next_due), (due.id, due.next_due)},
+        )
+
+    def test_generation_is_idempotent(self):
+        """
+        Verifica que volver a ejecutar el día no duplique recordatorios ni recorra los planes.
+        """
+        for offset in range(5):
+            self.plan(-offset)
+        generate_reminders(self.day, chunk_size=2)
+
+        with self.assertNumQueries(1):
+            generate_reminders(self.day, chunk_size=2)
+        run = generate_reminders(self.day, chunk_size=2, restart=True)
+        generate_reminders(self.day + timedelta(days=1), chunk_size=2)
+
+        self.assertEqual(run.processed, 5)
+        self.assertEqual(Reminder.objects.count(), 5)
+
+    def test_interrupted_run_resumes_from_its_cursor(self):
+        """
+        Verifica que una ejecución interrumpida continúe después del último plan confirmado.
+        """
+        plans = sorted((self.plan(-offset) for offset in range(4)), key=lambda plan: (plan.next_due, plan.pk))
+        done = plans[1]
+        ReminderRun.objects.create(day=self.day, last_due=done.next_due, last_id=done.pk, processed=2)
+
+        run = generate_reminders(self.day, chunk_size=10)
+
+        self.assertEqual(run.processed, 4)
+        self.assertEqual(
+            set(Reminder.objects.values_list("schedule_id", flat=True)), {plans[2].pk, plans[3].pk},
+        )
+
+    def test_chunks_follow_the_next_due_index(self):
+        """
+        Verifica que los bloques lean los planes vencidos por el índice de `next_due`.
+        """
+        for offset in range(6):
+            self.plan(-offset)
+
+        with CaptureQueriesContext(connection) as queries:
+            generate_reminders(self.day, chunk_size=2)
+
+        selects = [query["sql"] for query in queries if 'FROM "app_schedule"' in query["sql"]]
+        self.assertEqual(len(selects), 4)
+        self.assertTrue(all("LIMIT 2" in sql for sql in selects))
+        self.assertIn("app_schedule_next_due", Schedule.due(self.day).order_by("next_due", "pk").explain())
+
+    def test_apply_dose_moves_next_due(self):
+        """
+        Verifica que aplicar una dosis calcule la siguiente, o complete un plan de dosis única.
+        """
+        recurring = self.plan(0, interval_days=365)
+        single = self.plan(0)
+
+        recurring.apply_dose(self.day)
+        single.apply_dose(self.day)
+
+        recurring.refresh_from_db()
+        single.refresh_from_db()
+        self.assertEqual(recurring.next_due, self.day + timedelta(days=365))
+        self.assertIsNone(single.next_due)
+        self.assertFalse(Schedule.due(self.day).exists())
+
+    def test_command_reports_processed_plans(self):
+        """
+        Verifica que el comando genere los recordatorios del día indicado.
+        """
+        self.plan(0)
+        out = StringIO()
+
+        call_command("generate_reminders", "--date", self.day.isoformat(), stdout=out)
+
+        self.assertEqual(Reminder.objects.count(), 1)
+        self.assertIn("1 planes vencidos procesados", out.getvalue())
+
+
+class SoftDeleteTest(TestCase):
+    """
+    Pruebas del borrado lógico y de la purga de registros borrados.
+    """
+    def test_delete_marks_the_row_and_hides_it(self):
+        """
+        Verifica que `delete()` conserve la fila y que el manager por defecto la oculte.
+        """
+        client = ClientFactory.create()
+
+        with CaptureQueriesContext(connection) as queries:
+            client.delete()
+
+        self.assertEqual([sql.split()[0] for sql in statements(queries)], ["UPDATE", "INSERT"])
+
+        self.assertIsNotNone(client.deleted_at)
+        self.assertEqual(client.version, 1)
+        self.assertFalse(Client.objects.filter(pk=client.pk).exists())
+        self.assertTrue(Client.all_objects.filter(pk=client.pk).exists())
+        self.assertEqual(Client.all_objects.dead().get().pk, client.pk)
+
+    def test_delete_view_soft_deletes(self):
+        """
+        Verifica que la vista de eliminación no borre físicamente el registro.
+        """
+        pet = PetFactory.create()
+
+        response = self.client.post(reverse("pets_delete"), {"pet_id": pet.id})
+
+        self.assertRedirects(response, reverse("pets_repo"))
+        self.assertFalse(Pet.objects.exists())
+        self.assertEqual(Pet.all_objects.count(), 1)
+        self.assertEqual(self.client.get(reverse("pets_edit", args=[pet.id])).status_code, 404)
+
+    def test_queryset_delete_is_a_single_update(self):
+        """
+        Verifica que borrar un QuerySet sea un único UPDATE que ignora los ya borrados.
+
+        Sin `for_ids()` los IDs del registro de cambios se leen antes de escribir.
+        """
+        products = ProductFactory.create_batch(3)
+        products[0].delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            count, _ = Product.all_objects.all().delete()
+
+        self.assertEqual(
+            [sql.split()[0] for sql in statements(queries)], ["SELECT", "UPDATE", "INSERT"],
+        )
+
+        self.assertEqual(count, 2)
+        self.assertEqual(Product.all_objects.alive().count(), 0)
+
+    def test_live_rows_use_the_partial_index(self):
+        """
+        Verifica que el listado del manager por defecto recorra el índice parcial.
+        """
+        plan = Client.objects.all().explain()
+
+        self.assertIn("app_client_live", plan)
+
+    def test_purge_removes_expired_rows_in_batches(self):
+        """
+        Verifica que la purga elimine solo los registros vencidos, en lotes acotados.
+        """
+        meds = MedFactory.create_batch(5)
+        Med.all_objects.filter(pk__in=[med.pk for med in meds[:3]]).update(
+            deleted_at=timezone.now() - timedelta(days=40),
+        )
+        meds[3].delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            out = StringIO()
+            call_command("purge_deleted", "--days", "30", "--batch-size", "2", stdout=out)
+
+        deletes = [query["sql"] for query in queries if query["sql"].startswith('DELETE FROM "app_med"')]
+        self.assertEqual(len(deletes), 2)
+        self.assertIn("3 eliminados", out.getvalue())
+        self.assertEqual(Med.all_objects.count(), 2)
+        self.assertEqual(Med.objects.count(), 1)
+
+    def test_purge_keeps_rows_with_prescriptions(self):
+        """
+        Verifica que la purga conserve la mascota, el medicamento y el veterinario de una
+        receta dispensada, y elimine los que no tienen recetas.
+        """
+        pet, lonely = PetFactory.create_batch(2)
+        product = ProductFactory.create(stock=5)
+        med = MedFactory.create(product=product)
+        vet = VeterinaryFactory.create()
+        prescription, _ = Prescription.save_prescription(
+            {"pet_id": pet.id, "med_id": med.id, "veterinary_id": vet.id, "quantity": "1"},
+        )
+        prescription.dispense()
+        expired = timezone.now() - timedelta(days=40)
+        for model, ids in ((Pet, [pet.id, lonely.id]), (Med, [med.id]), (Veterinary, [vet.id])):
+            model.all_objects.filter(pk__in=ids).update(deleted_at=expired)
+
+        call_command("purge_deleted", "--days", "30", stdout=StringIO())
+
+        self.assertEqual(list(Pet.all_objects.values_list("pk", flat=True)), [pet.id])
+        self.assertTrue(Med.all_objects.filter(pk=med.id).exists())
+        self.assertTrue(Veterinary.all_objects.filter(pk=vet.id).exists())
+        prescription.refresh_from_db()
+        self.assertIsNotNone(prescription.dispensed_at)
+
+    def test_purge_removes_expired_appointments_and_prescriptions(self):
+        """
+        Verifica que la purga elimine los turnos y las recetas vencidos, y que una receta
+        vencida deje de proteger a su mascota en la misma corrida.
+        """
+        pet = PetFactory.create()
+        vet = VeterinaryFactory.create()
+        start = timezone.now()
+        Appointment.objects.create(pet=pet, veterinary=vet, start=start, end=start + timedelta(minutes=30))
+        Prescription.save_prescription(
+            {"pet_id": pet.id, "med_id": MedFactory.create().id, "veterinary_id": vet.id, "quantity": "1"},
+        )
+        expired = timezone.now() - timedelta(days=40)
+        for model in (Appointment, Prescription, Pet):
+            model.all_objects.update(deleted_at=expired)
+
+        out = StringIO()
+        call_command("purge_deleted", "--days", "30", stdout=out)
+
+        self.assertFalse(Appointment.all_objects.exists())
+        self.assertFalse(Prescription.all_objects.exists())
+        self.assertFalse(Pet.all_objects.exists())
+        self.assertIn("appointments: 1 eliminados.", out.getvalue())
+        self.assertIn("prescriptions: 1 eliminados.", out.getvalue())
+
+
+class RecordingBroker(Broker):
+    """
+    Broker de prueba que guarda los mensajes publicados.
+    """
+    messages = []
+
+    def publish(self, channel, message):
+        """
+        Guarda el mensaje publicado.
+        """
+        self.messages.append((channel, message))
+
+
+class StockEventsTest(TestCase):
+    """
+    Pruebas de los eventos en vivo de stock.
+    """
+    async def test_in_process_broker_delivers_messages_from_other_threads(self):
+        """
+        Verifica la entrega entre hilos, los latidos y la baja del suscriptor al cerrar.
+        """
+        broker = InProcessBroker()
+        subscription = broker.subscribe("stock", heartbeat=0.05)
+        pending = asyncio.create_task(anext(subscription))
+        await asyncio.sleep(0.01)
+        self.assertTrue(broker.wants("stock"))
+
+        await asyncio.to_thread(broker.publish, "stock", {"id": 1, "stock": 4})
+
+        self.assertEqual(await asyncio.wait_for(pending, 1), {"id": 1, "stock": 4})
+        self.assertIsNone(await asyncio.wait_for(anext(subscription), 1))
+        await subscription.aclose()
+        self.assertFalse(broker.wants("stock"))
+
+    def test_slow_subscribers_keep_the_newest_messages(self):
+        """
+        Verifica que una cola llena descarte el mensaje más antiguo.
+        """
+        queue = asyncio.Queue(2)
+        for number in range(3):
+            offer(queue, number)
+
+        self.assertEqual([queue.get_nowait(), queue.get_nowait()], [1, 2])
+
+    def test_format_event(self):
+        """
+        Verifica el formato de los eventos y de los latidos.
+        """
+        self.assertEqual(format_event({"id": 1, "stock": 2}), 'event: stock\ndata: {"id": 1, "stock": 2}\n\n')
+        self.assertEqual(format_event(None), ": ping\n\n")
+
+    @override_settings(EVENTS_BACKEND="app.tests_unit.RecordingBroker")
+    def test_stock_changes_are_published_after_commit(self):
+        """
+        Verifica que los botones de stock y el borrado publiquen el estado final del producto.
+        """
+        RecordingBroker.messages = []
+        product = ProductFactory.create(stock=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("increment_stock", args=[product.id]))
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+
+        self.assertEqual(RecordingBroker.messages[-2:], [
+            ("stock", {"id": product.id, "stock": 2, "available": 2}),
+            ("stock", {"id": product.id, "deleted": True}),
+        ])
+
+    @override_settings(EVENTS_BACKEND="app.tests_unit.RecordingBroker")
+    def test_reservations_publish_the_available_stock(self):
+        """
+        Verifica que reservar, liberar, barrer y descartar reservas publique el stock disponible.
+        """
+        RecordingBroker.messages = []
+        product = ProductFactory.create(stock=5)
+        sale = Sale.objects.create()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.add_line({"product_id": product.id, "quantity": 2})
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.remove_line(sale.lines.get().pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.add_line({"product_id": product.id, "quantity": 3})
+        with self.captureOnCommitCallbacks(execute=True):
+            Reservation.sweep(timezone.now() + timedelta(days=1), 10)
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.add_line({"product_id": product.id, "quantity": 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.discard()
+
+        self.assertEqual([message["available"] for _, message in RecordingBroker.messages], [3, 5, 2, 5, 1, 5])
+
+    def test_nothing_is_published_without_subscribers(self):
+        """
+        Verifica que sin suscriptores no se registren callbacks ni consultas extra.
+        """
+        product = ProductFactory.create(stock=1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(reverse("increment_stock", args=[product.id]))
+
+        self.assertFalse(get_broker().wants("stock"))
+        self.assertEqual([callback for callback in callbacks if callback.__module__ == "app.events"], [])
+
+    def test_stream_is_not_offered_under_wsgi(self):
+        """
+        Verifica que bajo WSGI la vista de eventos responda 204 y la página de productos
+        no incluya el script, para no dejar conexiones abiertas ocupando hilos.
+        """
+        response = self.client.get(reverse("stock_events"))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertNotContains(self.client.get(reverse("products_repo")), "js/stock_events.js")
+
+    async def test_stream_sends_published_stock(self):
+        """
+        Verifica que la vista de eventos reenvíe lo publicado en el broker.
+        """
+        response = await self.async_client.get(reverse("stock_events"))
+        stream = aiter(response.streaming_content)
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        pending = asyncio.create_task(anext(stream))
+        await asyncio.sleep(0.01)
+        get_broker().publish("stock", {"id": 7, "stock": 0})
+
+        self.assertEqual(await asyncio.wait_for(pending, 1), b'event: stock\ndata: {"id": 7, "stock": 0}\n\n')
+        await stream.aclose()
+
+    async def test_change_log_broker_polls_product_changes(self):
+        """
+        Verifica que el broker multiproceso lea los cambios de productos del registro.
+        """
+        broker = ChangeLogBroker(poll_interval=0.01)
+        self.assertFalse(broker.wants("stock"))
+        broker.publish("stock", {})
+        subscription = broker.subscribe("stock", heartbeat=60)
+        pending = asyncio.create_task(anext(subscription))
+        await asyncio.sleep(0.05)
+
+        product = await sync_to_async(ProductFactory.create)(stock=3)
+
+        self.assertEqual(await asyncio.wait_for(pending, 2), {"id": product.id, "stock": 3, "available": 3})
+        await subscription.aclose()
+
+        idle = broker.subscribe("stock", heartbeat=0.01)
+        self.assertIsNone(await asyncio.wait_for(anext(idle), 2))
+        await idle.aclose()
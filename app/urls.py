@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, batch, changes, events, views
 
 urlpatterns = [
     path("", view=views.home, name="home"),
@@ -9,26 +9,56 @@ urlpatterns = [
     path("clientes/nuevo/", view=views.clients_form, name="clients_form"),
     path("clientes/editar/<int:id>/", view=views.clients_form, name="clients_edit"),
     path("clientes/eliminar/", view=views.clients_delete, name="clients_delete"),
+    path("clientes/seleccionados/", view=views.clients_bulk, name="clients_bulk"),
     path("productos/", view=views.products_repository, name="products_repo"),
     path("productos/nuevo/", view=views.products_form, name="products_form"),
     path("productos/editar/<int:id>/", view=views.products_form, name="products_edit"),
     path("productos/eliminar/", view=views.products_delete, name="products_delete"),
+    path("productos/seleccionados/", view=views.products_bulk, name="products_bulk"),
     path("productos/incrementar/<int:id>/", view=views.increment_stock, name="increment_stock"),
     path("productos/decrementar/<int:id>/", view=views.decrement_stock, name="decrement_stock"),
+    path("productos/eventos/", view=events.stock_events, name="stock_events"),
     path("proveedores/", view=views.providers_repository, name="providers_repo"),
     path("proveedores/nuevo/", view=views.providers_form, name="providers_form"),
     path("proveedores/editar/<int:id>/", view=views.providers_form, name="providers_edit"),
     path("proveedores/eliminar/", view=views.providers_delete, name="providers_delete"),
+    path("proveedores/seleccionados/", view=views.providers_bulk, name="providers_bulk"),
     path("veterinarios/", view=views.veterinary_repository, name="veterinary_repo"),
     path("veterinarios/nuevo/", view=views.veterinary_form, name="veterinary_form"),
     path("veterinarios/editar/<int:id>/", view=views.veterinary_form, name="veterinary_edit"),
     path("veterinarios/eliminar/", view=views.veterinary_delete, name="veterinary_delete"),
+    path("veterinarios/seleccionados/", view=views.veterinary_bulk, name="veterinary_bulk"),
     path("mascotas/", view=views.pets_repository, name="pets_repo"),
     path("mascotas/nuevo/", view=views.pets_form, name="pets_form"),
     path("mascotas/editar/<int:id>/", view=views.pets_form, name="pets_edit"),
     path("mascotas/eliminar/", view=views.pets_delete, name="pets_delete"),
+    path("mascotas/seleccionados/", view=views.pets_bulk, name="pets_bulk"),
+    path("mascotas/cumpleanos/", view=views.birthdays_export, name="pets_birthdays_export"),
+    path("mascotas/<int:id>/vacunas/", view=views.pets_schedules, name="pets_schedules"),
+    path("mascotas/vacunas/aplicar/", view=views.schedules_apply, name="schedules_apply"),
+    path("mascotas/<int:id>/recetas/", view=views.pets_prescriptions, name="pets_prescriptions"),
+    path("mascotas/recetas/dispensar/", view=views.prescriptions_dispense, name="prescriptions_dispense"),
     path("medicinas/", view=views.meds_repository, name="meds_repo"),
     path("medicinas/nuevo/", view=views.meds_form, name="meds_form"),
     path("medicinas/editar/<int:id>/", view=views.meds_form, name="meds_edit"),
     path("medicinas/eliminar/", view=views.meds_delete, name="meds_delete"),
+    path("medicinas/seleccionados/", view=views.meds_bulk, name="meds_bulk"),
+    path("turnos/", view=views.appointments_repository, name="appointments_repo"),
+    path("turnos/nuevo/", view=views.appointments_form, name="appointments_form"),
+    path("turnos/editar/<int:id>/", view=views.appointments_form, name="appointments_edit"),
+    path("turnos/eliminar/", view=views.appointments_delete, name="appointments_delete"),
+    path("turnos/semana/", view=views.appointments_calendar, name="appointments_calendar"),
+    path("ventas/", view=views.sales_repository, name="sales_repo"),
+    path("ventas/nueva/", view=views.sales_new, name="sales_new"),
+    path("ventas/<int:id>/", view=views.sales_detail, name="sales_detail"),
+    path("ventas/quitar/", view=views.sales_remove_line, name="sales_remove_line"),
+    path("ventas/cobrar/", view=views.sales_checkout, name="sales_checkout"),
+    path("ventas/eliminar/", view=views.sales_delete, name="sales_delete"),
+    path("reportes/", view=views.reports_page, name="reports"),
+    path("turnos/disponibles/", view=views.appointments_free_slots, name="appointments_free_slots"),
+
+    path("api/batch/", view=batch.batch, name="api_batch"),
+    path("api/changes/", view=changes.feed, name="api_changes"),
+    path("api/<str:resource>/", view=api.collection, name="api_collection"),
+    path("api/<str:resource>/<int:id>/", view=api.detail, name="api_detail"),
 ]
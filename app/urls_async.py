@@ -0,0 +1,31 @@
+"""
+Rutas del modo ASGI: las páginas de solo lectura usan las vistas de `async_views.py`.
+
+Las rutas asíncronas van primero, así que tienen prioridad sobre las de `urls.py`
+con el mismo camino y el mismo nombre; el resto se toma sin cambios.
+"""
+from django.urls import path
+
+from . import async_views, urls
+
+urlpatterns = [
+    path("clientes/", view=async_views.clients_repository, name="clients_repo"),
+    path("clientes/nuevo/", view=async_views.clients_form, name="clients_form"),
+    path("clientes/editar/<int:id>/", view=async_views.clients_form, name="clients_edit"),
+    path("productos/", view=async_views.products_repository, name="products_repo"),
+    path("productos/nuevo/", view=async_views.products_form, name="products_form"),
+    path("productos/editar/<int:id>/", view=async_views.products_form, name="products_edit"),
+    path("proveedores/", view=async_views.providers_repository, name="providers_repo"),
+    path("proveedores/nuevo/", view=async_views.providers_form, name="providers_form"),
+    path("proveedores/editar/<int:id>/", view=async_views.providers_form, name="providers_edit"),
+    path("veterinarios/", view=async_views.veterinary_repository, name="veterinary_repo"),
+    path("veterinarios/nuevo/", view=async_views.veterinary_form, name="veterinary_form"),
+    path("veterinarios/editar/<int:id>/", view=async_views.veterinary_form, name="veterinary_edit"),
+    path("mascotas/", view=async_views.pets_repository, name="pets_repo"),
+    path("mascotas/nuevo/", view=async_views.pets_form, name="pets_form"),
+    path("mascotas/editar/<int:id>/", view=async_views.pets_form, name="pets_edit"),
+    path("medicinas/", view=async_views.meds_repository, name="meds_repo"),
+    path("medicinas/nuevo/", view=async_views.meds_form, name="meds_form"),
+    path("medicinas/editar/<int:id>/", view=async_views.meds_form, name="meds_edit"),
+    *urls.urlpatterns,
+]
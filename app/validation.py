@@ -0,0 +1,398 @@
+"""
+Motor de validación declarativo compartido por modelos, vistas e importaciones masivas.
+
+Cada `Validator` se declara una sola vez con sus campos y reglas. Una regla es una
+función que recibe el valor como texto y devuelve el mensaje de error, o None si el
+valor es válido. Las expresiones regulares se compilan al importar el módulo y cada
+campo se recorre una única vez: sus reglas se evalúan en orden y la primera que falla
+define el mensaje de error.
+"""
+import math
+import re
+from datetime import date, datetime
+
+HAS_DIGIT = re.compile(r"\d")
+VETSOFT_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@vetsoft\.com")
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def no_digits(message):
+    """
+    Regla que falla si el valor contiene algún dígito.
+
+    Si todo lo que no es espacio son letras no puede haber dígitos, y esa
+    comprobación es más barata que la expresión regular.
+    """
+    search = HAS_DIGIT.search
+
+    def check(value):
+        if not value.replace(" ", "").isalpha() and search(value) is not None:
+            return message
+        return None
+
+    return check
+
+
+def digits_only(message):
+    """
+    Regla que falla si el valor no está formado solo por dígitos.
+    """
+    def check(value):
+        return None if value.isdecimal() else message
+
+    return check
+
+
+def starts_with(prefix, message):
+    """
+    Regla que falla si el valor no comienza con `prefix`.
+    """
+    def check(value):
+        return None if value.startswith(prefix) else message
+
+    return check
+
+
+def contains(text, message):
+    """
+    Regla que falla si el valor no contiene `text`.
+    """
+    def check(value):
+        return None if text in value else message
+
+    return check
+
+
+def matches(pattern, message):
+    """
+    Regla que falla si el valor completo no coincide con `pattern` (ya compilado).
+    """
+    fullmatch = pattern.fullmatch
+
+    def check(value):
+        return None if fullmatch(value) is not None else message
+
+    return check
+
+
+def number_between(low, high, invalid, out_of_range):
+    """
+    Regla que exige un número decimal dentro del intervalo cerrado [low, high].
+    """
+    def check(value):
+        try:
+            number = float(value)
+        except ValueError:
+            return invalid
+        if number < low or number > high:
+            return out_of_range
+        return None
+
+    return check
+
+
+def number_at_least(minimum, invalid, below):
+    """
+    Regla que exige un número decimal finito mayor o igual que `minimum`.
+    """
+    def check(value):
+        try:
+            number = float(value)
+        except ValueError:
+            return invalid
+        if not math.isfinite(number):
+            return invalid
+        if number < minimum:
+            return below
+        return None
+
+    return check
+
+
+def integer_at_least(minimum, invalid, below):
+    """
+    Regla que exige un número entero mayor o igual que `minimum`.
+    """
+    def check(value):
+        try:
+            number = int(value)
+        except ValueError:
+            return invalid
+        if number < minimum:
+            return below
+        return None
+
+    return check
+
+
+def past_date(invalid, future):
+    """
+    Regla que exige una fecha AAAA-MM-DD que no sea posterior al día actual.
+
+    Las fechas ISO se ordenan igual que sus cadenas, así que solo se consulta
+    `date.today()` cuando el valor no es anterior al último día calculado.
+    """
+    fullmatch = ISO_DATE.fullmatch
+    last_today = [date.today().isoformat()]
+
+    def check(value):
+        if fullmatch(value) is None:
+            return invalid
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            return invalid
+        if value >= last_today[0]:
+            last_today[0] = date.today().isoformat()
+            if value > last_today[0]:
+                return future
+        return None
+
+    return check
+
+
+def iso_date(message):
+    """
+    Regla que exige una fecha AAAA-MM-DD válida, sin restringir si es pasada o futura.
+    """
+    fullmatch = ISO_DATE.fullmatch
+
+    def check(value):
+        if fullmatch(value) is None:
+            return message
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            return message
+        return None
+
+    return check
+
+
+def date_time(message):
+    """
+    Regla que exige una fecha y hora ISO 8601, como la que envía un `<input type="datetime-local">`.
+    """
+    def check(value):
+        try:
+            datetime.fromisoformat(value)
+        except ValueError:
+            return message
+        return None
+
+    return check
+
+
+class Field:
+    """
+    Declaración de un campo: el mensaje si falta y las reglas que debe cumplir.
+
+    Si `required` es None el campo es opcional y sus reglas solo se evalúan cuando
+    llega un valor.
+    """
+    __slots__ = ("required", "rules")
+
+    def __init__(self, required, *rules):
+        self.required = required
+        self.rules = rules
+
+
+class Validator:
+    """
+    Valida diccionarios de datos contra un conjunto de campos declarados.
+
+    Uso:
+        validator = Validator(name=Field("Por favor ingrese un nombre", no_digits("...")))
+        errors = validator(data)                 # alta: todos los campos son obligatorios
+        errors = validator(data, partial=True)   # edición: solo se validan los campos enviados
+    """
+
+    def __init__(self, **fields):
+        self.names = tuple(fields)
+        self.fields = tuple((name, field.required, field.rules) for name, field in fields.items())
+
+    def validate(self, data, partial=False):
+        """
+        Devuelve un diccionario campo -> mensaje con los errores de `data`.
+
+        Los valores que no son texto, como números o fechas, se validan como su
+        representación en texto.
+        """
+        errors = {}
+        get = data.get
+        for name, required, rules in self.fields:
+            value = get(name)
+            if value is None or value == "":
+                if required is not None and not partial:
+                    errors[name] = required
+                continue
+            if value.__class__ is not str:
+                value = str(value)
+            for rule in rules:
+                message = rule(value)
+                if message is not None:
+                    errors[name] = message
+                    break
+        return errors
+
+    def __call__(self, data, partial=False):
+        """
+        Devuelve un diccionario campo -> mensaje con los errores de `data`.
+
+        Con `partial=True` se ignoran los campos ausentes o vacíos, como en las
+        actualizaciones donde solo se envían los valores que cambian.
+        """
+        return self.validate(data, partial)
+
+    def values(self, data):
+        """
+        Devuelve los argumentos para construir una instancia con los campos de `data`.
+
+        Los campos opcionales ausentes o vacíos se omiten y toman el valor por defecto
+        del modelo.
+        """
+        return {name: data[name] for name in self.names if data.get(name) not in (None, "")}
+
+    def partition(self, rows):
+        """
+        Separa `rows` en filas válidas y filas inválidas en una sola pasada.
+
+        Returns:
+            tuple: (valid, invalid), donde `invalid` es una lista de (índice, errores).
+        """
+        validate = self.validate
+        valid = []
+        invalid = []
+        for index, row in enumerate(rows):
+            errors = validate(row)
+            if errors:
+                invalid.append((index, errors))
+            else:
+                valid.append(row)
+        return valid, invalid
+
+
+client_validator = Validator(
+    name=Field(
+        "Por favor ingrese un nombre",
+        no_digits("El nombre no puede contener números."),
+    ),
+    city=Field("Por favor seleccione una ciudad"),
+    phone=Field(
+        "Por favor ingrese un teléfono",
+        digits_only("Por favor ingrese un numero de telefono valido, solo digitos"),
+        starts_with("54", "El telefono debe comenzar con '54'"),
+    ),
+    email=Field(
+        "Por favor ingrese un email",
+        matches(VETSOFT_EMAIL, "Por favor ingrese un email valido que termine con @vetsoft.com"),
+    ),
+)
+
+provider_validator = Validator(
+    name=Field("Por favor ingrese un nombre"),
+    address=Field("Por favor ingrese una direccion"),
+    email=Field(
+        "Por favor ingrese un email valido",
+        contains("@", "Por favor ingrese un email valido"),
+    ),
+)
+
+product_validator = Validator(
+    name=Field("Por favor ingrese un nombre"),
+    type=Field("Por favor ingrese un tipo"),
+    price=Field(
+        "Por favor ingrese un precio",
+        number_at_least(0, "El precio debe ser un número", "El precio no puede ser negativo."),
+    ),
+    stock=Field(
+        "Por favor ingrese un stock",
+        integer_at_least(0, "El stock debe ser un número entero", "El stock no puede ser negativo."),
+    ),
+)
+
+veterinary_validator = Validator(
+    name=Field("Por favor ingrese un nombre"),
+    phone=Field("Por favor ingrese un teléfono"),
+    email=Field(
+        "Por favor ingrese un email",
+        contains("@", "Por favor ingrese un email valido"),
+    ),
+)
+
+med_validator = Validator(
+    name=Field("Por favor ingrese un nombre"),
+    desc=Field("Por favor ingrese una descripcion"),
+    product_id=Field(None, digits_only("Por favor seleccione un producto válido")),
+    dose=Field(
+        "Por favor ingrese una dosis",
+        number_between(
+            1.0, 10.0,
+            "La dosis debe ser un número decimal",
+            "La dosis debe estar entre 1 y 10",
+        ),
+    ),
+)
+
+pet_validator = Validator(
+    name=Field("Por favor ingrese un nombre"),
+    client_id=Field(None, digits_only("Por favor seleccione un dueño válido")),
+    breed=Field("Por favor ingrese una raza"),
+    birthday=Field(
+        "Por favor ingrese una fecha de nacimiento",
+        past_date(
+            "Formato de fecha invalido. Utilice el formato YYYY-MM-DD",
+            "La fecha de nacimiento no puede ser posterior al día actual.",
+        ),
+    ),
+)
+
+appointment_validator = Validator(
+    pet_id=Field("Por favor seleccione una mascota", digits_only("Por favor seleccione una mascota válida")),
+    veterinary_id=Field(
+        "Por favor seleccione un veterinario", digits_only("Por favor seleccione un veterinario válido"),
+    ),
+    start=Field("Por favor ingrese el inicio del turno", date_time("Formato de fecha y hora inválido")),
+    end=Field("Por favor ingrese el fin del turno", date_time("Formato de fecha y hora inválido")),
+)
+
+schedule_validator = Validator(
+    kind=Field("Por favor seleccione un tipo"),
+    name=Field("Por favor ingrese un nombre"),
+    next_due=Field(
+        "Por favor ingrese la fecha de la próxima dosis",
+        iso_date("Formato de fecha invalido. Utilice el formato YYYY-MM-DD"),
+    ),
+    interval_days=Field(
+        None,
+        integer_at_least(1, "El intervalo debe ser un número entero de días", "El intervalo debe ser de al menos un día"),
+    ),
+)
+
+prescription_validator = Validator(
+    pet_id=Field("Por favor seleccione una mascota", digits_only("Por favor seleccione una mascota válida")),
+    med_id=Field("Por favor seleccione un medicamento", digits_only("Por favor seleccione un medicamento válido")),
+    veterinary_id=Field(
+        "Por favor seleccione un veterinario", digits_only("Por favor seleccione un veterinario válido"),
+    ),
+    dose=Field(
+        None,
+        number_between(
+            1.0, 10.0,
+            "La dosis debe ser un número decimal",
+            "La dosis debe estar entre 1 y 10",
+        ),
+    ),
+    quantity=Field(
+        "Por favor ingrese una cantidad",
+        integer_at_least(1, "La cantidad debe ser un número entero", "La cantidad debe ser de al menos 1"),
+    ),
+)
+
+sale_line_validator = Validator(
+    product_id=Field("Por favor seleccione un producto", digits_only("Por favor seleccione un producto válido")),
+    quantity=Field(
+        "Por favor ingrese una cantidad",
+        integer_at_least(1, "La cantidad debe ser un número entero", "La cantidad debe ser de al menos 1"),
+    ),
+)
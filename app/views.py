@@ -1,13 +1,187 @@
+import csv
+from datetime import date, timedelta
 
+from django.conf import settings
 from django.contrib import messages
+from django.core.exceptions import BadRequest
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q, Sum
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render, reverse
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from . import agenda, events, reports, summaries
+from .models import (
+    Appointment,
+    Client,
+    Med,
+    Pet,
+    Prescription,
+    Product,
+    Provider,
+    Sale,
+    Schedule,
+    Veterinary,
+)
+
+
+def form_data(request, instance, errors):
+    """
+    Devuelve los datos enviados para volver a mostrar un formulario con errores.
+
+    Si el error es un conflicto de versión, la versión enviada se reemplaza por la
+    actual del registro: el formulario conserva lo que escribió el usuario y, si lo
+    vuelve a enviar, sus cambios se guardan sobre la versión vigente.
+
+    Args:
+        request (HttpRequest): La solicitud POST recibida.
+        instance (Model | None): El registro editado, o None si se estaba creando.
+        errors (dict): Los errores devueltos por save_* o update_*.
+
+    Returns:
+        dict: Los datos del formulario.
+    """
+    data = request.POST.dict()
+    if instance is not None and "version" in errors:
+        data["version"] = instance.version
+    return data
+
+
+def posted_id(request, name):
+    """
+    Devuelve el ID enviado en el campo `name` de una solicitud POST.
 
-from .models import Client, Med, Pet, Product, Provider, Veterinary
+    Args:
+        request (HttpRequest): La solicitud POST recibida.
+        name (str): El nombre del campo con el ID.
+
+    Returns:
+        int: El ID enviado.
+
+    Raises:
+        BadRequest: Si el campo falta o no es un número, y Django responde 400.
+    """
+    value = request.POST.get(name, "")
+    if not value.isdecimal():
+        raise BadRequest(f"{name} debe ser un número")
+    return int(value)
+
+
+def posted_ids(request, name):
+    """
+    Devuelve la lista de IDs enviada en el campo `name` de una solicitud POST, que puede
+    estar vacía.
+
+    Raises:
+        BadRequest: Si algún ID no es un número, y Django responde 400.
+    """
+    values = request.POST.getlist(name)
+    if not all(value.isdecimal() for value in values):
+        raise BadRequest(f"{name} debe ser una lista de números")
+    return [int(value) for value in values]
+
+
+def bulk_action(request, model, field=None):
+    """
+    Aplica la acción en lote enviada desde un repositorio a los registros seleccionados.
+
+    Los IDs llegan en la lista `ids` y, si alguno no es un número, se responde 400. La acción `delete` borra todos los registros con un
+    único `QuerySet.delete()`, y la acción `update` asigna a `field` el valor enviado con
+    un único `QuerySet.update()` que también incrementa la versión de cada registro, para
+    que los formularios de edición abiertos detecten el cambio. Si el campo tiene opciones,
+    el valor debe ser una de ellas.
+
+    Args:
+        request (HttpRequest): La solicitud POST recibida.
+        model (Model): El modelo de los registros seleccionados.
+        field (str, opcional): El campo que admite la edición en lote.
+
+    Returns:
+        int: La cantidad de registros borrados o actualizados.
+    """
+    ids = posted_ids(request, "ids")
+    action = request.POST.get("action")
+    if not ids:
+        messages.warning(request, "No se seleccionó ningún registro.")
+        return 0
+
+    queryset = model.objects.for_ids(ids)
+    if action == "delete":
+        with transaction.atomic():
+            count, _ = queryset.delete()
+        messages.success(request, f"Se borraron {count} registros.")
+        return count
+
+    if action != "update" or field is None:
+        messages.error(request, "Acción no válida.")
+        return 0
+
+    value = request.POST.get(field, "").strip()
+    choices = model._meta.get_field(field).choices
+    if value == "" or (choices and value not in dict(choices)):
+        messages.error(request, "Por favor ingrese un valor válido.")
+        return 0
+
+    with transaction.atomic():
+        count = queryset.update(**{field: value}, version=F("version") + 1)
+    messages.success(request, f"Se actualizaron {count} registros.")
+    return count
+
+
+def clients_with_pets():
+    """
+    Devuelve los clientes con la cantidad de mascotas vivas y sus mascotas precargadas.
+
+    La cantidad se calcula con `Count` en la consulta de clientes y las mascotas se leen
+    con una segunda consulta para todos los clientes, así el listado hace dos consultas
+    sin importar cuántos registros haya.
+    """
+    return Client.objects.annotate(
+        pet_count=Count("pets", filter=Q(pets__deleted_at__isnull=True)),
+    ).prefetch_related(Prefetch("pets", queryset=Pet.objects.order_by("name")))
+
+
+def pets_with_owner():
+    """
+    Devuelve las mascotas con su dueño leído en la misma consulta con `select_related`,
+    en el orden en que se cargaron. Sin un orden explícito, SQLite puede leerlas por el
+    índice de `birthday_doy` y el listado saldría ordenado por cumpleaños.
+    """
+    return Pet.objects.select_related("client").order_by("pk")
+
+
+def owner_choices():
+    """
+    Devuelve los clientes que se ofrecen como dueño en el formulario de mascotas.
+    """
+    return Client.objects.order_by("name").only("id", "name")
+
+
+def upcoming_birthdays(days):
+    """
+    Devuelve las mascotas que cumplen años en los próximos `days` días con su dueño,
+    como tuplas (mascota, fecha del cumpleaños, años que cumple).
+    """
+    today = timezone.localdate()
+    for pets in Pet.upcoming_birthdays(days, today):
+        for pet in pets.select_related("client").iterator():
+            birthday = pet.next_birthday(today)
+            yield pet, birthday, birthday.year - pet.birthday.year
+
+
+def product_choices():
+    """
+    Devuelve los productos que se ofrecen en el formulario de medicamentos.
+    """
+    return Product.objects.order_by("name").only("id", "name")
 
 
 def home(request):
     """
-    Renderiza la página principal.
+    Renderiza la página principal con los cumpleaños de los próximos
+    `UPCOMING_BIRTHDAYS_DAYS` días y las cifras del tablero, que se leen de las tablas
+    resumen con una única consulta.
 
     Args:
         request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
@@ -15,7 +189,59 @@ def home(request):
     Returns:
         HttpResponse: Un objeto HttpResponse que renderiza la plantilla 'home.html'.
     """
-    return render(request, "home.html")
+    days = settings.UPCOMING_BIRTHDAYS_DAYS
+    return render(
+        request,
+        "home.html",
+        {
+            "birthdays": list(upcoming_birthdays(days)),
+            "birthday_days": days,
+            "summary": summaries.dashboard(timezone.localdate()),
+        },
+    )
+
+
+class Echo:
+    """
+    Objeto con la interfaz de archivo que `csv.writer` necesita; devuelve cada línea
+    en lugar de guardarla, para poder transmitirla.
+    """
+
+    def write(self, value):
+        """
+        Devuelve la línea escrita.
+        """
+        return value
+
+
+def birthdays_export(request):
+    """
+    Exporta como CSV los cumpleaños de los próximos días, para enviar los saludos.
+
+    Parámetros de la URL:
+        days (opcional): Cantidad de días; por defecto `UPCOMING_BIRTHDAYS_DAYS`.
+
+    Returns:
+        StreamingHttpResponse: El CSV, o los errores como JSON con código 400.
+    """
+    try:
+        days = int(request.GET.get("days", settings.UPCOMING_BIRTHDAYS_DAYS))
+    except ValueError:
+        days = -1
+    if days < 0:
+        return JsonResponse({"errors": {"days": "Se esperaba un número entero no negativo"}}, status=400)
+
+    def lines():
+        writer = csv.writer(Echo())
+        yield writer.writerow(["mascota", "cumpleaños", "edad", "dueño", "email", "teléfono"])
+        for pet, birthday, age in upcoming_birthdays(days):
+            owner = pet.client if pet.client and not pet.client.deleted_at else None
+            contact = [owner.name, owner.email, owner.phone] if owner else ["", "", ""]
+            yield writer.writerow([pet.name, birthday.isoformat(), age, *contact])
+
+    response = StreamingHttpResponse(lines(), content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="cumpleanos.csv"'
+    return response
 
 
 def clients_repository(request):
@@ -31,8 +257,8 @@ def clients_repository(request):
         HttpResponse: Un objeto HttpResponse que renderiza la plantilla 'clients/repository.html'
         con la lista de clientes pasada como contexto.
     """
-    clients = Client.objects.all()
-    return render(request, "clients/repository.html", {"clients": clients})
+    clients = clients_with_pets()
+    return render(request, "clients/repository.html", {"clients": clients, "cities": Client.City.values})
 
 
 def clients_form(request, id=None):
@@ -54,43 +280,20 @@ def clients_form(request, id=None):
     cities = dict(Client.City.choices)
     if request.method == "POST":
         client_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
-        email = request.POST.get("email")
-        phone = request.POST.get("phone", "")
+
+        client = None
 
         if client_id == "":
             saved, errors = Client.save_client(request.POST)
         else:
             client = get_object_or_404(Client, pk=client_id)
-            if any(char.isdigit() for char in request.POST["name"]):
-                errors["name"] = "El nombre no puede contener números."
-                saved = False
-            else:
-                client.update_client(request.POST)
-        if email:
-            try:
-                if not email.endswith("@vetsoft.com"):
-                    errors["email"] = "Por favor ingrese un email valido que termine con @vetsoft.com"
-                    saved = False
-            except ValueError:
-                errors["email"] = "Por favor ingrese un email valido"
-
-
-        if phone:
-            try:
-                int (phone)
-                if not phone.startswith("54"):
-                    saved=False
-                    errors["phone"] = "El telefono debe comenzar con '54'"
-            except ValueError:
-                errors["phone"] = "Por favor ingrese un numero de telefono valido, solo digitos"
+            saved, errors = client.update_client(request.POST)
 
         if saved:
             return redirect(reverse("clients_repo"))
 
         return render(
-            request, "clients/form.html", {"errors": errors, "client": request.POST, "cities": cities},
+            request, "clients/form.html", {"errors": errors, "client": form_data(request, client, errors), "cities": cities},
         )
 
     client = None
@@ -121,6 +324,22 @@ def clients_delete(request):
     return redirect(reverse("clients_repo"))
 
 
+@require_POST
+def clients_bulk(request):
+    """
+    Borra o cambia la ciudad de los clientes seleccionados en el repositorio.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponseRedirect: Una respuesta de redirección al repositorio de clientes.
+    """
+    bulk_action(request, Client, "city")
+
+    return redirect(reverse("clients_repo"))
+
+
 def pets_repository(request):
     """
     Renderiza la página de repositorio de mascotas.
@@ -133,8 +352,8 @@ def pets_repository(request):
     Returns:
         HttpResponse: Una respuesta HTTP que renderiza el template 'repository.html' con la lista de mascotas.
     """
-    pets = Pet.objects.all()
-    return render(request, "pets/repository.html", {"pets": pets})
+    pets = pets_with_owner()
+    return render(request, "pets/repository.html", {"pets": pets, "breeds": Pet.Breed.values})
 
 
 def pets_form(request, id=None):
@@ -155,8 +374,8 @@ def pets_form(request, id=None):
 
     if request.method == "POST":
         pet_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
+
+        pet = None
 
         if pet_id == "":
             saved, errors = Pet.save_pet(request.POST)
@@ -169,14 +388,16 @@ def pets_form(request, id=None):
 
         # Pasar los errores y datos del formulario en caso de fallo
         return render(
-            request, "pets/form.html", {"errors": errors, "pet": request.POST, "breeds": breeds},
+            request,
+            "pets/form.html",
+            {"errors": errors, "pet": form_data(request, pet, errors), "breeds": breeds, "clients": owner_choices()},
         )
 
     pet = None
     if id is not None:
         pet = get_object_or_404(Pet, pk=id)
 
-    return render(request, "pets/form.html", {"pet": pet, "breeds": breeds})
+    return render(request, "pets/form.html", {"pet": pet, "breeds": breeds, "clients": owner_choices()})
 
 def pets_delete(request):
     """
@@ -199,12 +420,30 @@ def pets_delete(request):
     return redirect(reverse("pets_repo"))
 
 
+@require_POST
+def pets_bulk(request):
+    """
+    Borra o cambia la raza de los mascotas seleccionados en el repositorio.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponseRedirect: Una respuesta de redirección al repositorio de mascotas.
+    """
+    bulk_action(request, Pet, "breed")
+
+    return redirect(reverse("pets_repo"))
+
+
 def products_repository(request):
     """
     Renderiza la página del repositorio de productos.
 
-    Obtiene todos los productos de la base de datos y los pasa al template para su renderizado.
+    Obtiene todos los productos de la base de datos, con su stock disponible descontando
+    las reservas vigentes en la misma consulta, y los pasa al template para su renderizado.
     Además, verifica si algún producto tiene un stock de 0 y muestra un mensaje de advertencia si es así.
+    El script de stock en vivo solo se incluye si la solicitud llegó por ASGI.
 
     Args:
         request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
@@ -212,11 +451,15 @@ def products_repository(request):
     Returns:
         HttpResponse: Una respuesta HTTP que renderiza la página del repositorio de productos.
     """
-    products = Product.objects.all()
+    products = Product.with_available()
     for product in products:
         if product.stock == 0:
             messages.warning(request, f'El stock del producto "{product.name}" es 0.')
-    return render(request, "products/repository.html", {"products": products})
+    return render(
+        request,
+        "products/repository.html",
+        {"products": products, "live_stock": events.streams_supported(request)},
+    )
 
 
 def products_form(request, id=None):
@@ -235,36 +478,22 @@ def products_form(request, id=None):
     """
     if request.method == "POST":
         product_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
-        stock = request.POST.get("stock")
-
-        try:
-            int(stock)
-        except Exception:
-            if (product_id == ""):
-                saved, errors = Product.save_product(request.POST)
-            else:
-                errors["stock"] = "El campo de stock no puede estar vacio."
-            return render(
-            request, "products/form.html", {"errors": errors, "product": request.POST},
-            )
-
-        if (product_id == "" and int(stock) >= 0):
-            stock = int(request.POST.get("stock"))
+
+        product = None
+
+        if product_id == "":
             saved, errors = Product.save_product(request.POST)
-        elif (int(stock) < 0):
-            saved = False
-            errors["stock"] = "El stock no puede ser negativo."
+        elif request.POST.get("stock", "") == "":
+            saved, errors = False, {"stock": "El campo de stock no puede estar vacio."}
         else:
             product = get_object_or_404(Product, pk=product_id)
-            product.update_product(request.POST)
+            saved, errors = product.update_product(request.POST)
 
         if saved:
             return redirect(reverse("products_repo"))
 
         return render(
-            request, "products/form.html", {"errors": errors, "product": request.POST},
+            request, "products/form.html", {"errors": errors, "product": form_data(request, product, errors)},
         )
 
     product = None
@@ -293,12 +522,29 @@ def products_delete(request):
 
     return redirect(reverse("products_repo"))
 
+
+@require_POST
+def products_bulk(request):
+    """
+    Borra o cambia el tipo de los productos seleccionados en el repositorio.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponseRedirect: Una respuesta de redirección al repositorio de productos.
+    """
+    bulk_action(request, Product, "type")
+
+    return redirect(reverse("products_repo"))
+
 def increment_stock(request, id):
     """
     Incrementa el stock de un producto en 1 unidad.
 
     Busca un producto específico en la base de datos utilizando su ID. Luego incrementa el stock del producto en 1 unidad
-    y guarda los cambios en la base de datos. Finalmente, redirige al usuario a la página de repositorio de productos.
+    con un único UPDATE, que también incrementa su versión, para no pisar ediciones concurrentes. Finalmente,
+    redirige al usuario a la página de repositorio de productos.
 
     Args:
         request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
@@ -309,9 +555,7 @@ def increment_stock(request, id):
     """
     product = get_object_or_404(Product, pk=id)
 
-    product.stock += 1
-
-    product.save()
+    Product.objects.for_ids([product.pk]).update(stock=F("stock") + 1, version=F("version") + 1)
 
     return redirect('products_repo')
 
@@ -320,7 +564,8 @@ def decrement_stock(request, id):
     Decrementa el stock de un producto en 1 unidad, si el stock es mayor que cero.
 
     Busca un producto específico en la base de datos utilizando su ID. Si el stock del producto es mayor que cero, se
-    decrementa en 1 unidad y se guardan los cambios en la base de datos. Luego, redirige al usuario a la página de
+    decrementa en 1 unidad con un UPDATE condicionado a que siga habiendo stock, que también incrementa la versión
+    del producto. Luego, redirige al usuario a la página de
     repositorio de productos. Si el stock es cero o menor, la función simplemente redirige al usuario a la página de
     repositorio de productos sin hacer cambios.
 
@@ -333,12 +578,11 @@ def decrement_stock(request, id):
     """
     product = get_object_or_404(Product, pk=id)
 
-    if (product.stock > 0):
-        product.stock -= 1
-        product.save()
-        return redirect('products_repo')
-    else:
-        return redirect('products_repo')
+    Product.objects.for_ids([product.pk]).filter(stock__gt=0).update(
+        stock=F("stock") - 1, version=F("version") + 1,
+    )
+
+    return redirect('products_repo')
 
 
 def providers_repository(request):
@@ -377,20 +621,20 @@ def providers_form(request, id=None):
     """
     if request.method == "POST":
         provider_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
+
+        provider = None
 
         if provider_id == "":
             saved, errors = Provider.save_provider(request.POST)
         else:
             provider = get_object_or_404(Provider, pk=provider_id)
-            provider.update_provider(request.POST)
+            saved, errors = provider.update_provider(request.POST)
 
         if saved:
             return redirect(reverse("providers_repo"))
 
         return render(
-            request, "providers/form.html", {"errors": errors, "provider": request.POST},
+            request, "providers/form.html", {"errors": errors, "provider": form_data(request, provider, errors)},
         )
 
     provider = None
@@ -419,6 +663,22 @@ def providers_delete(request):
 
     return redirect(reverse("providers_repo"))
 
+
+@require_POST
+def providers_bulk(request):
+    """
+    Borra los proveedores seleccionados en el repositorio.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponseRedirect: Una respuesta de redirección al repositorio de proveedores.
+    """
+    bulk_action(request, Provider)
+
+    return redirect(reverse("providers_repo"))
+
 def veterinary_repository(request):
     """
     Renderiza la página que muestra todos los veterinarios almacenados en la base de datos.
@@ -459,20 +719,20 @@ def veterinary_form(request, id=None):
     """
     if request.method == "POST":
         veterinary_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
+
+        veterinary = None
 
         if veterinary_id == "":
             saved, errors = Veterinary.save_veterinary(request.POST)
         else:
             veterinary = get_object_or_404(Veterinary, pk=veterinary_id)
-            veterinary.update_veterinary(request.POST)
+            saved, errors = veterinary.update_veterinary(request.POST)
 
         if saved:
             return redirect(reverse("veterinary_repo"))
 
         return render(
-            request, "veterinary/form.html", {"errors": errors, "veterinary": request.POST},
+            request, "veterinary/form.html", {"errors": errors, "veterinary": form_data(request, veterinary, errors)},
         )
 
     veterinary = None
@@ -505,6 +765,254 @@ def veterinary_delete(request):
     return redirect(reverse("veterinary_repo"))
 
 
+@require_POST
+def veterinary_bulk(request):
+    """
+    Borra los veterinarios seleccionados en el repositorio.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponseRedirect: Una respuesta de redirección al repositorio de veterinarios.
+    """
+    bulk_action(request, Veterinary)
+
+    return redirect(reverse("veterinary_repo"))
+
+
+def pets_schedules(request, id):
+    """
+    Renderiza los planes de vacunación y tratamiento de una mascota y procesa las altas.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+        id (int): El ID de la mascota.
+
+    Returns:
+        HttpResponse: La página de planes, o una redirección a ella si se guardó un plan.
+    """
+    pet = get_object_or_404(Pet, pk=id)
+    errors = None
+    schedule = None
+    if request.method == "POST":
+        saved, errors = Schedule.save_schedule(pet, request.POST)
+        if saved:
+            return redirect(reverse("pets_schedules", kwargs={"id": pet.id}))
+        schedule = request.POST
+
+    schedules = pet.schedules.order_by(F("next_due").asc(nulls_last=True), "name")
+    return render(request, "pets/schedules.html", {
+        "pet": pet,
+        "schedules": schedules,
+        "kinds": dict(Schedule.Kind.choices),
+        "schedule": schedule,
+        "errors": errors,
+        "today": timezone.localdate(),
+    })
+
+
+@require_POST
+def schedules_apply(request):
+    """
+    Registra la dosis aplicada hoy de un plan.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest con el ID del plan en "schedule_id".
+
+    Returns:
+        HttpResponseRedirect: Una redirección a los planes de la mascota.
+    """
+    schedule = get_object_or_404(Schedule, pk=posted_id(request, "schedule_id"))
+    schedule.apply_dose(timezone.localdate())
+
+    return redirect(reverse("pets_schedules", kwargs={"id": schedule.pet_id}))
+
+
+def pets_prescriptions(request, id):
+    """
+    Renderiza el historial de recetas de una mascota y procesa las recetas nuevas.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+        id (int): El ID de la mascota.
+
+    Returns:
+        HttpResponse: La página de recetas, o una redirección a ella si se guardó una receta.
+    """
+    pet = get_object_or_404(Pet, pk=id)
+    errors = None
+    prescription = None
+    if request.method == "POST":
+        prescription = {**request.POST.dict(), "pet_id": pet.id}
+        saved, errors = Prescription.save_prescription(prescription)
+        if saved:
+            return redirect(reverse("pets_prescriptions", kwargs={"id": pet.id}))
+
+    return render(request, "pets/prescriptions.html", {
+        "pet": pet,
+        "prescriptions": Prescription.history(pet.id),
+        "meds": Med.objects.order_by("name").only("id", "name", "dose"),
+        "veterinarians": Veterinary.objects.order_by("name").only("id", "name"),
+        "prescription": prescription,
+        "errors": errors,
+    })
+
+
+@require_POST
+def prescriptions_dispense(request):
+    """
+    Dispensa una receta y descuenta el stock del producto del medicamento.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest con el ID de la receta en "prescription_id".
+
+    Returns:
+        HttpResponseRedirect: Una redirección a las recetas de la mascota.
+    """
+    prescription = get_object_or_404(Prescription, pk=posted_id(request, "prescription_id"))
+    dispensed, errors = prescription.dispense()
+    if not dispensed:
+        for error in errors.values():
+            messages.error(request, error)
+
+    return redirect(reverse("pets_prescriptions", kwargs={"id": prescription.pet_id}))
+
+
+def sales_repository(request):
+    """
+    Renderiza las ventas abiertas y las facturas, de la más reciente a la más antigua.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponse: La página de ventas.
+    """
+    return render(request, "sales/repository.html", {
+        "open_sales": Sale.objects.filter(paid_at__isnull=True).order_by("-created_at"),
+        "invoices": Sale.objects.filter(paid_at__isnull=False).annotate(
+            items=Sum("lines__quantity"),
+        ).order_by("-paid_at"),
+    })
+
+
+@require_POST
+def sales_new(request):
+    """
+    Abre una venta nueva y redirige a su carrito.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponseRedirect: Una redirección al carrito de la venta.
+    """
+    sale = Sale.objects.create()
+    return redirect(reverse("sales_detail", kwargs={"id": sale.id}))
+
+
+def sales_detail(request, id):
+    """
+    Renderiza el carrito de una venta abierta, o la factura si ya fue cobrada, y
+    procesa los productos que se agregan al carrito.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+        id (int): El ID de la venta.
+
+    Returns:
+        HttpResponse: La página de la venta, o una redirección a ella si se agregó un producto.
+    """
+    sale = get_object_or_404(Sale, pk=id)
+    errors = None
+    line = None
+    if request.method == "POST":
+        line = request.POST.dict()
+        saved, errors = sale.add_line(line)
+        if saved:
+            return redirect(reverse("sales_detail", kwargs={"id": sale.id}))
+
+    return render(request, "sales/detail.html", {
+        "sale": sale,
+        "lines": sale.lines.order_by("pk"),
+        "products": Product.with_available().order_by("name").only("id", "name", "price", "stock"),
+        "line": line,
+        "errors": errors,
+    })
+
+
+@require_POST
+def sales_remove_line(request):
+    """
+    Quita una línea del carrito de una venta abierta.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest con "sale_id" y "line_id".
+
+    Returns:
+        HttpResponseRedirect: Una redirección al carrito de la venta.
+    """
+    sale = get_object_or_404(Sale, pk=posted_id(request, "sale_id"))
+    line = get_object_or_404(sale.lines, pk=posted_id(request, "line_id"))
+    sale.remove_line(line.id)
+
+    return redirect(reverse("sales_detail", kwargs={"id": sale.id}))
+
+
+@require_POST
+def sales_checkout(request):
+    """
+    Cobra una venta y descuenta el stock de todas sus líneas en una transacción.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest con el ID de la venta en "sale_id".
+
+    Returns:
+        HttpResponseRedirect: Una redirección a la venta.
+    """
+    sale = get_object_or_404(Sale, pk=posted_id(request, "sale_id"))
+    paid, errors = sale.checkout()
+    if paid:
+        messages.success(request, f"Venta {sale.id} cobrada por ${sale.total:.2f}.")
+    else:
+        for error in errors.values():
+            messages.error(request, error)
+
+    return redirect(reverse("sales_detail", kwargs={"id": sale.id}))
+
+
+@require_POST
+def sales_delete(request):
+    """
+    Descarta una venta abierta y libera sus reservas; las facturas no se pueden borrar.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest con el ID de la venta en "sale_id".
+
+    Returns:
+        HttpResponseRedirect: Una redirección al listado de ventas.
+    """
+    sale = get_object_or_404(Sale, pk=posted_id(request, "sale_id"), paid_at__isnull=True)
+    sale.discard()
+
+    return redirect(reverse("sales_repo"))
+
+
+def reports_page(request):
+    """
+    Renderiza la página de reportes: el valor del inventario por tipo de producto y los
+    productos más vendidos, calculados en la base de datos y guardados en caché.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponse: La página de reportes.
+    """
+    return render(request, "reports.html", reports.report())
+
+
 def meds_repository(request):
     """
     Renderiza la página de repositorio de medicamentos.
@@ -541,8 +1049,8 @@ def meds_form(request, id=None):
     """
     if request.method == "POST":
         med_id = request.POST.get("id", "")
-        errors = {}
-        saved = True
+
+        med = None
 
         if med_id == "":
             saved, errors = Med.save_med(request.POST)
@@ -553,7 +1061,11 @@ def meds_form(request, id=None):
         if saved:
             return redirect(reverse("meds_repo"))
 
-        return render(request, "meds/form.html", {"errors": errors, "med": request.POST})
+        return render(
+            request,
+            "meds/form.html",
+            {"errors": errors, "med": form_data(request, med, errors), "products": product_choices()},
+        )
 
     med = None
     if id is not None:
@@ -561,7 +1073,7 @@ def meds_form(request, id=None):
     else:
         med = {"name": "", "desc": "", "dose": ""}
 
-    return render(request, "meds/form.html", {"med": med})
+    return render(request, "meds/form.html", {"med": med, "products": product_choices()})
 
 
 def meds_delete(request):
@@ -582,3 +1094,167 @@ def meds_delete(request):
     med.delete()
 
     return redirect(reverse("meds_repo"))
+
+
+@require_POST
+def meds_bulk(request):
+    """
+    Borra los medicamentos seleccionados en el repositorio.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponseRedirect: Una respuesta de redirección al repositorio de medicamentos.
+    """
+    bulk_action(request, Med)
+
+    return redirect(reverse("meds_repo"))
+
+
+def appointments_repository(request):
+    """
+    Renderiza la página de turnos con los turnos que todavía no terminaron.
+
+    La mascota y el veterinario de cada turno se leen en la misma consulta con
+    `select_related`.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+
+    Returns:
+        HttpResponse: Una respuesta HTTP que renderiza la plantilla 'appointments/repository.html'.
+    """
+    appointments = Appointment.objects.filter(end__gt=timezone.now()).select_related(
+        "pet", "veterinary",
+    ).order_by("start")
+    return render(request, "appointments/repository.html", {"appointments": appointments})
+
+
+def appointment_initial(appointment):
+    """
+    Devuelve los valores con los que se completa el formulario de un turno existente.
+
+    Las fechas se expresan en la zona horaria actual con el formato de `datetime-local`.
+    """
+    return {
+        "id": appointment.id,
+        "version": appointment.version,
+        "pet_id": appointment.pet_id,
+        "veterinary_id": appointment.veterinary_id,
+        "start": timezone.localtime(appointment.start).strftime("%Y-%m-%dT%H:%M"),
+        "end": timezone.localtime(appointment.end).strftime("%Y-%m-%dT%H:%M"),
+    }
+
+
+def appointments_form(request, id=None):
+    """
+    Renderiza el formulario de turnos y procesa las reservas y reprogramaciones.
+
+    Si la solicitud es de tipo POST, reserva un turno nuevo o modifica el indicado en "id";
+    un horario superpuesto con otro turno del veterinario se informa como error.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest que contiene los datos de la solicitud.
+        id (int, opcional): El ID del turno a editar. Por defecto es None.
+
+    Returns:
+        HttpResponse: El formulario de turnos, o una redirección a la página de turnos si se guardó.
+    """
+    context = {
+        "pets": Pet.objects.order_by("name").only("id", "name"),
+        "veterinarians": Veterinary.objects.order_by("name").only("id", "name"),
+    }
+    if request.method == "POST":
+        appointment_id = request.POST.get("id", "")
+
+        appointment = None
+
+        if appointment_id == "":
+            saved, errors = Appointment.save_appointment(request.POST)
+        else:
+            appointment = get_object_or_404(Appointment, pk=appointment_id)
+            saved, errors = appointment.update_appointment(request.POST)
+
+        if saved:
+            return redirect(reverse("appointments_repo"))
+
+        return render(
+            request,
+            "appointments/form.html",
+            {"errors": errors, "appointment": form_data(request, appointment, errors), **context},
+        )
+
+    appointment = None
+    if id is not None:
+        appointment = appointment_initial(get_object_or_404(Appointment, pk=id))
+
+    return render(request, "appointments/form.html", {"appointment": appointment, **context})
+
+
+@require_POST
+def appointments_delete(request):
+    """
+    Cancela un turno.
+
+    Args:
+        request (HttpRequest): El objeto HttpRequest con el ID del turno en "appointment_id".
+
+    Returns:
+        HttpResponseRedirect: Una redirección a la página de turnos.
+    """
+    appointment = get_object_or_404(Appointment, pk=posted_id(request, "appointment_id"))
+    appointment.delete()
+
+    return redirect(reverse("appointments_repo"))
+
+
+def appointments_calendar(request):
+    """
+    Renderiza la agenda semanal de todos los veterinarios.
+
+    Parámetros de la URL:
+        week (opcional): Un día de la semana a mostrar, en formato AAAA-MM-DD; por
+            defecto, la semana actual.
+
+    Returns:
+        HttpResponse: Una respuesta HTTP que renderiza la plantilla 'appointments/calendar.html'.
+    """
+    try:
+        day = date.fromisoformat(request.GET["week"])
+    except (KeyError, ValueError):
+        day = timezone.localdate()
+
+    monday = agenda.week_start(day)
+    return render(request, "appointments/calendar.html", {
+        "monday": monday,
+        "previous_week": monday - timedelta(days=7),
+        "next_week": monday + timedelta(days=7),
+        "week": agenda.render_week(monday),
+    })
+
+
+def appointments_free_slots(request):
+    """
+    Devuelve como JSON los huecos libres de un veterinario en un día.
+
+    Parámetros de la URL:
+        veterinary_id: El veterinario.
+        date: El día, en formato AAAA-MM-DD.
+        minutes (opcional): Duración mínima de los huecos.
+
+    Returns:
+        JsonResponse: {"slots": [{"start": ..., "end": ...}]} o los errores con código 400.
+    """
+    try:
+        veterinary_id = int(request.GET.get("veterinary_id", ""))
+        day = date.fromisoformat(request.GET.get("date", ""))
+        minutes = int(request.GET.get("minutes", 0))
+    except ValueError:
+        return JsonResponse(
+            {"errors": {"params": "Se esperaba veterinary_id, date (AAAA-MM-DD) y minutes opcional"}}, status=400,
+        )
+
+    duration = timedelta(minutes=minutes) if minutes > 0 else None
+    slots = Appointment.free_slots(veterinary_id, day, duration)
+    return JsonResponse({"slots": [{"start": start, "end": end} for start, end in slots]})
@@ -0,0 +1,172 @@
+"""
+Compara la concurrencia de las páginas de solo lectura con clientes lentos.
+
+Modos:
+    wsgi   Vistas síncronas en un pool de `--threads` hilos, como un servidor WSGI
+           con hilos (por ejemplo `gunicorn --threads`).
+    asgi   Vistas síncronas servidas por `vetsoft/asgi.py` con ASYNC_VIEWS=0.
+    async  Vistas asíncronas (ASYNC_VIEWS=1) servidas por `vetsoft/asgi.py`.
+
+Cada cliente tarda `--delay` segundos en enviar la solicitud y otro tanto en leer la
+respuesta. Los servidores se simulan dentro del proceso: en WSGI esas esperas ocupan
+un hilo del pool, y en ASGI ocurren en el event loop, como en uvicorn o daphne. La
+base de datos es una SQLite de prueba en memoria con `--rows` productos.
+
+Uso:
+    python benchmarks/async_views.py [--clients 200] [--delay 0.2] [--threads 8] [--rows 200]
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from app.factories import ProductFactory  # noqa: E402
+from app.models import Product  # noqa: E402
+
+PATH = "/productos/"
+HOST = "localhost"
+
+
+class Peak:
+    """
+    Registra la mayor cantidad de hilos vivos observada durante una corrida.
+    """
+
+    def __init__(self):
+        self.threads = threading.active_count()
+
+    def sample(self):
+        """
+        Actualiza el máximo con la cantidad actual de hilos.
+        """
+        self.threads = max(self.threads, threading.active_count())
+
+
+def run_wsgi(clients, delay, threads, peak):
+    """
+    Atiende `clients` solicitudes con un pool de `threads` hilos y devuelve los códigos HTTP.
+    """
+    application = get_wsgi_application()
+
+    def handle(_):
+        time.sleep(delay)
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": PATH,
+            "SERVER_NAME": HOST,
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+        }
+        statuses = []
+        body = application(environ, lambda status, headers: statuses.append(status))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        peak.sample()
+        time.sleep(delay)
+        return int(statuses[0].split()[0])
+
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(handle, range(clients)))
+
+
+async def run_asgi(clients, delay, peak):
+    """
+    Atiende `clients` solicitudes concurrentes con la aplicación ASGI y devuelve los códigos HTTP.
+    """
+    application = get_asgi_application()
+
+    async def handle():
+        await asyncio.sleep(delay)
+        done = asyncio.Event()
+        statuses = []
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": PATH,
+            "raw_path": PATH.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", HOST.encode())],
+            "client": ("127.0.0.1", 50000),
+            "server": (HOST, 80),
+        }
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+            elif not message.get("more_body"):
+                peak.sample()
+                await asyncio.sleep(delay)
+                done.set()
+
+        await application(scope, receive, send)
+        return statuses[0]
+
+    return await asyncio.gather(*(handle() for _ in range(clients)))
+
+
+def main():
+    """
+    Crea la base de prueba, corre los tres modos e imprime su throughput.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=200)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+    Product.objects.bulk_create(ProductFactory.build_batch(args.rows))
+
+    modes = [
+        ("wsgi", "vetsoft.urls", lambda peak: run_wsgi(args.clients, args.delay, args.threads, peak)),
+        ("asgi", "vetsoft.urls", lambda peak: asyncio.run(run_asgi(args.clients, args.delay, peak))),
+        ("async", "vetsoft.urls_async", lambda peak: asyncio.run(run_asgi(args.clients, args.delay, peak))),
+    ]
+    print(f"{args.clients} clientes, {args.delay}s de latencia por tramo, {args.rows} productos")
+    for name, urlconf, run in modes:
+        peak = Peak()
+        with override_settings(ROOT_URLCONF=urlconf):
+            start = time.perf_counter()
+            statuses = run(peak)
+            elapsed = time.perf_counter() - start
+        assert set(statuses) == {200}, statuses
+        print(f"{name:<6} {elapsed:>7.2f} s {args.clients / elapsed:>9.1f} sol/s {peak.threads:>4} hilos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Mide el throughput de cobros de ventas concurrentes.
+
+Se abren `--sales` ventas de `--lines` líneas sobre `--products` productos con
+`--stock` unidades cada uno, y `--workers` hilos las cobran a la vez con
+`Sale.checkout()`, cada uno con su propia conexión. Con poco stock parte de los
+cobros se rechazan; al terminar se verifica que ningún stock quedó negativo y que lo
+descontado coincide con las líneas de las ventas cobradas.
+
+Motores:
+    sqlite      Una base de prueba en un archivo temporal en modo WAL, con un
+                timeout de espera para los bloqueos de escritura.
+    postgresql  Una base de prueba `test_<PGDATABASE>` creada con las variables de
+                entorno de libpq (PGDATABASE, PGUSER, PGPASSWORD, PGHOST, PGPORT);
+                requiere psycopg instalado.
+
+Uso:
+    python benchmarks/checkout.py [--engine sqlite] [--workers 8] [--sales 2000] [--lines 3] [--products 50] [--stock 100]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import OperationalError, connection  # noqa: E402
+from django.db.models import Min, Sum  # noqa: E402
+
+from app.factories import ProductFactory  # noqa: E402
+from app.models import Product, Sale, SaleLine  # noqa: E402
+
+
+def configure(engine, directory):
+    """
+    Apunta la conexión por defecto al motor elegido; debe llamarse antes de usarla.
+    """
+    database = settings.DATABASES["default"]
+    if engine == "postgresql":
+        database.update(
+            ENGINE="django.db.backends.postgresql",
+            NAME=os.environ.get("PGDATABASE", "vetsoft"),
+            USER=os.environ.get("PGUSER", ""),
+            PASSWORD=os.environ.get("PGPASSWORD", ""),
+            HOST=os.environ.get("PGHOST", ""),
+            PORT=os.environ.get("PGPORT", ""),
+            TEST={**database["TEST"], "NAME": None},
+        )
+    else:
+        database["TEST"] = {**database["TEST"], "NAME": str(Path(directory) / "checkout.sqlite3")}
+        database["OPTIONS"] = {**database["OPTIONS"], "timeout": 30}
+
+
+def prepare(sales, lines, products, stock):
+    """
+    Crea los productos y las ventas abiertas; devuelve los IDs de las ventas.
+    """
+    Product.objects.bulk_create(ProductFactory.build_batch(products))
+    Product.objects.update(stock=stock)
+    catalog = list(Product.objects.values_list("pk", "name", "price"))
+    opened = Sale.objects.bulk_create([Sale() for _ in range(sales)])
+
+    rng = random.Random(0)
+    SaleLine.objects.bulk_create(
+        [
+            SaleLine(sale=sale, product_id=pk, name=name, price=price, quantity=rng.randint(1, 3))
+            for sale in opened
+            for pk, name, price in rng.sample(catalog, lines)
+        ],
+        batch_size=1000,
+    )
+    return [sale.pk for sale in opened]
+
+
+def checkout_all(sale_ids, workers):
+    """
+    Cobra las ventas repartidas entre `workers` hilos y cuenta los resultados.
+    """
+    def work(chunk):
+        results = Counter()
+        try:
+            for pk in chunk:
+                try:
+                    paid, _ = Sale.objects.get(pk=pk).checkout()
+                except OperationalError:
+                    results["errores"] += 1
+                    continue
+                results["cobradas" if paid else "rechazadas"] += 1
+        finally:
+            connection.close()
+        return results
+
+    with ThreadPoolExecutor(workers) as pool:
+        return sum(pool.map(work, [sale_ids[offset::workers] for offset in range(workers)]), Counter())
+
+
+def main():
+    """
+    Crea la base de prueba, cobra las ventas, verifica el stock e imprime el throughput.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=["sqlite", "postgresql"], default="sqlite")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--sales", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=3)
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--stock", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure(args.engine, directory)
+        name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            if args.engine == "sqlite":
+                with connection.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode=WAL")
+            sale_ids = prepare(args.sales, args.lines, args.products, args.stock)
+
+            start = time.perf_counter()
+            results = checkout_all(sale_ids, args.workers)
+            elapsed = time.perf_counter() - start
+
+            sold = SaleLine.objects.filter(sale__paid_at__isnull=False).aggregate(units=Sum("quantity"))["units"] or 0
+            stock = Product.objects.aggregate(total=Sum("stock"), lowest=Min("stock"))
+            assert stock["lowest"] >= 0, stock
+            assert stock["total"] == args.products * args.stock - sold, (stock, sold)
+        finally:
+            connection.creation.destroy_test_db(name, verbosity=0)
+
+    print(
+        f"{args.engine}: {args.sales} ventas de {args.lines} líneas, {args.workers} hilos, "
+        f"{args.products} productos con {args.stock} unidades",
+    )
+    print(
+        f"{elapsed:.2f} s {args.sales / elapsed:.1f} cobros/s "
+        f"(cobradas {results['cobradas']}, rechazadas {results['rechazadas']}, errores {results['errores']})",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Mide el tablero de inicio con tablas grandes.
+
+Compara `summaries.dashboard()`, que lee los contadores que mantienen los triggers, con
+las mismas cifras calculadas con consultas agrupadas sobre las tablas de origen, y mide
+cuánto cuesta insertar los registros con los triggers instalados y sin ellos. La base es
+una SQLite de prueba en memoria con `--rows` clientes, mascotas y productos.
+
+Uso:
+    python benchmarks/dashboard.py [--rows 200000]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from app import summaries  # noqa: E402
+from app.factories import ClientFactory, PetFactory, ProductFactory  # noqa: E402
+from app.models import Client, Pet, Product  # noqa: E402
+
+BATCH_SIZE = 10000
+
+
+def populate(rows):
+    """
+    Crea `rows` clientes, mascotas y productos en lotes.
+    """
+    for factory in (ClientFactory, PetFactory, ProductFactory):
+        for offset in range(0, rows, BATCH_SIZE):
+            factory.model.objects.bulk_create(factory.build_batch(min(BATCH_SIZE, rows - offset)))
+
+
+def from_tables():
+    """
+    Calcula las cifras del tablero con consultas agrupadas sobre las tablas, como referencia.
+    """
+    return {
+        "clients_by_city": list(Client.objects.values_list("city").annotate(Count("pk")).order_by("city")),
+        "pets_by_breed": list(Pet.objects.values_list("breed").annotate(Count("pk")).order_by("breed")),
+        "products_out_of_stock": Product.objects.filter(stock=0).count(),
+    }
+
+
+def timed(function):
+    """
+    Ejecuta `function` y devuelve (resultado, segundos).
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    """
+    Crea la base de prueba con y sin triggers, mide cada lectura e imprime los tiempos.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+    summaries.drop_triggers()
+    _, plain = timed(lambda: populate(args.rows))
+    for model in (Client, Pet, Product):
+        model.all_objects.hard_delete()
+    summaries.rebuild()
+    _, triggered = timed(lambda: populate(args.rows))
+    print(f"{args.rows} clientes, mascotas y productos creados en {plain:.1f} s sin triggers, {triggered:.1f} s con triggers")
+
+    expected, grouped = timed(from_tables)
+    data, summary = timed(lambda: summaries.dashboard(timezone.localdate()))
+    for name, value in expected.items():
+        assert value == data[name], name
+
+    print(f"consultas agrupadas        {grouped * 1000:>9.1f} ms")
+    print(f"dashboard() de resúmenes   {summary * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
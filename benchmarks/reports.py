@@ -0,0 +1,115 @@
+"""
+Mide el costo de las cifras de la página de reportes con muchos productos.
+
+Compara el valor del inventario por tipo calculado en la base de datos
+(`reports.inventory_value()` y `reports.inventory_totals()`) con el mismo cálculo
+recorriendo `Product.objects.all()` en Python, y mide los productos más vendidos y
+una lectura de `reports.report()` ya guardada en caché. La base es una SQLite de
+prueba en memoria con `--rows` productos de `--types` tipos y `--sales` ventas
+cobradas de 3 líneas.
+
+Uso:
+    python benchmarks/reports.py [--rows 1000000] [--types 20] [--sales 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from app import reports  # noqa: E402
+from app.factories import ProductFactory  # noqa: E402
+from app.models import Product, Sale, SaleLine  # noqa: E402
+
+BATCH_SIZE = 10000
+
+
+def populate(rows, types, sales):
+    """
+    Crea los productos en lotes y las ventas cobradas con sus líneas.
+    """
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = ProductFactory.build_batch(min(BATCH_SIZE, rows - offset))
+        for n, product in enumerate(batch, start=offset):
+            product.type = f"Tipo {n % types:02d}"
+        Product.objects.bulk_create(batch)
+
+    rng = random.Random(0)
+    paid = Sale.objects.bulk_create([Sale(paid_at=timezone.now()) for _ in range(sales)])
+    popular = list(Product.objects.order_by("pk").values_list("pk", "name", "price")[:1000])
+    SaleLine.objects.bulk_create(
+        [
+            SaleLine(sale=sale, product_id=pk, name=name, price=price, quantity=rng.randint(1, 5))
+            for sale in paid
+            for pk, name, price in rng.sample(popular, 3)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def in_python():
+    """
+    Calcula el valor por tipo recorriendo todos los productos, como referencia.
+    """
+    values = {}
+    for product in Product.objects.all().iterator(chunk_size=BATCH_SIZE):
+        values[product.type] = values.get(product.type, 0) + product.price * product.stock
+    return values
+
+
+def timed(function):
+    """
+    Ejecuta `function` y devuelve (resultado, segundos).
+    """
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    """
+    Crea la base de prueba, mide cada cálculo e imprime los tiempos.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--types", type=int, default=20)
+    parser.add_argument("--sales", type=int, default=10000)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+    _, elapsed = timed(lambda: populate(args.rows, args.types, args.sales))
+    print(f"{args.rows} productos de {args.types} tipos y {args.sales} ventas creados en {elapsed:.1f} s")
+
+    inventory, database = timed(lambda: (reports.inventory_value(), reports.inventory_totals()))
+    python, iterated = timed(in_python)
+    assert {row["type"]: round(row["value"], 2) for row in inventory[0]} == {
+        product_type: round(value, 2) for product_type, value in python.items()
+    }
+    sellers, ranked = timed(lambda: reports.top_sellers(settings.REPORT_TOP_SELLERS))
+
+    cache.clear()
+    _, cold = timed(reports.report)
+    _, warm = timed(reports.report)
+
+    print(f"inventario en la base       {database * 1000:>9.1f} ms")
+    print(f"inventario en Python        {iterated * 1000:>9.1f} ms")
+    print(f"más vendidos ({len(sellers)} filas)     {ranked * 1000:>9.1f} ms")
+    print(f"report() sin caché          {cold * 1000:>9.1f} ms")
+    print(f"report() desde la caché     {warm * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Mide cuántos registros por segundo valida cada Validator de app/validation.py.
+
+Uso:
+    python benchmarks/validation.py [cantidad]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from app.factories import (  # noqa: E402
+    ClientFactory,
+    MedFactory,
+    PetFactory,
+    ProductFactory,
+    ProviderFactory,
+    VeterinaryFactory,
+)
+from app.validation import (  # noqa: E402
+    client_validator,
+    med_validator,
+    pet_validator,
+    product_validator,
+    provider_validator,
+    veterinary_validator,
+)
+
+CASES = [
+    ("client", ClientFactory, client_validator),
+    ("provider", ProviderFactory, provider_validator),
+    ("product", ProductFactory, product_validator),
+    ("veterinary", VeterinaryFactory, veterinary_validator),
+    ("pet", PetFactory, pet_validator),
+    ("med", MedFactory, med_validator),
+]
+
+
+def main():
+    """
+    Valida `cantidad` registros generados por las fábricas e imprime el throughput.
+    """
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for name, factory, validator in CASES:
+        distinct = [factory.data() for _ in range(1000)]
+        rows = distinct * (size // len(distinct))
+
+        start = time.perf_counter()
+        valid, invalid = validator.partition(rows)
+        elapsed = time.perf_counter() - start
+
+        assert not invalid
+        print(f"{name:<11} {len(rows) / elapsed:>12,.0f} registros/s")
+
+
+if __name__ == "__main__":
+    main()
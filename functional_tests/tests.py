@@ -1,5 +1,6 @@
 import os
 from datetime import date
+from multiprocessing.util import Finalize
 
 from django.contrib.staticfiles.testing import StaticLiveServerTestCase
 from django.urls import reverse
@@ -8,67 +9,75 @@ from playwright.sync_api import Browser, expect, sync_playwright
 from app.models import Client, Med, Pet, Product, Provider
 
 os.environ["DJANGO_ALLOW_ASYNC_UNSAFE"] = "true"
-playwright = sync_playwright().start()
 headless = os.environ.get("HEADLESS", 1) == 1
 slow_mo = os.environ.get("SLOW_MO", 0)
 
+_browser = None
+
+
+def get_browser() -> Browser:
+    """
+    Devuelve el navegador Firefox compartido por el proceso actual.
+
+    Playwright y Firefox se inician la primera vez que se pide el navegador, no al importar
+    el módulo, así cada worker de `manage.py test --parallel` lanza un único navegador
+    propio. Se cierra con un `Finalize` de multiprocessing y no con `atexit`: los workers
+    terminan con `os._exit()`, que no corre los handlers de `atexit`, pero sí corren los
+    finalizadores antes de salir, y el proceso principal los corre al terminar.
+    """
+    global _browser
+    if _browser is None:
+        playwright = sync_playwright().start()
+        _browser = playwright.firefox.launch(headless=headless, slow_mo=int(slow_mo))
+
+        def stop():
+            _browser.close()
+            playwright.stop()
+
+        Finalize(None, stop, exitpriority=0)
+    return _browser
+
 
 class PlaywrightTestCase(StaticLiveServerTestCase):
     """
     Clase base para pruebas utilizando Playwright.
 
     Esta clase proporciona configuraciones básicas para ejecutar pruebas utilizando
-    el framework Playwright. Configura un navegador web y proporciona métodos de
-    configuración y limpieza.
+    el framework Playwright. Todas las clases de un mismo proceso comparten el navegador
+    y cada prueba usa un contexto nuevo, con cookies y almacenamiento aislados.
 
     Atributos de Clase:
-        browser (Browser): Instancia del navegador web.
-        headless (bool): Define si el navegador se ejecutará en modo headless.
-        slow_mo (int): Retardo en milisegundos para ralentizar la ejecución del navegador.
+        browser (Browser): Instancia del navegador web compartida por el proceso.
 
     Métodos de Clase:
-        setUpClass: Configura el navegador antes de iniciar las pruebas.
-        tearDownClass: Cierra el navegador después de finalizar las pruebas.
+        setUpClass: Obtiene el navegador compartido antes de iniciar las pruebas.
 
     Métodos:
-        setUp: Configura una nueva página del navegador antes de cada prueba.
-        tearDown: Cierra la página del navegador después de cada prueba.
+        setUp: Crea un contexto y una página nuevos antes de cada prueba.
+        tearDown: Cierra el contexto del navegador después de cada prueba.
     """
     @classmethod
     def setUpClass(cls):
         """
-        Configura el entorno de prueba para ejecutar pruebas con un navegador Firefox utilizando Playwright.
-
-        Este método se ejecuta una vez antes de todas las pruebas de la clase. Lanza una instancia de
-        Firefox en modo sin cabeza (headless) o con un retraso en las acciones (slow_mo) según las configuraciones
-        proporcionadas.
+        Configura el entorno de prueba obteniendo el navegador Firefox compartido.
         """
         super().setUpClass()
-        cls.browser: Browser = playwright.firefox.launch(
-            headless=headless, slow_mo=int(slow_mo),
-        )
-
-    @classmethod
-    def tearDownClass(cls):
-        """
-        Limpia el entorno de prueba cerrando el navegador lanzado por Playwright.
-        """
-        super().tearDownClass()
-        cls.browser.close()
+        cls.browser: Browser = get_browser()
 
     def setUp(self):
         """
-        Configura el entorno de prueba para ejecutar pruebas con un navegador Firefox utilizando Playwright.
+        Crea un contexto de navegador aislado y una página para la prueba.
         """
         super().setUp()
-        self.page = self.browser.new_page()
+        self.context = self.browser.new_context()
+        self.page = self.context.new_page()
 
     def tearDown(self):
         """
-        Configura el entorno de prueba para ejecutar pruebas con un navegador Firefox utilizando Playwright.
+        Cierra el contexto de navegador creado para la prueba.
         """
         super().tearDown()
-        self.page.close()
+        self.context.close()
 
 
 class HomeTestCase(PlaywrightTestCase):
@@ -3,14 +3,33 @@ ASGI config for vetsoft project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live stock stream (``/productos/eventos/``) keeps each connection open, so it
+must be served through this module by an ASGI server rather than through WSGI.
+
+Serving through this module also enables ``ASYNC_VIEWS`` unless it is set in the
+environment: the read-only pages then use the async views in ``app/async_views.py``,
+so slow clients and database waits do not tie up server threads. For example::
+
+    uvicorn vetsoft.asgi:application --workers 4
+
+Set ``ASYNC_VIEWS=0`` to serve the sync views through ASGI as well.
+
+With ``DEBUG`` on, static files are served by this application too, as ``runserver``
+does, so the development image works without a separate static file server.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "vetsoft.settings")
+os.environ.setdefault("ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
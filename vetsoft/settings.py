@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+from datetime import time
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -54,9 +55,16 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.db_logging.SlowQueryLogMiddleware",
+    "app.profiling.ProfilerMiddleware",
 ]
 
-ROOT_URLCONF = "vetsoft.urls"
+# Con ASYNC_VIEWS=1 las páginas de solo lectura se sirven con las vistas asíncronas
+# de app/async_views.py. vetsoft/asgi.py lo activa por defecto.
+
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "0") == "1"
+
+ROOT_URLCONF = "vetsoft.urls_async" if ASYNC_VIEWS else "vetsoft.urls"
 
 TEMPLATES = [
     {
@@ -85,9 +93,132 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # La base de pruebas vive en memoria; con --parallel cada worker recibe su copia.
+        "TEST": {"NAME": ":memory:"},
+    },
+}
+
+
+# Slow query log
+# Las consultas que superan el umbral (en milisegundos) se registran en un archivo
+# rotativo con formato JSON. Una fracción de ellas incluye el EXPLAIN QUERY PLAN.
+
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 100))
+
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.environ.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+
+SLOW_QUERY_LOG_FILE = os.environ.get("SLOW_QUERY_LOG_FILE", BASE_DIR / "slow_queries.log")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "app.db_logging.JsonFormatter"},
+    },
+    "handlers": {
+        "slow_queries": {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": SLOW_QUERY_LOG_FILE,
+            "maxBytes": 5 * 1024 * 1024,
+            "backupCount": 5,
+            "delay": True,
+            "formatter": "json",
+        },
+    },
+    "loggers": {
+        "app.slow_queries": {
+            "handlers": ["slow_queries"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
+
+# Perfilado bajo demanda
+# Una solicitud se perfila si trae un token firmado en el header X-Vetsoft-Profile
+# (ver `manage.py profiles --token`) o si un usuario staff agrega ?profile=1.
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", BASE_DIR / "profiles")
+
+PROFILING_SAMPLE_INTERVAL = float(os.environ.get("PROFILING_SAMPLE_INTERVAL", 0.001))
+
+PROFILING_TOKEN_MAX_AGE = int(os.environ.get("PROFILING_TOKEN_MAX_AGE", 3600))
+
+
+# Borrado lógico
+# Los registros borrados se conservan SOFT_DELETE_RETENTION_DAYS días y luego
+# `manage.py purge_deleted` los elimina en lotes de PURGE_BATCH_SIZE filas.
+
+SOFT_DELETE_RETENTION_DAYS = int(os.environ.get("SOFT_DELETE_RETENTION_DAYS", 30))
+
+PURGE_BATCH_SIZE = int(os.environ.get("PURGE_BATCH_SIZE", 500))
+
+
+# Recordatorios
+# `manage.py generate_reminders` se ejecuta a diario y procesa los planes vencidos en
+# bloques de REMINDER_CHUNK_SIZE filas.
+
+REMINDER_CHUNK_SIZE = int(os.environ.get("REMINDER_CHUNK_SIZE", 1000))
+
+# Reservas de stock
+# Los productos de una venta abierta quedan reservados RESERVATION_MINUTES minutos;
+# `manage.py sweep_reservations` borra las vencidas en lotes de RESERVATION_SWEEP_BATCH_SIZE filas.
+
+RESERVATION_MINUTES = int(os.environ.get("RESERVATION_MINUTES", 15))
+
+RESERVATION_SWEEP_BATCH_SIZE = int(os.environ.get("RESERVATION_SWEEP_BATCH_SIZE", 1000))
+
+# Cantidad de días en los que la página principal busca los próximos cumpleaños.
+
+UPCOMING_BIRTHDAYS_DAYS = int(os.environ.get("UPCOMING_BIRTHDAYS_DAYS", 7))
+
+
+# Eventos en vivo (server-sent events)
+# InProcessBroker sirve para un único proceso ASGI; con varios procesos usar
+# app.events.ChangeLogBroker, que lee el registro de cambios cada EVENTS_POLL_INTERVAL segundos.
+
+EVENTS_BACKEND = os.environ.get("EVENTS_BACKEND", "app.events.InProcessBroker")
+
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", 15))
+
+EVENTS_POLL_INTERVAL = float(os.environ.get("EVENTS_POLL_INTERVAL", 1))
+
+
+# Turnos
+# Horario de atención en el que se buscan huecos libres y duración máxima de un turno;
+# la detección de superposiciones depende de ese máximo.
+
+CLINIC_OPENING = time.fromisoformat(os.environ.get("CLINIC_OPENING", "09:00"))
+
+CLINIC_CLOSING = time.fromisoformat(os.environ.get("CLINIC_CLOSING", "18:00"))
+
+APPOINTMENT_MAX_MINUTES = int(os.environ.get("APPOINTMENT_MAX_MINUTES", 240))
+
+APPOINTMENT_SLOT_MINUTES = int(os.environ.get("APPOINTMENT_SLOT_MINUTES", 30))
+
+
+# Caché
+# Con varios procesos conviene un backend compartido (por ejemplo
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache y CACHE_LOCATION=redis://...).
+# La agenda semanal guarda su HTML CALENDAR_CACHE_SECONDS segundos.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "vetsoft"),
     },
 }
 
+CALENDAR_CACHE_SECONDS = int(os.environ.get("CALENDAR_CACHE_SECONDS", 3600))
+
+# La página de reportes guarda sus cifras REPORT_CACHE_SECONDS segundos y muestra los
+# REPORT_TOP_SELLERS productos más vendidos.
+
+REPORT_CACHE_SECONDS = int(os.environ.get("REPORT_CACHE_SECONDS", 3600))
+
+REPORT_TOP_SELLERS = int(os.environ.get("REPORT_TOP_SELLERS", 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -0,0 +1,10 @@
+"""
+URL configuration for vetsoft when ASYNC_VIEWS is enabled (see ``vetsoft/asgi.py``).
+
+Same as ``vetsoft/urls.py`` but the read-only pages are served by the async views
+routed in ``app/urls_async.py``.
+"""
+from django.contrib import admin
+from django.urls import include, path
+
+urlpatterns = [path("admin/", admin.site.urls), path("", include("app.urls_async"))]